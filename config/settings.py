@@ -15,3 +15,21 @@ PROJ_PATH = "MASKED" # Replace with directory path to CHINA_ANALYSIS_PROJECT
 PRAW_CLIENT = "MASKED"
 PRAW_CLIENT_SECRET = "MASKED"
 PRAW_USER_AGENT = "MASKED"
+
+# OpenAI-compatible chat completions endpoint used by the classifier
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Data files used as defaults by the analysis modules (utils.engagement,
+# utils.corpus, ...). Paths are absolute so they work from src/ notebooks too;
+# until PROJ_PATH is set they resolve against this repository.
+PROJECT_ROOT = PROJ_PATH if os.path.isdir(PROJ_PATH) else str(Path(__file__).resolve().parent.parent)
+POST_DATA_DIR = os.path.join(PROJECT_ROOT, 'post_data')
+SCORED_COMMENT_FILES = {
+    'China': os.path.join(POST_DATA_DIR, 'cn_scored_pnc_df.csv'),
+    'HongKong': os.path.join(POST_DATA_DIR, 'hk_scored_pnc_df.csv'),
+    'Taiwan': os.path.join(POST_DATA_DIR, 'tw_scored_pnc_df.csv'),
+}
+
+# Labels assigned by models.GPTClassifier
+CATEGORIES = ['POLITICAL', 'CULTURAL', 'OTHER']
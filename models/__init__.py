@@ -1,2 +1,3 @@
 # models/__init__.py
-from .reddit_scraper import RedditScraper
\ No newline at end of file
+from .reddit_scraper import RedditScraper
+from .gpt_classifier import GPTClassifier, content_gen
\ No newline at end of file
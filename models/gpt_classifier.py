@@ -0,0 +1,85 @@
+# models/gpt_classifier.py
+import requests
+import time
+
+LABELS = ('POLITICAL', 'CULTURAL', 'OTHER')
+
+
+def content_gen(body):
+   content = f"""
+      You are a specialized content classifier for the r/china subreddit. Your task is to categorize the discussion below and try your best to fit them into either political/cultural/other based on the standards below:
+      {body}
+      CATEGORIES:
+      1. POLITICS - Posts about:
+         - Government, political parties, policies
+         - International relations and diplomacy
+         - Laws and regulations
+         - Civil rights and activism
+         - Current political events
+         - Censorship and media control
+
+      2. CULTURAL - Posts about:
+         - Traditions and customs
+         - Food and cuisine
+         - Languages and linguistics
+         - Arts and entertainment
+         - History and heritage
+         - Philosophy and religion
+         - Daily life and social norms
+         - Education and learning languages
+         - Travel and tourism experiences
+
+      3. OTHER
+
+      INSTRUCTIONS:
+      1. Analyze the provided post text
+      2. Classify it into exactly one of the above categories
+      4. **OUTPUT ONLY ONE SINGLE WORD, CULTURAL/POLITICAL/OTHER**"""
+   return content
+
+
+def parse_label(msg_content):
+    """Map a model reply onto POLITICAL/CULTURAL/OTHER."""
+    reply = (msg_content or '').upper()
+    for label in LABELS:
+        if label in reply:
+            return label
+    if 'POLITIC' in reply:
+        return 'POLITICAL'
+    return 'OTHER'
+
+
+class GPTClassifier:
+    """
+    Classify post bodies with the prompt from gpt_classifier.ipynb through an
+    OpenAI-compatible chat completions endpoint.
+    """
+
+    def __init__(self, api_key, base_url="https://api.openai.com/v1", model="gpt-4o-mini",
+                 timeout=30, max_retries=3):
+        self.headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def classify(self, body):
+        """Return the raw model reply for a post body."""
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': content_gen(body)}],
+        }
+        for attempt in range(self.max_retries):
+            response = requests.post(f"{self.base_url}/chat/completions", headers=self.headers,
+                                     json=payload, timeout=self.timeout)
+            if response.status_code == 429 or response.status_code >= 500:
+                time.sleep(2 ** attempt)  # Back off on rate limits and server errors
+                continue
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        response.raise_for_status()
+        raise RuntimeError(f"Classifier request failed after {self.max_retries} attempts")
+
+    def label(self, body):
+        """Return POLITICAL, CULTURAL or OTHER for a post body."""
+        return parse_label(self.classify(body))
@@ -28,9 +28,11 @@ def cache_results(func):
     return wrapper
 
 class RedditScraper:
-    def __init__(self, user_agent):
+    def __init__(self, user_agent, base_url="https://api.reddit.com", rate_limit_delay=2, timeout=30):
         self.headers = {'User-Agent': user_agent}
-        self.base_url = "https://api.reddit.com"
+        self.base_url = base_url
+        self.rate_limit_delay = rate_limit_delay
+        self.timeout = timeout
     
     @cache_results
     def get_subreddit_posts(self, subreddit, limit=100, cache=False, cache_duration_hours=24):
@@ -44,7 +46,7 @@ class RedditScraper:
                 'after': after
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = requests.get(url, headers=self.headers, params=params, timeout=self.timeout)
             data = response.json()
             
             if 'data' not in data:
@@ -57,6 +59,55 @@ class RedditScraper:
             posts.extend([post['data'] for post in new_posts])
             after = new_posts[-1]['data']['name']
             
-            time.sleep(2)  # Rate limiting
+            time.sleep(self.rate_limit_delay)  # Rate limiting
             
-        return posts[:limit]
\ No newline at end of file
+        return posts[:limit]
+
+    def get_post_comments(self, post):
+        """
+        Fetch the comments of a post, including nested replies, as rows in the
+        *_comments.csv layout plus comment_id and parent_id.
+        
+        Args:
+            post: Post dict as returned by get_subreddit_posts
+        Returns:
+            list: One dict per comment, parents before their replies; parent_id is
+                the post id for top-level comments
+        """
+        url = f"{self.base_url}/comments/{post['id']}"
+        response = requests.get(url, headers=self.headers, params={'limit': 500}, timeout=self.timeout)
+        data = response.json()
+        time.sleep(self.rate_limit_delay)  # Rate limiting
+        
+        if not isinstance(data, list) or len(data) < 2:
+            return []
+        
+        post_owner = post.get('author')
+        comments = []
+        # Iterative depth-first walk; each entry is (listing children, parent author)
+        stack = [(data[1]['data']['children'], post_owner)]
+        while stack:
+            children, parent_owner = stack.pop()
+            for child in children:
+                if child.get('kind') != 't1':
+                    continue  # Skip "load more" stubs
+                comment = child['data']
+                comments.append({
+                    'post_title': post.get('title'),
+                    'post_id': post['id'],
+                    'post_body': post.get('selftext'),
+                    'post_datetime': post.get('created_utc'),
+                    'post_score': post.get('score'),
+                    'post_owner': post_owner,
+                    'comment_owner': comment.get('author'),
+                    'reply_to_userId': parent_owner,
+                    'comment_datetime': comment.get('created_utc'),
+                    'comment_score': comment.get('score'),
+                    'comment_body': comment.get('body'),
+                    'comment_id': comment.get('id'),
+                    'parent_id': (comment.get('parent_id') or post['id']).split('_', 1)[-1]
+                })
+                replies = comment.get('replies')
+                if isinstance(replies, dict):  # '' when there are no replies
+                    stack.append((replies['data']['children'], comment.get('author')))
+        return comments
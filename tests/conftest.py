@@ -0,0 +1,8 @@
+# tests/conftest.py
+# Make the repository root importable (utils, config, models) wherever pytest runs from.
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
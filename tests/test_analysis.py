@@ -0,0 +1,46 @@
+# tests/test_analysis.py
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from utils.analysis import _compact, _top_k, get_mean_tfidf, get_top_terms
+
+
+def _stable_top(values, k):
+    return np.argsort(-np.asarray(values), kind='stable')[:k]
+
+
+@pytest.mark.parametrize('k', [None, 0, 1, 3, 7, 10, 50])
+def test_top_k_matches_stable_sort_with_ties(k):
+    rng = np.random.default_rng(0)
+    # Few distinct values, so most cut-offs fall inside a run of ties
+    values = rng.integers(0, 5, 40).astype(np.float64)
+    expected = _stable_top(values, len(values) if k is None else k)
+    assert _top_k(values, k).tolist() == expected.tolist()
+
+
+def test_get_top_terms_matches_stable_sort_with_ties():
+    terms = [f'term{i}' for i in range(30)]
+    scores = pd.Series(np.repeat([0.3, 0.2, 0.1], 10), index=terms)[::-1]
+    for n in (1, 5, 12, 30):
+        expected = scores.index[_stable_top(scores.to_numpy(), n)].tolist()
+        assert get_top_terms(scores, n) == expected
+        assert get_top_terms(scores.to_frame('score'), n) == expected
+        assert get_top_terms(scores.to_dict(), n) == expected
+
+
+def test_mean_tfidf_of_compact_matrix_accumulates_in_float64():
+    rng = np.random.default_rng(0)
+    n_rows = 2_000_000
+    values = rng.random(n_rows).astype(np.float32)
+    # Column 1 is column 0 plus a difference below float32 accumulation error
+    dense = np.stack([values, values], axis=1).astype(np.float64)
+    dense[0, 1] += 1e-3
+    matrix = _compact(sp.csr_matrix(dense))
+    assert matrix.dtype == np.float32
+
+    scores = get_mean_tfidf(matrix, ['a', 'b'])
+    expected = matrix.astype(np.float64).toarray().mean(axis=0)
+    np.testing.assert_allclose(scores.loc[['a', 'b'], 'score'], expected, rtol=1e-12)
+    assert scores.index.tolist() == ['b', 'a']
+    assert get_mean_tfidf(matrix, ['a', 'b'], top_k=1).index.tolist() == ['b']
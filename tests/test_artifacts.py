@@ -0,0 +1,87 @@
+# tests/test_artifacts.py
+import mmap
+import numpy as np
+import pandas as pd
+import pytest
+import utils.analysis
+import utils.ingestion
+from utils.artifacts import TfidfArtifact, load_or_fit
+
+STOP_WORDS = ['the', 'and', 'of']
+
+
+@pytest.fixture(autouse=True)
+def no_nltk(monkeypatch):
+    monkeypatch.setattr(utils.ingestion, 'preprocess_text', lambda text, fast=False, min_len=3: str(text).lower())
+    monkeypatch.setattr(utils.analysis, 'preprocess_text', lambda text: str(text).lower())
+    monkeypatch.setattr(utils.analysis, 'english_stopwords', lambda: STOP_WORDS)
+
+
+def _memory_mapped(array):
+    """True when the array is a view onto a file mapping (scipy wraps memmaps in plain views)."""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def _posts(n_posts=200, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f'term{i}' for i in range(40)] + STOP_WORDS)
+    return pd.DataFrame({
+        'post_title': [' '.join(rng.choice(words, 5)) for _ in range(n_posts)],
+        'post_body': [' '.join(rng.choice(words, 8)) if i % 3 else np.nan for i in range(n_posts)],
+    })
+
+
+def test_transform_reproduces_fitted_matrix():
+    posts = _posts()
+    artifact = TfidfArtifact.fit(posts, max_terms=30)
+    np.testing.assert_allclose(artifact.transform(posts).toarray(), artifact.tfidf_matrix.toarray())
+    # Title-only fits read only the title column
+    title_only = TfidfArtifact.fit(posts, include_selftext=False)
+    np.testing.assert_allclose(title_only.transform(posts[['post_title']]).toarray(),
+                               title_only.tfidf_matrix.toarray())
+
+
+def test_load_is_memory_mapped(tmp_path):
+    posts = _posts()
+    artifact = TfidfArtifact.fit(posts)
+    artifact.save(tmp_path / 'artifact')
+    loaded = TfidfArtifact.load(tmp_path / 'artifact')
+    for name in ('data', 'indices', 'indptr'):
+        assert _memory_mapped(getattr(loaded.tfidf_matrix, name))
+    assert _memory_mapped(loaded.idf)
+    assert not _memory_mapped(TfidfArtifact.load(tmp_path / 'artifact', mmap=False).tfidf_matrix.data)
+    assert (loaded.tfidf_matrix != artifact.tfidf_matrix).nnz == 0
+    assert list(loaded.feature_names) == list(artifact.feature_names)
+    pd.testing.assert_frame_equal(loaded.freq_df, artifact.freq_df)
+    np.testing.assert_allclose(loaded.transform(posts[:10]).toarray(), artifact.tfidf_matrix[:10].toarray())
+
+
+def test_load_or_fit_refits_on_changed_input_or_config(monkeypatch, tmp_path):
+    fits = []
+    fit = TfidfArtifact.fit.__func__
+
+    def counting_fit(cls, df, **config):
+        fits.append(config)
+        return fit(cls, df, **config)
+
+    monkeypatch.setattr(TfidfArtifact, 'fit', classmethod(counting_fit))
+    path = tmp_path / 'artifact'
+    posts = _posts()
+
+    load_or_fit(path, posts)
+    load_or_fit(path, posts)
+    assert len(fits) == 1
+
+    changed = posts.copy()
+    changed.loc[5, 'post_title'] = 'term1 term2'
+    load_or_fit(path, changed)
+    assert len(fits) == 2
+
+    artifact = load_or_fit(path, changed, max_terms=20)
+    assert len(fits) == 3 and artifact.tfidf_matrix.shape[1] == 20
+    load_or_fit(path, changed, max_terms=20)
+    assert len(fits) == 3
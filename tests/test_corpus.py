@@ -0,0 +1,73 @@
+# tests/test_corpus.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from utils.corpus import TokenCorpus
+
+STOP_WORDS = ['the', 'and', 'of']
+
+
+def _texts(n_docs=300, vocabulary=60, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f'term{i}' for i in range(vocabulary)] + STOP_WORDS)
+    lengths = rng.integers(0, 15, n_docs)
+    return [' '.join(rng.choice(words, length)) for length in lengths]
+
+
+def _corpus(texts):
+    metadata = pd.DataFrame({'post_id': [f'p{i}' for i in range(len(texts))],
+                             'timestamp': np.arange(len(texts)) * 3600})
+    return TokenCorpus.from_texts(texts, metadata)
+
+
+@pytest.mark.parametrize('max_terms, min_doc_freq', [(None, 1), (20, 2), (25, 0.05), (1000, 2)])
+def test_tfidf_matrix_matches_tfidf_vectorizer(max_terms, min_doc_freq):
+    texts = _texts()
+    expected = TfidfVectorizer(max_features=max_terms, min_df=min_doc_freq, stop_words=STOP_WORDS)
+    expected_matrix = expected.fit_transform(texts)
+
+    matrix, feature_names = _corpus(texts).tfidf_matrix(max_terms, min_doc_freq, stop_words=STOP_WORDS)
+    assert list(feature_names) == list(expected.get_feature_names_out())
+    assert matrix.shape == expected_matrix.shape
+    np.testing.assert_allclose(matrix.toarray(), expected_matrix.toarray())
+
+
+def test_tfidf_matrix_breaks_frequency_ties_like_tfidf_vectorizer():
+    # Every term occurs equally often, so max_features cuts through a tie
+    words = [f'w{i:02d}' for i in range(40)]
+    texts = [' '.join(words[i:i + 10] + words[:max(0, i + 10 - 40)]) for i in range(40)]
+    expected = TfidfVectorizer(max_features=17, stop_words=STOP_WORDS)
+    expected_matrix = expected.fit_transform(texts)
+
+    matrix, feature_names = _corpus(texts).tfidf_matrix(17, 1, stop_words=STOP_WORDS)
+    assert list(feature_names) == list(expected.get_feature_names_out())
+    np.testing.assert_allclose(matrix.toarray(), expected_matrix.toarray())
+
+
+def test_count_matrix_matches_count_vectorizer():
+    texts = _texts(seed=1)
+    corpus = _corpus(texts)
+    expected = CountVectorizer(vocabulary=list(corpus.vocabulary)).transform(texts)
+    assert (corpus.count_matrix() != expected).nnz == 0
+
+
+def test_take_and_subset_keep_documents_and_metadata():
+    texts = _texts(n_docs=50, seed=2)
+    corpus = _corpus(texts)
+    docs = [7, 0, 49, 7, 23]
+    taken = corpus.take(docs)
+    assert list(taken.texts()) == [texts[i] for i in docs]
+    assert taken.metadata['post_id'].tolist() == [f'p{i}' for i in docs]
+
+    mask = np.arange(len(texts)) % 3 == 0
+    assert list(corpus.subset(mask).texts()) == [text for text, keep in zip(texts, mask) if keep]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    texts = _texts(n_docs=80, seed=3)
+    corpus = _corpus(texts)
+    corpus.save(tmp_path / 'corpus')
+    loaded = TokenCorpus.load(tmp_path / 'corpus')
+    assert list(loaded.texts()) == texts
+    pd.testing.assert_frame_equal(loaded.metadata, corpus.metadata)
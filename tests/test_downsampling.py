@@ -0,0 +1,48 @@
+# tests/test_downsampling.py
+import numpy as np
+import pandas as pd
+import pytest
+from utils.downsampling import date_dtick, downsample, lttb_indices
+
+
+def _series(n=10000, spike=6123, seed=0):
+    rng = np.random.default_rng(seed)
+    y = np.sin(np.linspace(0, 20, n)) + rng.normal(0, 0.05, n)
+    y[spike] = 25.0
+    return pd.date_range('2020-01-01', periods=n, freq='h'), y
+
+
+@pytest.mark.parametrize('n_out', [3, 10, 500, 2000])
+def test_lttb_keeps_endpoints_and_isolated_spike(n_out):
+    x, y = _series()
+    indices = lttb_indices(x, y, n_out)
+    assert len(indices) == n_out
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert (np.diff(indices) > 0).all()
+    assert 6123 in indices
+
+
+def test_lttb_keeps_spike_on_numeric_and_negative_series():
+    x, y = _series(spike=17)
+    indices = lttb_indices(np.arange(len(y)), -y, 100)
+    assert 17 in indices and indices[0] == 0 and indices[-1] == len(y) - 1
+
+
+def test_short_series_are_not_downsampled():
+    x, y = _series(n=50, spike=3)
+    assert lttb_indices(x, y, 50).tolist() == list(range(50))
+    assert lttb_indices(x, y, 2).tolist() == list(range(50))
+
+
+def test_downsample_retains_keep_indices():
+    x, y = _series()
+    kept_x, kept_y = downsample(x, y, max_points=100, keep=[1, 4242])
+    assert len(kept_x) <= 102
+    assert {x[1], x[4242]} <= set(kept_x) and y[4242] in kept_y
+    assert (np.diff(kept_x.astype(np.int64)) > 0).all()
+
+
+def test_date_dtick_bounds_tick_count():
+    assert date_dtick(pd.date_range('2020-01-01', periods=10, freq='h')) == 3600 * 1000
+    assert date_dtick(pd.date_range('2020-01-01', periods=60, freq='D')) == 7 * 86400 * 1000
+    assert date_dtick(pd.date_range('2000-01-01', '2050-01-01', freq='YS')) == 'M36'
@@ -0,0 +1,72 @@
+# tests/test_engagement.py
+import numpy as np
+import pandas as pd
+import pytest
+from utils.engagement import audience_overlap, build_engagement, user_activity_stats
+
+COLUMNS = ['post_id', 'post_owner', 'post_score', 'comment_owner', 'comment_score', 'gpt_score']
+FILES = {
+    'China': [
+        ('p1', 'alice', 10, 'bob', 3, 'POLITICAL'),
+        ('p1', 'alice', 10, 'carol', -1, 'POLITICAL'),
+        ('p1', 'alice', 10, 'bob', 5, 'POLITICAL'),
+        ('p2', 'bob', 4, 'alice', 2, 'CULTURAL'),
+        ('p2', 'bob', 4, None, 0, 'CULTURAL'),
+    ],
+    'Taiwan': [
+        ('p3', 'dave', 7, 'bob', 1, 'OTHER'),
+        ('p3', 'dave', 7, 'alice', 4, 'OTHER'),
+        ('p4', None, 1, 'dave', 6, None),
+    ],
+}
+
+
+@pytest.fixture
+def engagement(tmp_path):
+    paths = {}
+    for subreddit, rows in FILES.items():
+        paths[subreddit] = tmp_path / f'{subreddit}.csv'
+        pd.DataFrame(rows, columns=COLUMNS).to_csv(paths[subreddit], index=False)
+    # Two rows per chunk, so p1 and p2 span chunk boundaries
+    return build_engagement(paths, chunksize=2)
+
+
+def test_engagement_matrices_match_hand_built_example(engagement):
+    users = list(engagement['users'])
+    assert sorted(users) == ['alice', 'bob', 'carol', 'dave']
+    order = [users.index(user) for user in ['alice', 'bob', 'carol', 'dave']]
+
+    # Comments plus each post once, per subreddit (China, Taiwan)
+    assert engagement['user_subreddit'].toarray()[order].tolist() == [[2, 1], [3, 1], [1, 0], [0, 2]]
+    # POLITICAL, CULTURAL, OTHER; dave's comment on the unlabelled p4 has no category
+    assert engagement['user_category'].toarray()[order].tolist() == [[1, 1, 1], [2, 1, 1], [1, 0, 0], [0, 0, 1]]
+    assert len(engagement['comments']['user']) == 7 and len(engagement['posts']['user']) == 3
+
+
+def test_user_activity_stats(engagement):
+    stats = user_activity_stats(engagement).loc[['alice', 'bob', 'carol', 'dave']]
+    assert stats['n_comments'].tolist() == [2, 3, 1, 1]
+    assert stats['n_posts'].tolist() == [1, 1, 0, 1]
+    assert stats['n_subreddits'].tolist() == [2, 2, 1, 1]
+    np.testing.assert_allclose(stats['score_mean'], [3, 3, -1, 6])
+    np.testing.assert_allclose(stats['score_std'], [1, np.sqrt(8 / 3), 0, 0])
+    np.testing.assert_allclose(stats['score_max'], [4, 5, -1, 6])
+    np.testing.assert_allclose(stats['score_total'], [6, 9, -1, 6])
+    assert stats['activity_China'].tolist() == [2, 3, 1, 0]
+    np.testing.assert_allclose(stats['share_political'], [1 / 3, 0.5, 1, 0])
+    np.testing.assert_allclose(stats['share_other'], [1 / 3, 0.25, 0, 1])
+
+
+def test_audience_overlap_jaccard(engagement):
+    # China: {alice, bob, carol}, Taiwan: {alice, bob, dave}
+    np.testing.assert_allclose(audience_overlap(engagement).to_numpy(), [[1, 0.5], [0.5, 1]])
+    # At least two events: China {alice, bob}, Taiwan {dave}
+    np.testing.assert_allclose(audience_overlap(engagement, min_activity=2).to_numpy(), [[1, 0], [0, 1]])
+
+    # POLITICAL {alice, bob, carol}, CULTURAL {alice, bob}, OTHER {alice, bob, dave}
+    overlap = audience_overlap(engagement, by='category')
+    assert list(overlap.index) == ['POLITICAL', 'CULTURAL', 'OTHER']
+    np.testing.assert_allclose(overlap.to_numpy(), [[1, 2 / 3, 0.5], [2 / 3, 1, 2 / 3], [0.5, 2 / 3, 1]])
+
+    with pytest.raises(ValueError):
+        audience_overlap(engagement, by='user')
@@ -0,0 +1,88 @@
+# tests/test_estimation.py
+import numpy as np
+import pandas as pd
+import pytest
+from config.settings import CATEGORIES
+from utils.estimation import StratifiedEstimator, assign_strata
+
+
+def _population(n_posts=2000, seed=0):
+    """Posts whose POLITICAL share rises with post_score, with an oracle labeller."""
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 1000, n_posts)
+    political = rng.random(n_posts) < 0.1 + 0.6 * scores / 1000
+    cultural = ~political & (rng.random(n_posts) < 0.5)
+    labels = np.where(political, 'POLITICAL', np.where(cultural, 'CULTURAL', 'OTHER'))
+    posts = pd.DataFrame({'post_title': [f'title {i}' for i in range(n_posts)],
+                          'post_body': [f'post {i}' for i in range(n_posts)],
+                          'post_score': scores, 'subreddit': 'China'})
+    oracle = dict(zip(posts['post_body'], labels))
+    return posts, oracle, pd.Series(labels).value_counts(normalize=True).reindex(CATEGORIES, fill_value=0)
+
+
+def _estimator(posts, label_fn, **kwargs):
+    return StratifiedEstimator(posts, assign_strata(posts, ('score_band',), score_bands=4), label_fn,
+                               max_workers=1, **kwargs)
+
+
+def test_intervals_cover_the_true_shares():
+    posts, oracle, truth = _population()
+    covered = []
+    for seed in range(40):
+        estimator = _estimator(posts, oracle.get, target_half_width=0.05, seed=seed)
+        estimate = estimator.run()
+        assert estimate['half_width'].max() <= 0.05
+        assert estimator.n_calls < len(posts)
+        covered.append(((estimate['ci_low'] <= truth) & (truth <= estimate['ci_high'])).to_numpy())
+    # Nominal 95% per category; allow for the normal approximation and 40 runs
+    assert np.mean(covered, axis=0).min() >= 0.85
+
+
+@pytest.mark.parametrize('budget', [3, 25, 101])
+def test_budget_is_never_exceeded(budget):
+    posts, oracle, _ = _population(500)
+    estimator = _estimator(posts, oracle.get, target_half_width=0.001, budget=budget)
+    estimator.run()
+    assert estimator.n_calls <= budget
+    assert estimator.n_calls == estimator.n_labelled
+
+
+def test_failing_label_fn_terminates():
+    posts, _, _ = _population(300)
+
+    def label_fn(text):
+        raise RuntimeError('LLM unavailable')
+
+    estimator = _estimator(posts, label_fn, batch_size=50)
+    estimate = estimator.run()
+    assert estimator.n_labelled == 0
+    assert estimator.n_calls == len(posts)
+    assert (estimate['proportion'] == 0).all()
+
+    budgeted = _estimator(posts, label_fn, budget=40)
+    budgeted.run()
+    assert budgeted.n_calls == 40
+
+
+def test_allocate_follows_neyman_and_hands_out_the_remainder():
+    posts, oracle, _ = _population(400)
+    strata = np.repeat(['a', 'b', 'c'], [100, 100, 200])
+    estimator = StratifiedEstimator(posts, strata, oracle.get, max_workers=1)
+    # Identical label mixes, so the allocation is proportional to stratum size
+    estimator.counts[:] = [10, 10, 10]
+    allocation = estimator.allocate(40)
+    assert allocation.tolist() == [10, 10, 20]
+
+    # A stratum with no variability gets less than its share of the sample
+    estimator.counts[0] = [30, 0, 0]
+    allocation = estimator.allocate(40)
+    assert allocation.sum() == 40 and allocation[0] < allocation[1] < allocation[2]
+
+    # The remainder goes out one label at a time by largest fractional part
+    estimator.counts[:] = [10, 10, 10]
+    assert estimator.allocate(7).tolist() == [2, 2, 3]
+
+    # Strata already past their Neyman share wait; none is asked for more posts than it has left
+    estimator.drawn[:] = [99, 0, 200]
+    assert estimator.allocate(50).tolist() == [0, 50, 0]
+    assert estimator.allocate(1000).tolist() == [1, 100, 0]
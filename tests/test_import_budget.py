@@ -0,0 +1,43 @@
+# tests/test_import_budget.py
+# The compute layer must stay importable without the plotting stack.
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ('matplotlib', 'plotly', 'sklearn.manifold')
+# What utils.analysis needs anyway; it is imported first so the budget covers
+# only the repo's own modules and anything they add on top
+NUMERIC_STACK = 'import numpy, pandas, scipy.sparse, sklearn.feature_extraction.text, sklearn.preprocessing'
+IMPORT_ANALYSIS_BUDGET_US = 150_000
+
+
+def _run(code, *flags):
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def _loaded_heavy_modules(statement):
+    code = f"import sys\n{statement}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return _run(code).stdout.strip()
+
+
+def test_import_utils_loads_no_plotting_modules():
+    assert _loaded_heavy_modules('import utils') == ''
+
+
+def test_import_analysis_loads_no_plotting_modules():
+    assert _loaded_heavy_modules('import utils.analysis') == ''
+
+
+def test_import_analysis_within_budget():
+    # -X importtime reports "self | cumulative | module" per import on stderr
+    stderr = _run(f'{NUMERIC_STACK}\nimport utils.analysis', '-X', 'importtime').stderr
+    cumulative = [int(line.split('|')[1]) for line in stderr.splitlines()
+                  if line.startswith('import time:') and line.split('|')[2].strip() == 'utils.analysis']
+    assert cumulative, stderr
+    # matplotlib.pyplot alone takes several times this budget
+    assert cumulative[0] < IMPORT_ANALYSIS_BUDGET_US
+
+
+def test_lazy_compute_export_loads_no_plotting_modules():
+    assert _loaded_heavy_modules('import utils\nutils.generate_tfidf_matrix') == ''
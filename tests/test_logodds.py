@@ -0,0 +1,54 @@
+# tests/test_logodds.py
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import utils.logodds
+from utils.logodds import compare_subreddits, dirichlet_prior, log_odds, term_count_matrices
+
+
+def test_log_odds_matches_hand_computed_example():
+    # y_a = (3, 1), y_b = (1, 3), alpha = (1, 1): n = 4, alpha_0 = 2, so for the first term
+    # delta = log(4/2) - log(2/4) = log 4 and var = 1/4 + 1/2
+    delta, z = log_odds(np.array([3.0, 1.0]), np.array([1.0, 3.0]), np.array([1.0, 1.0]))
+    np.testing.assert_allclose(delta, [np.log(4), -np.log(4)])
+    np.testing.assert_allclose(z, [np.log(4) / np.sqrt(0.75), -np.log(4) / np.sqrt(0.75)])
+
+
+def test_compare_subreddits_matches_hand_computed_example():
+    counts = {'a': sp.csr_matrix([[2, 0], [1, 1]]), 'b': sp.csr_matrix([[0, 2], [1, 1]])}
+    np.testing.assert_allclose(dirichlet_prior(counts), [4.0, 4.0])
+    np.testing.assert_allclose(dirichlet_prior(counts, prior_size=2), [1.0, 1.0])
+
+    table = compare_subreddits(counts, ['trade', 'army'], prior_size=2, n_boot=0)[('a', 'b')]
+    assert table.index.tolist() == ['trade', 'army']
+    assert table['count_a'].tolist() == [3, 1] and table['count_b'].tolist() == [1, 3]
+    np.testing.assert_allclose(table['delta'], [np.log(4), -np.log(4)])
+    np.testing.assert_allclose(table['z'], [np.log(4) / np.sqrt(0.75), -np.log(4) / np.sqrt(0.75)])
+
+
+@pytest.fixture
+def counts(monkeypatch):
+    monkeypatch.setattr(utils.logodds, 'english_stopwords', lambda: ['the', 'and', 'of'])
+    rng = np.random.default_rng(0)
+    words = np.array([f'term{i}' for i in range(20)])
+    # Subreddit a favours the first terms, b the last ones
+    texts = {name: [' '.join(rng.choice(words, 12, p=weights / weights.sum())) for _ in range(60)]
+             for name, weights in [('a', np.linspace(3, 1, 20)), ('b', np.linspace(1, 3, 20))]}
+    return term_count_matrices(texts)
+
+
+def test_bootstrap_intervals_contain_point_estimate(counts):
+    counts, feature_names = counts
+    table = compare_subreddits(counts, feature_names, n_boot=400, max_workers=1)[('a', 'b')]
+    assert (table['ci_low'] < table['ci_high']).all()
+    assert ((table['ci_low'] <= table['delta']) & (table['delta'] <= table['ci_high'])).all()
+    assert table['z'].is_monotonic_decreasing
+    assert set(table.index[:3]) <= {f'term{i}' for i in range(10)}
+    assert set(table.index[-3:]) <= {f'term{i}' for i in range(10, 20)}
+
+
+def test_bootstrap_does_not_depend_on_worker_count(counts):
+    counts, feature_names = counts
+    serial = compare_subreddits(counts, feature_names, n_boot=120, max_workers=1)[('a', 'b')]
+    parallel = compare_subreddits(counts, feature_names, n_boot=120, max_workers=2)[('a', 'b')]
+    np.testing.assert_allclose(parallel[['ci_low', 'ci_high']], serial[['ci_low', 'ci_high']])
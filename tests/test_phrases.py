@@ -0,0 +1,43 @@
+# tests/test_phrases.py
+import numpy as np
+from utils.phrases import PhraseDetector
+
+
+def _texts(n_docs=400, seed=0):
+    rng = np.random.default_rng(seed)
+    filler = [f'word{i}' for i in range(50)] + ['of', 'us']
+    texts = []
+    for i in range(n_docs):
+        tokens = list(rng.choice(filler, 8))
+        if i % 4 == 0:
+            tokens.insert(int(rng.integers(0, 8)), 'xi jinping')
+        texts.append(' '.join(tokens))
+    return texts
+
+
+def test_short_word_phrase_is_detected_and_kept():
+    texts = _texts()
+    detector = PhraseDetector(max_n=2, min_count=5, min_token_len=3, width=2 ** 12).fit([texts[:200], texts[200:]])
+    assert ('xi', 'jinping') in detector.phrases()
+
+    merged = detector.transform(['xi jinping of us visit word1'])
+    assert merged == ['xi_jinping visit word1']
+
+
+def test_vocabulary_past_the_id_space_is_bounded():
+    # 20,000 distinct filler tokens in an id space of 2 ** 10
+    rng = np.random.default_rng(1)
+    detector = PhraseDetector(max_n=3, min_count=20, max_candidates=50, width=2 ** 12, id_bits=10)
+    for chunk in range(20):
+        texts = []
+        for i in range(500):
+            tokens = [f'rare{k}' for k in rng.integers(0, 20000, 6)]
+            if i % 5 == 0:
+                tokens.insert(3, 'hong kong')
+            texts.append(' '.join(tokens))
+        detector.partial_fit(texts)
+
+    assert len(detector.unigram_counts) == 2 ** 10
+    assert len(detector.names) <= 3 * 2 * detector.max_candidates
+    assert ('hong', 'kong') in detector.phrases()
+    assert detector.transform(['visit hong kong today']) == ['visit hong_kong today']
@@ -0,0 +1,56 @@
+# tests/test_pipeline.py
+import json
+import time
+import pandas as pd
+import utils.pipeline
+from models import GPTClassifier, RedditScraper
+from utils.pipeline import IngestionService, Stage
+from utils.stub_server import start_stub_server
+
+
+def test_throughput_is_rated_over_uptime():
+    stage = Stage('double', lambda item: [item * 2], throughput_window=60)
+    stage.start()
+    for item in range(20):
+        stage.put(item)
+    time.sleep(0.5)
+    metrics = stage.metrics()
+    stage.stop()
+    stage.join()
+    assert metrics['processed'] == 20
+    # 20 items in about half a second, not 20 / 60
+    assert metrics['throughput_per_s'] > 10
+
+
+def test_service_runs_end_to_end_on_stub_server(monkeypatch, tmp_path):
+    # NLTK data is not needed to exercise the stages; the pool is forked after patching
+    monkeypatch.setattr(utils.pipeline, 'preprocess_text', lambda text: text.lower())
+    monkeypatch.setattr(utils.pipeline, 'english_stopwords', lambda: ['the', 'and', 'of', 'on', 'in'])
+    server, base_url = start_stub_server(post_interval=0.2, comments_per_post=2)
+    scraper = RedditScraper('test-agent', base_url=base_url, rate_limit_delay=0)
+    classifier = GPTClassifier('test-key', base_url=base_url + '/v1', max_retries=1)
+    service = IngestionService(scraper, classifier, ['China'], str(tmp_path), poll_interval=0.5,
+                               checkpoint_interval=1, workers={'comments': 2, 'classify': 2, 'preprocess': 1},
+                               refit_interval=5)
+    try:
+        service.start()
+        time.sleep(4)
+        metrics = service.metrics()
+    finally:
+        service.stop(timeout=10)
+        server.shutdown()
+
+    posts = pd.read_csv(tmp_path / 'China_posts.csv')
+    comments = pd.read_csv(tmp_path / 'China_scored_pnc_df.csv')
+    assert len(posts) >= 5 and posts['post_id'].is_unique
+    assert set(posts['gpt_score']) <= {'POLITICAL', 'CULTURAL', 'OTHER'}
+    assert posts['processed_text'].str.len().gt(0).all()
+    assert posts['top_terms'].notna().any()
+    assert set(comments['post_id']) <= set(posts['post_id'])
+
+    with open(tmp_path / 'checkpoint.json') as f:
+        seen = json.load(f)['seen']['China']
+    assert set(seen) == set(posts['post_id'])
+    assert (tmp_path / 'analysis_state.pkl').exists()
+    assert all(stage['errors'] == 0 for stage in metrics['stages'].values())
+    assert metrics['stages']['score']['throughput_per_s'] > 0
@@ -0,0 +1,57 @@
+# tests/test_propagation.py
+import numpy as np
+import pandas as pd
+from config.settings import CATEGORIES
+from utils.propagation import LabelPropagation
+
+
+def _comments(n_posts=30, n_comments=600, seed=0):
+    rng = np.random.default_rng(seed)
+    post = rng.integers(0, n_posts, n_comments)
+    rows = []
+    for i, p in enumerate(post):
+        # Reply to an earlier comment on the same post about half the time
+        earlier = [j for j in range(i) if post[j] == p]
+        parent = f'c{rng.choice(earlier)}' if earlier and rng.random() < 0.5 else f'p{p}'
+        rows.append({'post_id': f'p{p}', 'comment_id': f'c{i}', 'parent_id': parent,
+                     'comment_owner': f'u{rng.integers(0, 80)}', 'post_owner': f'owner{p % 10}',
+                     'gpt_score': CATEGORIES[p % len(CATEGORIES)]})
+    return pd.DataFrame(rows)
+
+
+def test_converges_to_the_closed_form_solution():
+    df = _comments()
+    model = LabelPropagation(alpha=0.8, tol=1e-6).fit(df)
+    assert model.n_iter_ < model.max_iter
+
+    blocks, S, Y = model._graph(df)
+    # Fixed point of F = alpha S F + (1 - alpha) Y
+    expected = (1 - model.alpha) * np.linalg.solve(np.eye(S.shape[0]) - model.alpha * S.toarray(), Y)
+    np.testing.assert_allclose(model.scores_, expected, atol=1e-4)
+
+    posts = model.post_labels()
+    assert posts['label'].tolist() == [CATEGORIES[int(post[1:]) % len(CATEGORIES)] for post in posts.index]
+    comments = model.comment_labels()
+    assert comments.index.equals(df.index)
+    np.testing.assert_allclose(comments[CATEGORIES].sum(axis=1), 1, rtol=1e-5)
+
+
+def test_warm_start_takes_fewer_iterations():
+    df = _comments()
+    fresh = LabelPropagation().fit(df)
+
+    warm = LabelPropagation().fit(df)
+    warm.fit(df)
+    assert warm.n_iter_ == 1
+    np.testing.assert_allclose(warm.scores_, fresh.scores_, atol=1e-5)
+
+    # A scrape that adds a few comments starts from the previous scores
+    grown = pd.concat([df, _comments(n_comments=620, seed=0)[600:]], ignore_index=True)
+    cold = LabelPropagation().fit(grown)
+    warm.fit(grown)
+    assert warm.n_iter_ < cold.n_iter_
+    np.testing.assert_allclose(warm.scores_, cold.scores_, atol=1e-4)
+
+    cold_again = LabelPropagation().fit(df)
+    cold_again.fit(grown, warm_start=False)
+    assert cold_again.n_iter_ == cold.n_iter_
@@ -0,0 +1,42 @@
+# tests/test_rendering.py
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+import pytest
+from utils.rendering import render_charts, term_space_chart_spec, timeseries_chart_specs
+
+
+def _specs():
+    dates = pd.date_range('2024-01-01', periods=90, freq='D')
+    rng = np.random.default_rng(0)
+    terms = pd.DataFrame({'term': ['trade', 'tariff', 'food', 'music'], 'category': ['P', 'P', 'C', 'C']})
+    counts = {term: rng.poisson(5, len(dates)).tolist() for term in terms['term']}
+    specs = timeseries_chart_specs(dates, counts, terms, 'China')
+    vectors = {'China': [0.8, 0.2], 'Sino': [0.3, 0.6], 'HongKong': [0.5, 0.5]}
+    return specs + [term_space_chart_spec(vectors, 'trade', 'food')]
+
+
+def test_render_charts_writes_one_file_per_spec_and_format(tmp_path):
+    specs = _specs()
+    assert [spec['name'] for spec in specs] == ['China_political_terms', 'China_cultural_terms',
+                                                'China_grouped_terms', 'term_space_trade_food']
+
+    paths = render_charts(specs, tmp_path, formats=('png', 'svg', 'html'), figsize=(6, 3), dpi=50, max_workers=2)
+    assert paths == [os.path.join(tmp_path, f"{spec['name']}.{fmt}") for spec in specs for fmt in ('png', 'svg', 'html')]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths)
+
+    for path in paths:
+        if path.endswith('.png'):
+            with open(path, 'rb') as f:
+                assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+        elif path.endswith('.svg'):
+            assert ET.parse(path).getroot().tag == '{http://www.w3.org/2000/svg}svg'
+        else:
+            with open(path, encoding='utf-8') as f:
+                assert 'Plotly.newPlot' in f.read()
+
+
+def test_render_charts_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError, match='Unsupported formats'):
+        render_charts(_specs(), tmp_path, formats=('png', 'pdf'), max_workers=1)
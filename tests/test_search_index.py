@@ -0,0 +1,105 @@
+# tests/test_search_index.py
+import numpy as np
+import pandas as pd
+import pytest
+import utils.search_index
+from utils.corpus import TokenCorpus
+from utils.search_index import InvertedIndex, vbyte_decode, vbyte_encode
+
+WORDS = [f'w{i}' for i in range(12)]
+
+
+def _contains(tokens, phrase):
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+# query -> predicate on a document's tokens
+QUERIES = {
+    'w1': lambda d: 'w1' in d,
+    '"w1 w2"': lambda d: _contains(d, ['w1', 'w2']),
+    'w1 AND w2': lambda d: 'w1' in d and 'w2' in d,
+    'w1 w2': lambda d: 'w1' in d and 'w2' in d,
+    'w1 OR w3': lambda d: 'w1' in d or 'w3' in d,
+    'w1 AND NOT w2': lambda d: 'w1' in d and 'w2' not in d,
+    'NOT w4': lambda d: 'w4' not in d,
+    '(w1 OR w2) AND NOT "w3 w4"': lambda d: ('w1' in d or 'w2' in d) and not _contains(d, ['w3', 'w4']),
+    'w5 OR w6 w7': lambda d: 'w5' in d or ('w6' in d and 'w7' in d),
+    '"w2 w3 w2"': lambda d: _contains(d, ['w2', 'w3', 'w2']),
+    'unknown OR w8': lambda d: 'w8' in d,
+}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(utils.search_index, 'preprocess_text', lambda text: text.lower())
+    rng = np.random.default_rng(0)
+    n_docs = 400
+    texts = [' '.join(rng.choice(WORDS, rng.integers(0, 12))) for _ in range(n_docs)]
+    metadata = pd.DataFrame({
+        'post_id': [f'p{i}' for i in range(n_docs)],
+        'subreddit': rng.choice(['a', 'b', 'c'], n_docs),
+        # Unsorted, with ties, so the index has to reorder documents by time
+        'timestamp': rng.integers(0, 30, n_docs) * 86400,
+    })
+    return InvertedIndex(TokenCorpus.from_texts(texts, metadata))
+
+
+def _brute_force(index, predicate, subreddit=None, start=None, end=None):
+    metadata = index.corpus.metadata
+    expected = set()
+    for i in range(len(index)):
+        timestamp = pd.Timestamp(metadata['timestamp'].iloc[i], unit='s')
+        if subreddit is not None and metadata['subreddit'].iloc[i] != subreddit:
+            continue
+        if (start is not None and timestamp < pd.Timestamp(start)) or (end is not None and timestamp >= pd.Timestamp(end)):
+            continue
+        if predicate(index.corpus.document(i)):
+            expected.add(metadata['post_id'].iloc[i])
+    return expected
+
+
+@pytest.mark.parametrize('values', [[], [0], [0, 1, 127, 128, 255, 16383, 16384, 2 ** 40, 2 ** 63 - 1],
+                                    list(range(1000))])
+def test_vbyte_round_trip(values):
+    data, nbytes = vbyte_encode(values)
+    assert data.dtype == np.uint8 and nbytes.sum() == len(data)
+    assert vbyte_decode(data).tolist() == values
+
+
+def test_postings_and_positions_round_trip(index):
+    corpus = index.corpus
+    doc_ids = corpus.doc_ids()
+    token_positions = np.arange(len(corpus.tokens)) - np.asarray(corpus.offsets)[doc_ids]
+    for term_id in range(len(corpus.vocabulary)):
+        hits = np.flatnonzero(np.asarray(corpus.tokens) == term_id)
+        docs, positions = index.positions(term_id)
+        assert docs.tolist() == doc_ids[hits].tolist()
+        assert positions.tolist() == token_positions[hits].tolist()
+
+        posting_docs, tf = index.postings(term_id)
+        unique, counts = np.unique(doc_ids[hits], return_counts=True)
+        assert posting_docs.tolist() == unique.tolist() and tf.tolist() == counts.tolist()
+
+
+@pytest.mark.parametrize('query', list(QUERIES))
+@pytest.mark.parametrize('filters', [{}, {'subreddit': 'b'}, {'start': '1970-01-05', 'end': '1970-01-20'},
+                                     {'subreddit': 'a', 'start': '1970-01-10'}])
+def test_search_matches_brute_force(index, query, filters):
+    results = index.search(query, **filters)
+    assert set(results['post_id']) == _brute_force(index, QUERIES[query], **filters)
+    assert results['timestamp'].is_monotonic_increasing
+
+
+@pytest.mark.parametrize('query', ['w1 AND', 'w1 OR', 'NOT', 'w1 AND NOT', '(', '(w1 OR w2', 'w1)', '(w1))',
+                                   '()', 'AND w1', 'w1 OR OR w2'])
+def test_malformed_query_raises(index, query):
+    with pytest.raises(ValueError, match='Malformed query'):
+        index.search(query)
+
+
+def test_save_and_load(index, tmp_path):
+    index.save(tmp_path / 'index')
+    loaded = InvertedIndex.load(tmp_path / 'index')
+    for query in QUERIES:
+        pd.testing.assert_frame_equal(loaded.search(query), index.search(query))
@@ -0,0 +1,88 @@
+# tests/test_sentiment.py
+import numpy as np
+import pandas as pd
+import pytest
+import utils.sentiment
+from utils.sentiment import SentimentScorer, aggregate_sentiment, method_cache_path, score_posts_and_comments
+
+DAY = 86400
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """Stub analyzers scoring text length; returns the list of texts actually analyzed."""
+    analyzed = []
+
+    def make_analyzer(method):
+        def score(text):
+            analyzed.append(text)
+            value = len(text) / 100
+            return (value, 0.1, 0.8, 0.1) if method == 'vader' else (value, 0.5)
+        return score
+
+    monkeypatch.setattr(utils.sentiment, '_make_analyzer', make_analyzer)
+    return analyzed
+
+
+def test_cache_round_trip(analyzed, tmp_path):
+    cache_path = str(tmp_path / 'sentiment.npz')
+    texts = ['good', 'bad', 'good', None, 'fine']
+    scorer = SentimentScorer('vader', cache_path, max_workers=1)
+    first = scorer.score(texts)
+    assert sorted(analyzed) == ['', 'bad', 'fine', 'good']
+    assert first.columns.tolist() == ['compound', 'pos', 'neu', 'neg']
+    assert first['compound'].tolist() == pytest.approx([0.04, 0.03, 0.04, 0.0, 0.04])
+    scorer.save()
+
+    analyzed.clear()
+    reloaded = SentimentScorer('vader', cache_path, max_workers=1)
+    pd.testing.assert_frame_equal(reloaded.score(texts), first)
+    assert analyzed == []
+    reloaded.score(['new text'])
+    assert analyzed == ['new text']
+
+
+def test_methods_do_not_overwrite_each_other(analyzed, tmp_path):
+    cache_path = str(tmp_path / 'sentiment.npz')
+    vader = SentimentScorer('vader', cache_path, max_workers=1)
+    vader.score(['good', 'bad'])
+    vader.save()
+    textblob = SentimentScorer('textblob', cache_path, max_workers=1)
+    assert len(textblob.keys) == 0
+    textblob.score(['other'])
+    textblob.save()
+
+    assert method_cache_path(cache_path, 'vader') != method_cache_path(cache_path, 'textblob')
+    assert len(SentimentScorer('vader', cache_path).keys) == 2
+    assert len(SentimentScorer('textblob', cache_path).keys) == 1
+
+
+def test_aggregate_sentiment(analyzed):
+    df = pd.DataFrame({
+        'post_id': ['a', 'a', 'a', 'b', 'c'],
+        'post_title': ['x' * 10, 'x' * 10, 'x' * 10, 'y' * 20, 'z' * 30],
+        'post_body': [np.nan] * 5,
+        'post_datetime': [0, 0, 0, DAY, DAY + 60],
+        # Post a gets a comment on its own day and two on the next day
+        'comment_datetime': [100, DAY + 100, DAY + 200, DAY + 300, 2 * DAY + 5],
+        'comment_body': ['c' * 2, 'c' * 4, 'c' * 6, 'c' * 8, 'c' * 10],
+        'gpt_score': ['POLITICAL', 'POLITICAL', 'POLITICAL', 'OTHER', 'POLITICAL'],
+    })
+    scored = score_posts_and_comments(df, SentimentScorer('vader', max_workers=1))
+    tables = aggregate_sentiment(scored)
+
+    post = tables['post'].set_index('post_id')
+    assert post['n_comments'].tolist() == [3, 1, 1]
+    assert post['post_sentiment'].tolist() == pytest.approx([0.11, 0.21, 0.31])
+    assert post['comment_sentiment'].tolist() == pytest.approx([0.04, 0.08, 0.10])
+
+    day = tables['day']
+    assert day.index.tolist() == list(pd.to_datetime([0, DAY, 2 * DAY], unit='s'))
+    assert day['posts'].tolist() == [1, 2, 0]
+    assert day['post_sentiment'].iloc[:2].tolist() == pytest.approx([0.11, 0.26])
+    assert day['comments'].tolist() == [1, 3, 1]
+    assert day['comment_sentiment'].tolist() == pytest.approx([0.02, 0.06, 0.10])
+
+    category = tables['category']
+    assert category.loc['POLITICAL', 'posts'] == 2 and category.loc['POLITICAL', 'comments'] == 4
+    assert category.loc['OTHER', 'comment_sentiment'] == pytest.approx(0.08)
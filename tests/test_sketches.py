@@ -0,0 +1,107 @@
+# tests/test_sketches.py
+from collections import Counter
+import numpy as np
+import pandas as pd
+from utils.sketches import CountMinSketch, SpaceSaving, SlidingWindowSketch
+from utils.trends import TrendDetector, burst_peaks
+
+
+def test_count_min_never_undercounts():
+    rng = np.random.default_rng(0)
+    keys = rng.zipf(1.5, 20000).astype(np.uint64)
+    sketch = CountMinSketch(width=2 ** 10, depth=4)
+    for chunk in np.array_split(keys, 7):
+        sketch.update(chunk)
+    unique, counts = np.unique(keys, return_counts=True)
+    estimates = sketch.query(unique)
+    assert (estimates >= counts).all()
+    assert sketch.total == len(keys)
+    # Over-count bound 2N/w holds for the vast majority of keys
+    assert np.mean(estimates - counts <= 2 * len(keys) / sketch.width) > 0.9
+
+
+def test_count_min_merge_equals_joint_update():
+    a, b, joint = (CountMinSketch(width=2 ** 8, depth=3, seed=1) for _ in range(3))
+    a.update(np.arange(100, dtype=np.uint64))
+    b.update(np.arange(50, 150, dtype=np.uint64), 2)
+    joint.update(np.arange(100, dtype=np.uint64))
+    joint.update(np.arange(50, 150, dtype=np.uint64), 2)
+    np.testing.assert_array_equal(a.merge(b).table, joint.table)
+
+
+def test_space_saving_tracks_heavy_hitters():
+    rng = np.random.default_rng(0)
+    stream = [f'term{k}' for k in rng.zipf(1.3, 20000)]
+    summary = SpaceSaving(capacity=50)
+    summary.update_many(stream)
+    true_counts = Counter(stream)
+    tracked = {key: (count, error) for key, count, error in summary.top()}
+    for key, count in true_counts.items():
+        if count > len(stream) / summary.capacity:
+            assert key in tracked
+    for key, (count, error) in tracked.items():
+        assert count - error <= true_counts[key] <= count
+
+
+def test_sliding_window_expires_old_buckets():
+    window = SlidingWindowSketch(window=3, width=2 ** 8)
+    key = np.array([7], dtype=np.uint64)
+    for _ in range(5):
+        window.add(key, 2)
+        window.advance()
+    window.add(key, 5)
+    assert window.window_counts(key)[0] == 6
+    assert window.window_counts(key, include_current=True)[0] == 11
+    assert window.completed_in_window == 3
+
+
+def test_steady_rate_is_not_a_burst():
+    detector = TrendDetector(record=5)
+    for hour in range(14 * 24 + 1):
+        for i in range(10):
+            detector.update('China', hour * 3600 + i, 'china')
+        if hour in (2, 48, 14 * 24):
+            scores = detector.burst_scores('China', ['china'])
+            assert abs(scores.loc[0, 'score']) < 0.5
+    assert detector.bursts().empty
+
+
+def test_spike_is_a_burst():
+    detector = TrendDetector(record=5)
+    for hour in range(200):
+        for i in range(60 if hour in (150, 151, 152) else 10):
+            detector.update('China', hour * 3600 + i, 'china')
+    bursts = detector.bursts()
+    assert not bursts.empty
+    # Spike hours are 150-152 (day 6, 06:00-08:00); the window sum crosses the threshold
+    # on the second spike hour and the spike leaves the window after 24 buckets
+    assert bursts['time'].min() == np.datetime64('1970-01-07T07:00')
+    assert bursts['time'].max() <= np.datetime64('1970-01-08T06:00')
+
+
+def _spiked_detector(spikes):
+    """Hourly stream of 'china' and 'trade'; spikes maps hour -> extra mentions of terms."""
+    detector = TrendDetector(record=5)
+    for hour in range(300):
+        texts = ['china trade'] * 10 + [' '.join(terms) for terms in spikes.get(hour, [])]
+        for i, text in enumerate(texts):
+            detector.update('China', hour * 3600 + i, text)
+    return detector
+
+
+def test_burst_onset_and_peaks():
+    # One event at hour 150 (1970-01-07 06:00) in two terms, a weaker one at hour 250
+    spikes = {150: [['china', 'trade']] * 100, 151: [['china', 'trade']] * 100, 250: [['trade']] * 120}
+    bursts = _spiked_detector(spikes).bursts()
+    first = bursts[bursts['time'] < np.datetime64('1970-01-10')]
+    assert (first['onset'] == np.datetime64('1970-01-07T06:00')).all()
+    assert first['time'].max() > np.datetime64('1970-01-07T20:00')
+
+    dates = pd.date_range('1970-01-01', periods=14, freq='D')
+    peaks = burst_peaks(bursts, dates, n_peaks=2, n_terms=2)
+    assert len(peaks) == 2
+    assert peaks[0][0] == 6 and sorted(peaks[0][1]) == ['china', 'trade']
+    # Hour 250 is 1970-01-11 10:00, annotated on that day rather than the next tick
+    assert peaks[1] == (10, ['trade'])
+    hourly = pd.date_range('1970-01-01', periods=300, freq='h')
+    assert [idx for idx, _ in burst_peaks(bursts, hourly)] == [150, 250]
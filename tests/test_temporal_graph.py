@@ -0,0 +1,72 @@
+# tests/test_temporal_graph.py
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+from utils.temporal_graph import TemporalGraph
+
+DAY = 86400
+GEXF = {'g': 'http://gexf.net/1.3'}
+
+
+def _edges():
+    # Unsorted on purpose; the graph orders edges by time
+    return pd.DataFrame({
+        'Source': ['a', 'b', 'c', 'a', 'd', 'e', 'a', 'b'],
+        'Target': ['b', 'a', 'a', 'b', 'e', 'd', 'c', 'c'],
+        'Time': np.array([2, 0, 1, 3, 3.5, 6, 8, 9]) * DAY,
+        'Score': [1, -2, 3, 4, 5, 6, 7, 8],
+        'Label': ['POLITICAL', 'CULTURAL', 'POLITICAL', 'OTHER', 'POLITICAL', None, 'CULTURAL', 'POLITICAL'],
+    })
+
+
+def _brute_force(edges, start, end):
+    window = edges[(edges['Time'] >= start) & (edges['Time'] < end)]
+    degree = pd.concat([window['Source'], window['Target']]).value_counts()
+    return window, degree
+
+
+def test_sliding_window_matches_brute_force():
+    edges = _edges()
+    graph = TemporalGraph(edges)
+    # Overlapping steps, a jump past the previous window and a move backwards
+    for start, end in [(0, 3), (1, 4), (2, 5), (3, 7), (8, 10), (0, 10), (1, 2), (4, 5)]:
+        graph.advance_to(start * DAY, end * DAY)
+        window, degree = _brute_force(edges, start * DAY, end * DAY)
+        metrics = graph.window_metrics()
+        assert metrics['edges'] == len(window)
+        assert metrics['active_users'] == len(degree)
+        assert {graph.users[i]: d for i, d in enumerate(graph.degree) if d} == degree.to_dict()
+        assert metrics['political_share'] == (window['Label'] == 'POLITICAL').sum() / max(len(window), 1)
+
+
+def test_window_metrics_on_small_edge_list():
+    metrics = TemporalGraph(_edges()).metrics(window='4D', step='2D')
+    assert metrics['start'].tolist() == [pd.Timestamp(day * DAY, unit='s') for day in [0, 2, 4, 6, 8]]
+    assert metrics['edges'].tolist() == [5, 3, 1, 3, 2]
+    assert metrics['active_users'].tolist() == [5, 4, 2, 5, 3]
+    # Days 0-4: {a, b, c} and {d, e}; days 2-6: a-b and d-e only; days 6-10: {a, b, c} and {d, e}
+    assert metrics['largest_component'].tolist() == [3, 2, 2, 3, 3]
+    assert metrics['max_degree'].tolist() == [4, 2, 1, 2, 2]
+
+
+def test_gexf_export_parses(tmp_path):
+    paths = TemporalGraph(_edges()).export_gexf(tmp_path, window='4D', step='4D')
+    assert [path.rsplit('_', 2)[-2] for path in paths] == ['19700101', '19700105', '19700109']
+
+    root = ET.parse(paths[0]).getroot()
+    graph = root.find('g:graph', GEXF)
+    assert graph.get('mode') == 'dynamic'
+    labels = {node.get('id'): node.get('label') for node in graph.iterfind('g:nodes/g:node', GEXF)}
+    assert sorted(labels.values()) == ['a', 'b', 'c', 'd', 'e']
+
+    edges = {}
+    for edge in graph.iterfind('g:edges/g:edge', GEXF):
+        values = {value.get('for'): value.get('value') for value in edge.iterfind('g:attvalues/g:attvalue', GEXF)}
+        edges[(labels[edge.get('source')], labels[edge.get('target')])] = (edge.get('weight'), values)
+        assert edge.get('start') == '1970-01-01T00:00:00' and edge.get('end') == '1970-01-05T00:00:00'
+    # The two a -> b replies collapse into one weighted edge
+    assert set(edges) == {('a', 'b'), ('b', 'a'), ('c', 'a'), ('d', 'e')}
+    weight, values = edges[('a', 'b')]
+    assert weight == '2' and float(values['score']) == 5
+    assert (values['political'], values['cultural'], values['other']) == ('1', '0', '1')
+    assert float(edges[('b', 'a')][1]['score']) == -2
@@ -0,0 +1,72 @@
+# tests/test_text_processor.py
+import pytest
+import utils.analysis
+import utils.text_processor
+from utils.agreement import preprocessing_agreement
+from utils.text_processor import LEMMA_CACHE_SIZE, _lemma, preprocess_text
+
+STOP_WORDS = {'the', 'a', 'and', 'of', 'to', 'in', 'is', 'are', 'on', 'i'}
+TEXTS = [
+    "The protests in Hong Kong are growing!!! See https://example.com/news",
+    "Xi Jinping visited 3 cities and talked about trade policies.",
+    "I am running to the night markets, eating dumplings & drinking tea",
+    "Taiwan's elections: voters queued for hours in the rain.",
+    "",
+    None,
+    "Cats chasing cats chasing mice",
+]
+
+
+class _Lemmatizer:
+    def lemmatize(self, word, pos='n'):
+        if pos == 'v' and word.endswith('ing'):
+            return word[:-3]
+        return word[:-1] if word.endswith('s') and len(word) > 3 else word
+
+
+def _context_free_tag(tokens):
+    return [(token, 'VBG' if token.endswith('ing') else 'NN') for token in tokens]
+
+
+def _context_tag(tokens):
+    # 'chasing' is a verb only after a noun, so tagging it alone differs
+    return [(token, 'VBG' if token.endswith('ing') and i and tokens[i - 1] == 'cats' else 'NN')
+            for i, token in enumerate(tokens)]
+
+
+@pytest.fixture
+def stub_nltk(monkeypatch):
+    def install(tag):
+        monkeypatch.setattr(utils.text_processor, '_nltk_pipeline',
+                            lambda: (str.split, tag, _Lemmatizer(), STOP_WORDS))
+        _lemma.cache_clear()
+
+    monkeypatch.setattr(utils.analysis, 'english_stopwords', lambda: sorted(STOP_WORDS))
+    yield install
+    _lemma.cache_clear()
+
+
+@pytest.mark.parametrize('min_len', [1, 3])
+def test_fast_mode_matches_nltk_with_context_free_tagger(stub_nltk, min_len):
+    stub_nltk(_context_free_tag)
+    for text in TEXTS:
+        assert preprocess_text(text, fast=True, min_len=min_len) == preprocess_text(text, min_len=min_len)
+    assert ('xi' in preprocess_text(TEXTS[1], fast=True, min_len=min_len).split()) == (min_len == 1)
+
+
+def test_lemma_cache_is_bounded():
+    assert _lemma.cache_info().maxsize == LEMMA_CACHE_SIZE
+
+
+def test_agreement_report(stub_nltk):
+    stub_nltk(_context_free_tag)
+    report = preprocessing_agreement(TEXTS * 5, top_n=10, min_doc_freq=1)
+    assert report['documents'] == len(TEXTS) * 5
+    assert report['identical_documents'] == 1.0
+    assert report['token_jaccard'] == report['vocabulary_jaccard'] == report['top_term_overlap'] == 1.0
+    assert report['nltk_seconds'] > 0 and report['fast_seconds'] > 0
+
+    stub_nltk(_context_tag)
+    report = preprocessing_agreement(TEXTS * 5, top_n=10, min_doc_freq=1)
+    assert report['identical_documents'] == pytest.approx(6 / 7)
+    assert 0 < report['vocabulary_jaccard'] < 1
@@ -0,0 +1,61 @@
+# tests/test_threads.py
+import numpy as np
+import pandas as pd
+import pytest
+from utils.threads import build_threads, infer_parent_ids, post_engagement_features
+
+
+def _comments():
+    # Post p1:  c1 -> c2 -> c3, c1 -> c4, c5 (no timestamp);  post p2: c6;  post p3 has no comment ids
+    rows = [
+        ('p1', 'c1', 'p1', 100, 5),
+        ('p1', 'c2', 'c1', 160, 3),
+        ('p1', 'c3', 'c2', 400, 1),
+        ('p1', 'c4', 'c1', 130, 2),
+        ('p1', 'c5', 'p1', np.nan, 4),
+        ('p2', 'c6', 'p2', 1050, -1),
+    ]
+    df = pd.DataFrame(rows, columns=['post_id', 'comment_id', 'parent_id', 'comment_datetime', 'comment_score'])
+    df['post_datetime'] = df['post_id'].map({'p1': 0, 'p2': 1000})
+    df['post_score'] = df['post_id'].map({'p1': 10, 'p2': 20})
+    df['gpt_score'] = df['post_id'].map({'p1': 'POLITICAL', 'p2': 'OTHER'})
+    return df
+
+
+def test_threads_are_breadth_first():
+    threads = build_threads(_comments())
+    assert len(threads) == 2 + 6
+    assert (threads.parent[threads.n_posts:] < np.arange(threads.n_posts, len(threads))).all()
+    assert threads.depth.tolist() == sorted(threads.depth.tolist())
+    assert threads.subtree_sizes()[:2].tolist() == [6, 2]
+    # Children of a node are contiguous and ordered by time
+    c1 = int(np.flatnonzero(threads.row == 0)[0])
+    assert threads.timestamp[threads.children(c1)].tolist() == [130, 160]
+
+
+def test_post_features_by_hand():
+    features = post_engagement_features(_comments()).set_index('post_id')
+    p1, p2 = features.loc['p1'], features.loc['p2']
+    assert p1['n_comments'] == 5 and p1['n_top_level'] == 2
+    assert p1['max_depth'] == 3 and p1['mean_depth'] == pytest.approx((1 + 2 + 3 + 2 + 1) / 5)
+    assert p1['largest_thread'] == 4
+    # Branching over p1 (2 children), c1 (2) and c2 (1)
+    assert p1['mean_branching'] == pytest.approx(5 / 3) and p1['max_branching'] == 2
+    assert p1['first_reply_seconds'] == 100
+    # Latencies 100, 60, 240, 30; the comment without a timestamp is left out
+    assert p1['mean_reply_seconds'] == pytest.approx(430 / 4)
+    assert p1['comment_score_sum'] == 15 and p1['comment_score_max'] == 5
+    assert p1['gpt_score'] == 'POLITICAL'
+    assert p2['n_comments'] == 1 and p2['mean_reply_seconds'] == 50 and p2['max_depth'] == 1
+
+
+def test_infer_parent_ids():
+    df = pd.DataFrame({
+        'post_id': ['p1'] * 4,
+        'post_owner': ['op'] * 4,
+        'comment_owner': ['a', 'b', 'a', 'c'],
+        'reply_to_userId': ['op', 'a', 'b', 'x'],
+        'comment_datetime': [10, 20, 30, 40],
+    })
+    inferred = infer_parent_ids(df)
+    assert inferred['parent_id'].tolist() == ['p1', 'p1_0', 'p1_1', 'p1']
@@ -0,0 +1,63 @@
+# tests/test_topics.py
+import numpy as np
+import pandas as pd
+import utils.topics
+from utils.topics import TopicModel, fit_subreddit_topics
+
+
+def _texts(n_docs=120, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabularies = [[f'trade{i}' for i in range(15)], [f'army{i}' for i in range(15)]]
+    return [' '.join(rng.choice(vocabularies[i % 2], 10)) for i in range(n_docs)]
+
+
+def test_refit_does_not_double_count(monkeypatch):
+    monkeypatch.setattr(utils.topics, 'english_stopwords', lambda: ['the', 'and', 'of'])
+    texts = _texts()
+    model = TopicModel(n_topics=2, max_terms=20, batch_size=32).fit([texts[:60], texts[60:]])
+    idf = model.vectorizer.idf_.copy()
+    feature_names = model.feature_names.copy()
+
+    model.fit([texts[:60], texts[60:]])
+    assert model.vectorizer.n_docs == len(texts)
+    assert np.array_equal(model.feature_names, feature_names)
+    np.testing.assert_allclose(model.vectorizer.idf_, idf)
+    assert model.vectorizer.stop_words == ['the', 'and', 'of']
+    assert model.transform(texts[:4]).shape == (4, 2)
+
+
+def test_subreddit_topics_preprocess_each_post_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils.topics, 'english_stopwords', lambda: ['the', 'and', 'of'])
+    preprocessed = []
+
+    def preprocess_chunk(chunk):
+        preprocessed.extend(chunk['post_id'])
+        return (chunk['post_title'] + ' ' + chunk['post_body']).tolist()
+
+    monkeypatch.setattr(utils.topics, 'preprocess_chunk', preprocess_chunk)
+    texts = _texts(160)
+    posts = pd.DataFrame({'post_id': [f'p{i}' for i in range(160)], 'post_title': texts,
+                          'post_body': 'trade0', 'post_datetime': 0, 'post_score': 1})
+    # Comment files repeat each post on every comment row
+    path = tmp_path / 'China.csv'
+    pd.concat([posts[:100], posts[:100]]).to_csv(path, index=False)
+    params = dict(n_topics=2, max_terms=20, chunksize=32, max_workers=1)
+
+    fit_subreddit_topics({'China': path}, tmp_path / 'models', **params)
+    assert sorted(preprocessed) == sorted(posts['post_id'][:100])
+    model = TopicModel.load(tmp_path / 'models' / 'China_nmf.pkl')
+    assert model.vectorizer.n_docs == 100
+
+    preprocessed.clear()
+    posts.to_csv(path, index=False)
+    fit_subreddit_topics({'China': path}, tmp_path / 'models', **params)
+    assert sorted(preprocessed) == sorted(posts['post_id'][100:])
+    model = TopicModel.load(tmp_path / 'models' / 'China_nmf.pkl')
+    assert model.vectorizer.n_docs == 160
+    mixtures = pd.read_csv(tmp_path / 'models' / 'China_nmf_mixtures.csv', index_col=0)
+    assert sorted(mixtures.index) == sorted(posts['post_id'])
+
+    preprocessed.clear()
+    fit_subreddit_topics({'China': path}, tmp_path / 'models', refit=True, **params)
+    assert preprocessed == []
+    assert TopicModel.load(tmp_path / 'models' / 'China_nmf.pkl').vectorizer.n_docs == 160
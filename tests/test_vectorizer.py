@@ -0,0 +1,57 @@
+# tests/test_vectorizer.py
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.vectorizer import StreamingTfidfVectorizer
+
+STOP_WORDS = ['the', 'and', 'of']
+
+
+def _texts(n_docs=300, vocabulary=60, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f'term{i}' for i in range(vocabulary)] + STOP_WORDS)
+    lengths = rng.integers(0, 15, n_docs)
+    return [' '.join(rng.choice(words, length)) for length in lengths]
+
+
+def _chunks(texts, size):
+    return (texts[i:i + size] for i in range(0, len(texts), size))
+
+
+@pytest.mark.parametrize('max_features, min_df', [(None, 1), (20, 2), (25, 0.05)])
+def test_fit_transform_matches_tfidf_vectorizer(max_features, min_df):
+    texts = _texts()
+    expected = TfidfVectorizer(max_features=max_features, min_df=min_df, stop_words=STOP_WORDS)
+    expected_matrix = expected.fit_transform(texts)
+
+    streaming = StreamingTfidfVectorizer(max_features=max_features, min_df=min_df, stop_words=STOP_WORDS)
+    matrix = streaming.fit_transform(_chunks(texts, 37))
+
+    assert list(streaming.get_feature_names_out()) == list(expected.get_feature_names_out())
+    np.testing.assert_allclose(streaming.idf_, expected.idf_)
+    assert matrix.shape == expected_matrix.shape
+    np.testing.assert_allclose(matrix.toarray(), expected_matrix.toarray())
+
+
+def test_transform_after_fit_matches_tfidf_vectorizer():
+    texts = _texts(seed=1)
+    expected = TfidfVectorizer(max_features=30, stop_words=STOP_WORDS).fit(texts)
+    streaming = StreamingTfidfVectorizer(max_features=30, stop_words=STOP_WORDS)
+    for chunk in _chunks(texts, 50):
+        streaming.partial_fit(chunk)
+    streaming.finalize()
+
+    new_texts = _texts(20, seed=2)
+    np.testing.assert_allclose(streaming.transform(new_texts).toarray(), expected.transform(new_texts).toarray())
+
+
+def test_fit_transform_empty_stream():
+    matrix = StreamingTfidfVectorizer().fit_transform(iter([]))
+    assert matrix.shape == (0, 0)
+
+
+def test_transform_with_empty_vocabulary():
+    # min_df not reached yet, as for the first posts of a streaming service
+    vectorizer = StreamingTfidfVectorizer(min_df=2).partial_fit(['only once']).finalize()
+    matrix = vectorizer.transform(['only once', 'again'])
+    assert matrix.shape == (2, 0)
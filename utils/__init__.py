@@ -1,3 +1,79 @@
-# utils/__init__.py
-from .text_processor import preprocess_text
-from .analysis import analyze_vocabulary, tfidf_analyze_subreddit
\ No newline at end of file
+import importlib
+
+# Names are resolved on first access so that `import utils` stays cheap:
+# workers that only need TF-IDF never load matplotlib, plotly or sklearn.manifold.
+_LAZY_IMPORTS = {
+    'preprocess_text': 'utils.text_processor',
+    'split_label': 'utils.text_processor',
+    'analyze_vocabulary': 'utils.analysis',
+    'analyze_vocabulary_df': 'utils.analysis',
+    'tfidf_analyze_subreddit': 'utils.analysis',
+    'tfidf_analyze_subreddit_df': 'utils.analysis',
+    'generate_tfidf_matrix': 'utils.analysis',
+    'create_posts_dataframe': 'utils.analysis',
+    'get_mean_tfidf': 'utils.analysis',
+    'create_report': 'utils.analysis',
+    'get_top_terms': 'utils.analysis',
+    'count_terms_by_date': 'utils.analysis',
+    'report_distances': 'utils.analysis',
+    'plot_word_timeseries': 'utils.visualization',
+    'plot_word_timeseries_df': 'utils.visualization',
+    'plot_word_timeseries_df_cat': 'utils.visualization',
+    'plot_word_timeseries_df_cat_plotly_test': 'utils.visualization',
+    'plot_word_timeseries_df_cat_grouped': 'utils.visualization',
+    'plot_word_timeseries_df_cat_grouped_test': 'utils.visualization',
+    'plot_word_similarities_mds': 'utils.visualization',
+    'plot_word_similarities_tsne': 'utils.visualization',
+    'plot_similarities': 'utils.visualization',
+    'plot_subreddit_term_space': 'utils.visualization',
+    'timeseries_chart_specs': 'utils.rendering',
+    'term_space_chart_spec': 'utils.rendering',
+    'render_chart': 'utils.rendering',
+    'render_charts': 'utils.rendering',
+    'iter_csv_chunks': 'utils.ingestion',
+    'iter_post_chunks': 'utils.ingestion',
+    'TextStream': 'utils.ingestion',
+    'StreamingTfidfVectorizer': 'utils.vectorizer',
+    'CountMinSketch': 'utils.sketches',
+    'PhraseDetector': 'utils.phrases',
+    'TrendDetector': 'utils.trends',
+    'IngestionService': 'utils.pipeline',
+    'build_engagement': 'utils.engagement',
+    'user_activity_stats': 'utils.engagement',
+    'audience_overlap': 'utils.engagement',
+    'CommentThreads': 'utils.threads',
+    'build_threads': 'utils.threads',
+    'post_engagement_features': 'utils.threads',
+    'TopicModel': 'utils.topics',
+    'fit_subreddit_topics': 'utils.topics',
+    'term_count_matrices': 'utils.logodds',
+    'compare_subreddits': 'utils.logodds',
+    'load_temporal_edges': 'utils.temporal_graph',
+    'TemporalGraph': 'utils.temporal_graph',
+    'LabelPropagation': 'utils.propagation',
+    'StratifiedEstimator': 'utils.estimation',
+    'estimate_proportions': 'utils.estimation',
+    'TokenCorpus': 'utils.corpus',
+    'SentimentScorer': 'utils.sentiment',
+    'score_posts_and_comments': 'utils.sentiment',
+    'aggregate_sentiment': 'utils.sentiment',
+    'InvertedIndex': 'utils.search_index',
+    'TfidfArtifact': 'utils.artifacts',
+    'load_or_fit': 'utils.artifacts',
+    'preprocessing_agreement': 'utils.agreement',
+    'corpus_agreement': 'utils.agreement',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
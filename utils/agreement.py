@@ -0,0 +1,98 @@
+# utils/agreement.py
+# How closely fast preprocessing (regex tokens, cached per-word lemmas) follows
+# the full NLTK pipeline: vocabulary and per-document token overlap, and how
+# the top TF-IDF terms rank under both.
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+from utils.text_processor import _lemma, preprocess_text
+from utils.analysis import generate_tfidf_matrix, get_mean_tfidf
+from config.settings import SCORED_COMMENT_FILES
+from utils.ingestion import load_posts
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def preprocessing_agreement(texts, top_n=300, max_terms=1000, min_doc_freq=2, warmup=5):
+    """
+    Compare preprocess_text(fast=False) and preprocess_text(fast=True) on raw texts.
+
+    Args:
+        texts: Raw post texts
+        top_n: Number of top terms (by mean TF-IDF) compared
+        max_terms, min_doc_freq: Passed to generate_tfidf_matrix
+        warmup: Texts run through both modes before timing, so one-off loading
+            is not counted; the fast lemma cache is cleared before its timed run
+    Returns:
+        dict: documents, timings and speedup, identical_documents (share of
+            texts with the same output), token_jaccard (mean per-document),
+            vocabulary_jaccard, top_term_overlap (share of the NLTK top_n found
+            in the fast top_n) and top_term_spearman (rank correlation of the
+            NLTK top_n terms' scores under both modes)
+    """
+    texts = list(texts)
+    # Load NLTK's tagger, lemmatizer and stopwords before timing either mode
+    for fast in (False, True):
+        for text in texts[:warmup]:
+            preprocess_text(text, fast)
+    outputs, timings = {}, {}
+    for fast in (False, True):
+        if fast:
+            # Time the lemma cache cold, as on a fresh corpus
+            _lemma.cache_clear()
+        start = time.perf_counter()
+        outputs[fast] = [preprocess_text(text, fast) for text in texts]
+        timings[fast] = time.perf_counter() - start
+
+    token_sets = {fast: [set(text.split()) for text in outputs[fast]] for fast in outputs}
+    vocabulary = {fast: set().union(*token_sets[fast]) for fast in outputs}
+
+    scores = {}
+    for fast in outputs:
+        tfidf_matrix, feature_names = generate_tfidf_matrix(outputs[fast], max_terms, min_doc_freq)
+        scores[fast] = get_mean_tfidf(tfidf_matrix, feature_names)['score']
+    reference = scores[False].head(top_n)
+    fast_scores = scores[True].reindex(reference.index, fill_value=0.0)
+    fast_top = set(scores[True].head(top_n).index)
+
+    identical = [a == b for a, b in zip(outputs[False], outputs[True])]
+    token_jaccard = [_jaccard(a, b) for a, b in zip(token_sets[False], token_sets[True])]
+    return {
+        'documents': len(texts),
+        'nltk_seconds': timings[False],
+        'fast_seconds': timings[True],
+        'speedup': timings[False] / timings[True] if timings[True] else np.nan,
+        'identical_documents': float(np.mean(identical)) if texts else np.nan,
+        'token_jaccard': float(np.mean(token_jaccard)) if texts else np.nan,
+        'vocabulary_jaccard': _jaccard(vocabulary[False], vocabulary[True]),
+        'top_term_overlap': len(fast_top & set(reference.index)) / len(reference) if len(reference) else np.nan,
+        'top_term_spearman': (spearmanr(reference.to_numpy(), fast_scores.to_numpy())[0]
+                              if len(reference) > 1 else np.nan),
+    }
+
+
+def corpus_agreement(paths=None, sample=5000, include_selftext=True, seed=0, **kwargs):
+    """
+    preprocessing_agreement for a sample of posts from each subreddit.
+
+    Args:
+        paths: Dict mapping subreddit name -> CSV (defaults to SCORED_COMMENT_FILES)
+        sample: Posts per subreddit (None for all)
+        include_selftext: Append the post body to the title
+        **kwargs: Passed to preprocessing_agreement
+    Returns:
+        pd.DataFrame: One row of agreement metrics per subreddit
+    """
+    posts = load_posts(paths or SCORED_COMMENT_FILES)
+    rows = []
+    for subreddit, members in posts.groupby('subreddit', sort=False):
+        if sample is not None and len(members) > sample:
+            members = members.sample(sample, random_state=seed)
+        texts = members['post_title'].fillna('')
+        if include_selftext:
+            texts = texts + ' ' + members['post_body'].fillna('')
+        rows.append({'subreddit': subreddit, **preprocessing_agreement(texts, **kwargs)})
+    return pd.DataFrame(rows).set_index('subreddit')
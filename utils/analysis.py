@@ -1,33 +1,21 @@
 # utils/analysis.py
+# Compute layer: vocabulary, TF-IDF and term counting. Plotting lives in
+# utils/visualization.py and is only imported when a plot function is used.
 from collections import Counter
 from datetime import datetime
+import importlib
 import pandas as pd
 import numpy as np
-from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from utils.text_processor import *
-import matplotlib.pyplot as plt
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.manifold import MDS, TSNE
-from matplotlib import dates as mdates
-import plotly.graph_objects as go
-import plotly.express as px
+from utils.ingestion import preprocess_chunk
+from utils.vectorizer import StreamingTfidfVectorizer
+from utils.corpus import TokenCorpus
 
-def analyze_vocabulary(texts, min_freq=2):
+def _vocabulary_report(words, min_freq=2):
     """
-    Analyze vocabulary distribution in a corpus.
-    Returns word frequencies and vocabulary statistics.
+    Build the frequency distribution and summary statistics for a vocabulary.
     """
-    
-    # Preprocess texts
-    texts = [preprocess_text(text) for text in texts]
-    concatenated_text = ' '.join(texts)
-    # Tokenize all texts
-    
-    vectorizer = TfidfVectorizer(stop_words='english')
-    vectorizer.fit(texts)
-    words = vectorizer.get_feature_names_out()
-    
     # Count word frequencies
     word_freq = Counter(words)
     
@@ -43,6 +31,7 @@ def analyze_vocabulary(texts, min_freq=2):
     # Calculate cumulative coverage
     freq_df['cumulative_percentage'] = freq_df['percentage'].cumsum()
     
+    # Gather summary statistics
     stats = {
         'total_words': total_words,
         'unique_words': unique_words,
@@ -53,41 +42,85 @@ def analyze_vocabulary(texts, min_freq=2):
     return freq_df, stats
 
 
-def analyze_vocabulary_df(df, text_column, min_freq=2):
+def _compact(matrix):
+    """float32 values with int32 indices (when they fit), halving matrix memory."""
+    matrix = matrix.tocsr().astype(np.float32, copy=False)
+    if matrix.nnz < np.iinfo(np.int32).max and max(matrix.shape) < np.iinfo(np.int32).max:
+        matrix.indices = matrix.indices.astype(np.int32, copy=False)
+        matrix.indptr = matrix.indptr.astype(np.int32, copy=False)
+    return matrix
 
-    # Preprocess and concatenate text data
-    texts = df[text_column].apply(preprocess_text)
-    concatenated_text = ' '.join(texts)
+
+def _top_k(values, k=None):
+    """
+    Positions of the k largest values, highest first; ties keep their original
+    order, as a stable descending sort would.
+    """
+    values = np.asarray(values)
+    if k is None or k >= len(values):
+        return np.argsort(-values, kind='stable')
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    # argpartition finds the k-th largest value; every value tied with it is a
+    # candidate so the stable order of the full sort is kept
+    kth = values[np.argpartition(-values, k - 1)[k - 1]]
+    candidates = np.flatnonzero(values >= kth)
+    return candidates[np.argsort(-values[candidates], kind='stable')[:k]]
+
+
+def _track_vocabulary(stream, words):
+    """
+    Pass text chunks through unchanged while adding their terms to `words`.
+    """
+    analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+    for texts in stream:
+        for text in texts:
+            words.update(analyzer(text))
+        yield texts
+
+
+def analyze_vocabulary(texts, min_freq=2):
+    """
+    Analyze vocabulary distribution in a corpus.
+    Returns word frequencies and vocabulary statistics.
+    """
+    
+    # Preprocess texts
+    texts = [preprocess_text(text) for text in texts]
     
-    # Tokenize and vectorize text data
     vectorizer = TfidfVectorizer(stop_words='english')
     vectorizer.fit(texts)
     words = vectorizer.get_feature_names_out()
     
-    # Count word frequencies
-    word_freq = Counter(words)
-    
-    # Calculate vocabulary statistics
-    total_words = len(words)
-    unique_words = len(word_freq)
-    
-    # Create frequency distribution DataFrame
-    freq_df = pd.DataFrame(list(word_freq.items()), columns=['word', 'frequency'])
-    freq_df['percentage'] = freq_df['frequency'] / total_words * 100
-    freq_df = freq_df.sort_values('frequency', ascending=False)
+    return _vocabulary_report(words, min_freq)
+
+
+def analyze_vocabulary_df(df, text_column=None, min_freq=2):
+    """
+    Analyze vocabulary distribution of a DataFrame column or a text stream.
     
-    # Calculate cumulative coverage
-    freq_df['cumulative_percentage'] = freq_df['percentage'].cumsum()
+    Args:
+        df: DataFrame, or a stream of preprocessed text chunks (e.g. utils.ingestion.TextStream)
+        text_column: Column with raw text (ignored for streams)
+        min_freq: Minimum frequency for 'words_min_freq'
+    Returns:
+        tuple: (freq_df, stats)
+    """
+    if not isinstance(df, pd.DataFrame):
+        words = set()
+        for _ in _track_vocabulary(df, words):
+            pass
+        return _vocabulary_report(sorted(words), min_freq)
+
+    # Preprocess text data
+    texts = df[text_column].apply(preprocess_text)
     
-    # Gather summary statistics
-    stats = {
-        'total_words': total_words,
-        'unique_words': unique_words,
-        'words_min_freq': sum(1 for freq in word_freq.values() if freq >= min_freq),
-        'coverage_top_1000': freq_df.iloc[:1000]['frequency'].sum() / total_words * 100 if len(freq_df) >= 1000 else 100
-    }
+    # Tokenize and vectorize text data
+    vectorizer = TfidfVectorizer(stop_words='english')
+    vectorizer.fit(texts)
+    words = vectorizer.get_feature_names_out()
     
-    return freq_df, stats
+    return _vocabulary_report(words, min_freq)
 
 
 def tfidf_analyze_subreddit(posts, max_terms=1000, min_doc_freq=2, include_selftext=False):
@@ -115,26 +148,54 @@ def tfidf_analyze_subreddit(posts, max_terms=1000, min_doc_freq=2, include_selft
     return results
 
 
-def tfidf_analyze_subreddit_df(df, title_column='post_title', selftext_column='post_body', min_doc_freq=2, max_terms=1000, include_selftext=True):
+def tfidf_analyze_subreddit_df(df, title_column='post_title', selftext_column='post_body', min_doc_freq=2, max_terms=1000, include_selftext=True, compact=False):
+    """
+    Analyze a subreddit's posts from a DataFrame or a text stream.
     
+    Args:
+        df: DataFrame with posts, or a stream of preprocessed text chunks
+            (e.g. utils.ingestion.TextStream); column arguments are ignored for streams
+        compact: Return a float32 matrix with int32 indices
+    Returns:
+        dict: tfidf_matrix, feature_names, freq_df, vocab_stats and the fitted vectorizer
+    """
+    if not isinstance(df, pd.DataFrame):
+        # Single pass over the stream: the vectorizer spills texts to disk for its
+        # transform pass, and the vocabulary is collected along the way.
+        words = set()
+        vectorizer = StreamingTfidfVectorizer(max_features=max_terms, min_df=min_doc_freq, stop_words=english_stopwords())
+        tfidf_matrix = vectorizer.fit_transform(_track_vocabulary(df, words))
+        if compact:
+            tfidf_matrix = _compact(tfidf_matrix)
+        feature_names = vectorizer.get_feature_names_out()
+        freq_df, vocab_stats = _vocabulary_report(sorted(words), min_freq=min_doc_freq)
+        return {
+            "tfidf_matrix": tfidf_matrix,
+            "feature_names": feature_names,
+            "freq_df": freq_df,
+            "vocab_stats": vocab_stats,
+            "vectorizer": vectorizer
+        }
+
     # Combine title and optionally selftext columns
-    texts = [
-        preprocess_text(row[title_column]) + (' ' + preprocess_text(row[selftext_column]) if include_selftext and pd.notna(row[selftext_column]) else '')
-        for _, row in df.iterrows()
-    ]
+    texts = preprocess_chunk(df, title_column, selftext_column, include_selftext)
     
     freq_df, vocab_stats = analyze_vocabulary_df(pd.DataFrame({title_column: texts}), title_column, min_freq=min_doc_freq)
     
 
-    vectorizer = TfidfVectorizer(max_features=max_terms, min_df=min_doc_freq, stop_words = stopwords.words('english'))
+    vectorizer = TfidfVectorizer(max_features=max_terms, min_df=min_doc_freq, stop_words = english_stopwords(),
+                                 dtype=np.float32 if compact else np.float64)
     tfidf_matrix = vectorizer.fit_transform(texts)
+    if compact:
+        tfidf_matrix = _compact(tfidf_matrix)
     feature_names = vectorizer.get_feature_names_out()
     
     results = {
         "tfidf_matrix": tfidf_matrix,
         "feature_names": feature_names,
         "freq_df": freq_df,
-        "vocab_stats": vocab_stats
+        "vocab_stats": vocab_stats,
+        "vectorizer": vectorizer
     }
     
     return results
@@ -142,18 +203,26 @@ def tfidf_analyze_subreddit_df(df, title_column='post_title', selftext_column='p
 
 
 
-def generate_tfidf_matrix(texts, max_terms=1000, min_doc_freq=2):
+def generate_tfidf_matrix(texts, max_terms=1000, min_doc_freq=2, compact=False):
     """
-    Generate TF-IDF matrix and feature names from texts.
+    Generate TF-IDF matrix and feature names from texts (or a TokenCorpus).
+
+    With compact=True the matrix is float32 with int32 indices.
     """
+    if isinstance(texts, TokenCorpus):
+        tfidf_matrix, feature_names = texts.tfidf_matrix(max_terms, min_doc_freq)
+        return (_compact(tfidf_matrix) if compact else tfidf_matrix), feature_names
 
     vectorizer = TfidfVectorizer(
-        stop_words=stopwords.words('english'),
+        stop_words=english_stopwords(),
         max_features=max_terms,
-        min_df=min_doc_freq
+        min_df=min_doc_freq,
+        dtype=np.float32 if compact else np.float64
     )
     
     tfidf_matrix = vectorizer.fit_transform(texts)
+    if compact:
+        tfidf_matrix = _compact(tfidf_matrix)
     feature_names = vectorizer.get_feature_names_out()
     
     return tfidf_matrix, feature_names
@@ -173,34 +242,45 @@ def create_posts_dataframe(posts):
     } for post in posts])
     return df
 
-def get_mean_tfidf(tfidf_matrix, feature_names=None, return_df=True):
+def get_mean_tfidf(tfidf_matrix, feature_names=None, return_df=True, top_k=None):
     """
     Calculate mean TF-IDF score for each term in the matrix.
+
+    Args:
+        top_k: Only return the k highest scoring terms (selected with
+            np.argpartition, so the full vocabulary is never sorted)
+    Returns:
+        DataFrame indexed by term with a score column (or a list of
+        (term, score) tuples), highest score first
     """
     
-    mean_tfidf = tfidf_matrix.mean(axis=0).tolist()[0]
-
-    tfidf_scores = list(zip(feature_names, mean_tfidf))
-
-    tfidf_scores = sorted(tfidf_scores, key=lambda x: x[1], reverse=True)
+    # Accumulate in float64 even for compact float32 matrices, so long columns
+    # don't drift and reorder near-tied terms (scipy's mean(dtype=...) still sums
+    # in the matrix dtype)
+    mean_tfidf = np.asarray(tfidf_matrix.astype(np.float64, copy=False).mean(axis=0)).ravel()
+    top = _top_k(mean_tfidf, top_k)
+    terms = np.asarray(feature_names, dtype=object)[top]
+    scores = mean_tfidf[top]
 
     if return_df:
-        df = pd.DataFrame(tfidf_scores, columns=['term', 'score'])
-        df.set_index('term', inplace=True)
-        return df
+        return pd.DataFrame({'score': scores}, index=pd.Index(terms, name='term'))
 
-    return tfidf_scores
+    return list(zip(terms.tolist(), scores.tolist()))
 
-def create_report(tfidf_matrix, feature_names, freq_df, vocab_stats):
+def create_report(tfidf_matrix, feature_names, freq_df, vocab_stats, vectorizer=None, top_k=None):
     """
     Create results object from TF-IDF matrix and feature names.
+
+    The fitted vectorizer (or a utils.artifacts.TfidfArtifact) is kept so new
+    posts can be projected into the same space; top_k limits tf_idf_scores to
+    the highest scoring terms.
     """
     
     return {
         'vocab_stats': vocab_stats,
         'freq_distribution': freq_df,
-        'tf_idf_scores': get_mean_tfidf(tfidf_matrix, feature_names, return_df=True),
-        'vectorizer': None,  # Vectorizer is not needed in the results
+        'tf_idf_scores': get_mean_tfidf(tfidf_matrix, feature_names, return_df=True, top_k=top_k),
+        'vectorizer': vectorizer,
         'matrix_shape': tfidf_matrix.shape,
         'matrix_sparsity': 100 * (1 - tfidf_matrix.nnz / (tfidf_matrix.shape[0] * tfidf_matrix.shape[1]))
     }
@@ -217,148 +297,32 @@ def get_top_terms(tfidf_results, n_terms=5):
     """
     
     if isinstance(tfidf_results, pd.DataFrame):
-        tfidf_scores_sorted = tfidf_results.sort_values('score', ascending=False)
+        scores = tfidf_results['score']
     elif isinstance(tfidf_results, (pd.Series, dict)):
-        tfidf_scores_sorted = pd.Series(tfidf_results).sort_values(ascending=False)
+        scores = pd.Series(tfidf_results)
     else:
         raise ValueError("tfidf_results must be DataFrame, Series or dict")
-    return tfidf_scores_sorted.head(n_terms).index.tolist()
-    
-def plot_word_timeseries(df, terms, figsize=(12, 6), include_selftext=False):
-    """
-    Plot time series for given terms.
-    
-    Args:
-        df: DataFrame with posts
-        terms: List of terms to plot
-        figsize: Tuple of figure dimensions
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Prepare data
-    df['date'] = pd.to_datetime(df['time']).dt.date
-    daily_counts = {term: [] for term in terms}
-    dates = sorted(df['date'].unique())
-    
-    # Get vocabulary from all posts
-    if include_selftext:
-        all_text = ' '.join(df['title'] + ' ' + df['selftext'])
-    else:
-        all_text = ' '.join(df['title'])
-        
-    vocab = set(preprocess_text(all_text).split())
-    
-    # Validate terms
-    invalid_terms = [term for term in terms if term not in vocab]
-    if invalid_terms:
-        raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
-    # Count terms per day
-    for date in dates:
-        day_posts = df[df['date'] == date]
-        day_text = ' '.join(day_posts['title'] + ' ' + day_posts['selftext'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        
-        for term in terms:
-            daily_counts[term].append(word_counts.get(term, 0))
-    
-    # Plot
-    fig, ax = plt.subplots(figsize=figsize)
-    for term in terms:
-        ax.plot(dates, daily_counts[term], marker='o', label=term)
-    
-    ax.set_title('Term Frequency Over Time')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Frequency')
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    return fig, ax
+    return scores.index[_top_k(scores.to_numpy(), n_terms)].tolist()
 
 
-def plot_word_timeseries_df(df, terms, figsize=(12, 6), include_selftext=True):
+def count_terms_by_date(df, terms, include_selftext=True):
     """
-    Plot time series for given terms.
+    Count occurrences of the given terms per posting date.
     
     Args:
-        df: DataFrame with posts
-        terms: List of terms to plot
-        figsize: Tuple of figure dimensions
+        df: DataFrame with posts (post_title, post_body, post_datetime), or a
+            TokenCorpus (counted without re-tokenizing; include_selftext is fixed
+            when the corpus is built)
+        terms: List of terms to count
+        include_selftext: Boolean, whether to include 'post_body' in the vocabulary check
     Returns:
-        tuple: (fig, ax) matplotlib objects
+        tuple: (dates, daily_counts) where daily_counts maps term -> list of counts
     """
-    # Prepare data
-    df['date'] =pd.to_datetime(df['post_datetime'], unit='s')
+    if isinstance(df, TokenCorpus):
+        return df.term_counts_by_date(terms)
 
-    
-    daily_counts = {term: [] for term in terms}
-    dates = sorted(df['date'].unique())
-
-    #if df['post_body'] is NaN, put empty string:
-    df['post_body'] = df['post_body'].fillna('')
-    
-    # Get vocabulary from all posts
-    if include_selftext:
-        print(df['post_title'])
-        print(df['post_body'])
-        all_text = ' '.join(df['post_title'] + ' ' + df['post_body'])
-    else:
-        all_text = ' '.join(df['post_title'])
-        
-    vocab = set(preprocess_text(all_text).split())
-    
-    # Validate terms
-    invalid_terms = [term for term in terms if term not in vocab]
-    if invalid_terms:
-        raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
-    # Count terms per day
-    for date in dates:
-        day_posts = df[df['date'] == date]
-        day_text = ' '.join(day_posts['post_title'] + ' ' + day_posts['post_body'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        
-        for term in terms:
-            daily_counts[term].append(word_counts.get(term, 0))
-    
-    # Plot
-    fig, ax = plt.subplots(figsize=figsize)
-    for term in terms:
-        ax.plot(dates, daily_counts[term], marker='o', label=term)
-    
-    ax.set_title('Term Frequency Over Time')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Frequency')
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    return fig, ax
-
-
-def plot_word_timeseries_df_cat(df, terms_cat_df, figsize=(12, 6), include_selftext=True):
-    """
-    Plot time series for all given terms, with shaded colors based on category, starting from darker to lighter.
-    
-    Args:
-        df: DataFrame with posts
-        terms_cat_df: DataFrame with terms and their categories (e.g., 'P' or 'C')
-        figsize: Tuple of figure dimensions
-        include_selftext: Boolean, whether to include 'post_body' in the analysis
-    
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Extract terms and their categories
-    terms = terms_cat_df['term'].tolist()
-    categories = terms_cat_df.set_index('term')['category'].to_dict()  # Dictionary mapping term -> category
-    
-    # Prepare date column and initialize daily counts
+    # Prepare date column
     df['date'] = pd.to_datetime(df['post_datetime'], unit='s')
-    daily_counts = {term: [] for term in terms}
     dates = sorted(df['date'].unique())
 
     # Fill missing post_body values with an empty string
@@ -369,610 +333,25 @@ def plot_word_timeseries_df_cat(df, terms_cat_df, figsize=(12, 6), include_selft
         all_text = ' '.join(df['post_title'] + ' ' + df['post_body'])
     else:
         all_text = ' '.join(df['post_title'])
-        
     vocab = set(preprocess_text(all_text).split())
 
     # Validate terms
     invalid_terms = [term for term in terms if term not in vocab]
     if invalid_terms:
         raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
-    # Count terms per day
-    for date in dates:
-        day_posts = df[df['date'] == date]
-        day_text = ' '.join(day_posts['post_title'] + ' ' + day_posts['post_body'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        
-        for term in terms:
-            daily_counts[term].append(word_counts.get(term, 0))
-    
-    # Define color shades for each category, from darker to lighter
-    num_p_terms = sum(1 for term in terms if categories[term] == 'P')
-    num_c_terms = len(terms) - num_p_terms
 
-    # Reverse the linspace to go from darker (higher value) to lighter (lower value)
-    cmap_p = plt.cm.Blues(np.linspace(1, 0.3, num_p_terms))  # Shades of blue for 'P'
-    cmap_c = plt.cm.Reds(np.linspace(1, 0.3, num_c_terms))    # Shades of red for 'C'
-    
-    fig, ax = plt.subplots(figsize=figsize)
-    color_index_p, color_index_c = 0, 0
-    
-    for term in terms:
-        # Choose color shade based on category
-        if categories[term] == 'P':
-            color = cmap_p[color_index_p]
-            color_index_p += 1
-        else:
-            color = cmap_c[color_index_c]
-            color_index_c += 1
-            
-        # Plot with specific color for each term
-        ax.plot(dates, daily_counts[term], marker='o', label=term, color=color)
-    
-    ax.set_title('Term Frequency Over Time')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Frequency')
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    return fig, ax
-
-def plot_word_timeseries_df_cat_plotly_test(df, terms_cat_df, figsize=(12, 6), include_selftext=True):
-    """
-    Plot time series for all given terms, with shaded colors based on category, starting from darker to lighter.
-    
-    Args:
-        df: DataFrame with posts
-        terms_cat_df: DataFrame with terms and their categories (e.g., 'P' or 'C')
-        figsize: Tuple of figure dimensions
-        include_selftext: Boolean, whether to include 'post_body' in the analysis
-    
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Extract terms and their categories
-    terms = terms_cat_df['term'].tolist()
-    categories = terms_cat_df.set_index('term')['category'].to_dict()  # Dictionary mapping term -> category
-    
-    # Prepare date column and initialize daily counts
-    df['date'] = pd.to_datetime(df['post_datetime'], unit='s')
-    daily_counts = {term: [] for term in terms}
-    dates = sorted(df['date'].unique())
-
-    # Fill missing post_body values with an empty string
-    df['post_body'] = df['post_body'].fillna('')
-
-    # Get vocabulary from all posts
-    if include_selftext:
-        all_text = ' '.join(df['post_title'] + ' ' + df['post_body'])
-    else:
-        all_text = ' '.join(df['post_title'])
-        
-    vocab = set(preprocess_text(all_text).split())
-
-    # Validate terms
-    invalid_terms = [term for term in terms if term not in vocab]
-    if invalid_terms:
-        raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
     # Count terms per day
-    for date in dates:
-        day_posts = df[df['date'] == date]
+    daily_counts = {term: [] for term in terms}
+    for _, day_posts in df.groupby('date', sort=True):
         day_text = ' '.join(day_posts['post_title'] + ' ' + day_posts['post_body'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        
+        word_counts = Counter(preprocess_text(day_text).split())
+
         for term in terms:
             daily_counts[term].append(word_counts.get(term, 0))
-    # Define color shades for each category, from darker to lighter
-    num_p_terms = sum(1 for term in terms if categories[term] == 'P')
-    num_c_terms = len(terms) - num_p_terms
-    # Generate color shades
-    cmap_p = px.colors.sequential.Greens[::-1][:num_p_terms]  # Shades of orange for 'P', reversed for darker to lighter
-    cmap_c = px.colors.sequential.Oranges[::-1][:num_c_terms]   # Shades of blue for 'C', reversed for darker to lighter
-
-    # Create Plotly figures
-    fig_p = go.Figure()
-    fig_c = go.Figure()
-    color_index_p, color_index_c = 0, 0
-
-    # Plot each term with its specific color
-    for term in terms:
-        if categories[term] == 'P':
-            color = cmap_p[color_index_p]
-            color_index_p += 1
-            fig_p.add_trace(go.Scatter(
-                x=pd.to_datetime(dates),
-                y=daily_counts[term],
-                mode='lines+markers',
-                name=term,
-                line=dict(color=color, width=2),  # Set line width
-                marker=dict(color=color)
-            ))
-        else:
-            color = cmap_c[color_index_c]
-            color_index_c += 1
-            fig_c.add_trace(go.Scatter(
-                x=pd.to_datetime(dates),
-                y=daily_counts[term],
-                mode='lines+markers',
-                name=term,
-                line=dict(color=color, width=2),  # Set line width
-                marker=dict(color=color)
-            ))
-
-    # Set plot layout for 'P' terms
-    fig_p.update_layout(
-        title={'text':"<span style='color:green;'><b>Political</b></span> Term Frequency Over Time r/China",'x': 0.5,
-            'xanchor': 'center'
-        },
-
-        xaxis_title="Date",
-        yaxis_title="Frequency",
-        xaxis=dict(tickangle=45),
-        legend_title="Political Terms",
-        template="plotly_white",
-        width = 1000
-    )
-
-    # Set plot layout for 'C' terms
-    fig_c.update_layout(
-
-        title={'text':"<span style='color:orange;'><b>Cultural</b></span> Term Frequency Over Time r/China",'x': 0.5,
-            'xanchor': 'center'
-        },
-        xaxis_title="Date",
-        yaxis_title="Frequency",
-        xaxis=dict(tickangle=45),
-        legend_title="Cultural Terms",
-        template="plotly_white",
-        width = 1000
-    )
-
-
-    fig_p.show()
-    fig_c.show()
-
-
-def plot_word_timeseries_df_cat_grouped(df, terms_cat_df, figsize=(12, 6), include_selftext=True):
-    """
-    Plot time series for given terms, grouped by category (P, C), with separate lines for each category.
-    Args:
-        df: DataFrame with posts
-        terms_cat_df: DataFrame with terms and their categories (e.g., 'P' or 'C')
-        figsize: Tuple of figure dimensions
-        include_selftext: Boolean, whether to include 'post_body' in the analysis
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Extract terms and their categories
-    terms = terms_cat_df['term'].tolist()
-    categories = terms_cat_df.set_index('term')['category'].to_dict()  # Dictionary mapping term -> category
-    
-    # Prepare date column and initialize daily counts
-    df['date'] = pd.to_datetime(df['post_datetime'], unit='s')
-    dates = sorted(df['date'].unique())
-    
-    # Fill missing post_body values with an empty string
-    df['post_body'] = df['post_body'].fillna('')
-    
-    # Get vocabulary from all posts
-    if include_selftext:
-        all_text = ' '.join(df['post_title'] + ' ' + df['post_body'])
-    else:
-        all_text = ' '.join(df['post_title'])
-    vocab = set(preprocess_text(all_text).split())
-    
-    # Validate terms
-    invalid_terms = [term for term in terms if term not in vocab]
-    if invalid_terms:
-        raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
-    # Count terms per day and group by category
-    p_counts = {term: [] for term in terms if categories[term] == 'P'}
-    c_counts = {term: [] for term in terms if categories[term] == 'C'}
-    daily_word_counts = []
-
-    for date in dates:
-        day_posts = df[df['date'] == date]
-        day_text = ' '.join(day_posts['post_title'] + ' ' + day_posts['post_body'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        daily_word_counts.append(word_counts)
-        
-        for term, category in categories.items():
-            if category == 'P':
-                p_counts[term].append(word_counts.get(term, 0))
-            elif category == 'C':
-                c_counts[term].append(word_counts.get(term, 0))
-    
-    # Sum counts for each category per day
-    p_daily_counts = [sum(p_counts[term][i] for term in p_counts) for i in range(len(dates))]
-    c_daily_counts = [sum(c_counts[term][i] for term in c_counts) for i in range(len(dates))]
-    
-    fig, ax = plt.subplots(figsize=figsize)
-    
-    ax.plot(dates, p_daily_counts, label='Political Terms', color='blue', linewidth=2.5)
-    ax.plot(dates, c_daily_counts, label='Cultural Terms', color='red', linewidth=2.5)
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-
-
-    # Find the two highest peak days for P and C
-    max_p_days_idx = np.argsort(p_daily_counts)[-2:]
-    max_c_days_idx = np.argsort(c_daily_counts)[-2:]
-    max_p_days = [dates[idx] for idx in max_p_days_idx]
-    max_c_days = [dates[idx] for idx in max_c_days_idx]
-    max_p_values = [p_daily_counts[idx] for idx in max_p_days_idx]
-    max_c_values = [c_daily_counts[idx] for idx in max_c_days_idx]
-    
-    # Annotate the two highest peaks with the three most used political or cultural words
-    for i in range(2):
-        max_p_words = sorted(p_counts, key=lambda term: p_counts[term][max_p_days_idx[i]], reverse=True)[:2]
-        max_c_words = sorted(c_counts, key=lambda term: c_counts[term][max_c_days_idx[i]], reverse=True)[:2]
-        print(max_p_words)
-        
-        ax.annotate('\n'.join(max_p_words), xy=(max_p_days[i], max_p_values[i]), xytext=(max_p_days[i]-5, max_p_values[i] + 5),
-                    arrowprops=dict(facecolor='blue', shrink=0.05),ha='center',va='bottom')
-        ax.annotate('\n'.join(max_c_words), xy=(max_c_days[i], max_c_values[i]), xytext=(max_c_days[i]-5, max_c_values[i] + 5),
-                    arrowprops=dict(facecolor='red', shrink=0.05),ha='center')
-    
-    ax.set_title('Term Frequency Over Time by Category')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Frequency')
-    ax.legend(loc='upper left', bbox_to_anchor=(1, 1), title='Categories')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    return fig, ax
-
-
-import plotly.graph_objects as go
-import numpy as np
-import plotly.express as px
-from datetime import timedelta
-
-def plot_word_timeseries_df_cat_grouped_test(df, terms_cat_df, figsize=(12, 6), include_selftext=True):
-    """
-    Plot time series for given terms, grouped by category (P, C), with separate lines for each category.
-    Args:
-        df: DataFrame with posts
-        terms_cat_df: DataFrame with terms and their categories (e.g., 'P' or 'C')
-        figsize: Tuple of figure dimensions
-        include_selftext: Boolean, whether to include 'post_body' in the analysis
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Extract terms and their categories
-    terms = terms_cat_df['term'].tolist()
-    categories = terms_cat_df.set_index('term')['category'].to_dict()  # Dictionary mapping term -> category
-    
-    # Prepare date column and initialize daily counts
-    df['date'] = pd.to_datetime(df['post_datetime'], unit='s')
-    dates = sorted(df['date'].unique())
-    
-    # Fill missing post_body values with an empty string
-    df['post_body'] = df['post_body'].fillna('')
-    
-    # Get vocabulary from all posts
-    if include_selftext:
-        all_text = ' '.join(df['post_title'] + ' ' + df['post_body'])
-    else:
-        all_text = ' '.join(df['post_title'])
-    vocab = set(preprocess_text(all_text).split())
-    
-    # Validate terms
-    invalid_terms = [term for term in terms if term not in vocab]
-    if invalid_terms:
-        raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
-    
-    # Count terms per day and group by category
-    p_counts = {term: [] for term in terms if categories[term] == 'P'}
-    c_counts = {term: [] for term in terms if categories[term] == 'C'}
-    daily_word_counts = []
-
-    for date in dates:
-        day_posts = df[df['date'] == date]
-        day_text = ' '.join(day_posts['post_title'] + ' ' + day_posts['post_body'])
-        words = preprocess_text(day_text).split()
-        word_counts = Counter(words)
-        daily_word_counts.append(word_counts)
-        
-        for term, category in categories.items():
-            if category == 'P':
-                p_counts[term].append(word_counts.get(term, 0))
-            elif category == 'C':
-                c_counts[term].append(word_counts.get(term, 0))
-    
-    # Sum counts for each category per day
-    p_daily_counts = [sum(p_counts[term][i] for term in p_counts) for i in range(len(dates))]
-    c_daily_counts = [sum(c_counts[term][i] for term in c_counts) for i in range(len(dates))]
-
-    # Create Plotly figure
-    fig = go.Figure()
-
-    # Plot the main line plots for political and cultural terms
-    fig.add_trace(go.Scatter(
-        x=pd.to_datetime(dates),
-        y=p_daily_counts,
-        mode='lines',
-        name='Political Terms',
-        line=dict(color='#3F8D42', width=1.5)
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=pd.to_datetime(dates),
-        y=c_daily_counts,
-        mode='lines',
-        name='Cultural Terms',
-        line=dict(color='#F9A34E', width=1.5)    ))
-        # Set plot layout
-    fig.update_layout(
-        title={
-            'text': "Term Frequency Over Time Grouped by <span style='color:green;'><b>Political</b></span> and <span style='color:orange;'><b>Cultural</b></span> Categories",
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        xaxis_title="Date",
-        yaxis_title="Frequency",
-        xaxis=dict(
-            tickangle=45,
-            tickformat='%Y-%m-%d',  # Set date format
-            dtick="D1"  # Tick every day
-        ),
-        legend=dict(
-            title='Categories',
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=1.02  # Position outside plot area
-        ),
-        template="plotly_white",
-        width=1000
-    )
-    fig.show()
 
+    return dates, daily_counts
 
-def plot_word_similarities_mds(tfidf_matrix, feature_names, n_terms=10, similarity_threshold=0.3, title=None):
-    """
-    Plot word similarities using MDS for a single TF-IDF matrix.
-    
-    Args:
-        tfidf_matrix: scipy sparse matrix from TF-IDF vectorization
-        feature_names: list of words corresponding to matrix columns
-        n_terms: number of top terms to plot
-        similarity_threshold: minimum similarity to draw connections
-    
-    Returns:
-        tuple: (fig, ax) matplotlib objects
-    """
-    # Get top n terms based on mean TF-IDF scores
-    mean_tfidf = tfidf_matrix.mean(axis=0).A1
-    top_indices = mean_tfidf.argsort()[-n_terms:][::-1]
-    
-    # Get vectors for top terms
-    term_vectors = tfidf_matrix.T[top_indices].toarray()
-    top_terms = feature_names[top_indices]
-    
-    # Calculate similarities and distances
-    similarities = cosine_similarity(term_vectors)
-    distances = 1 - similarities
-    
-    # Use MDS for 2D projection
-    mds = MDS(n_components=2, dissimilarity='precomputed', random_state=42)
-    coords = mds.fit_transform(distances)
-    
-    # Plot
-    fig, ax = plt.subplots(figsize=(10, 10))
-    ax.scatter(coords[:, 0], coords[:, 1])
-    
-    # Add word labels
-    for i, term in enumerate(top_terms):
-        ax.annotate(
-            term, 
-            (coords[i, 0], coords[i, 1]), 
-            fontsize=16,
-            bbox=dict(facecolor='white', edgecolor='gray', alpha=0.7),
-            ha='center', va='center')
-    
-    # Draw lines between similar terms
-    for i in range(len(top_terms)):
-        for j in range(i+1, len(top_terms)):
-            if similarities[i,j] > similarity_threshold:
-                ax.plot([coords[i,0], coords[j,0]], 
-                       [coords[i,1], coords[j,1]], 
-                       'gray', alpha=0.3)
-    if title: 
-        ax.set_title(f'Word Similarities in {title}')
-    else:
-        ax.set_title('Word Similarities')
-    plt.tight_layout()
-    return fig, ax
 
-def plot_word_similarities_tsne(tfidf_matrix, feature_names, n_highlight=5, perplexity=30, title=None):
-    """
-    Plot word similarities using t-SNE with all terms but highlighting top N.
-    """
-    # Get vectors for all terms
-    term_vectors = tfidf_matrix.T.toarray()
-    
-    # Identify top terms
-    mean_tfidf = tfidf_matrix.mean(axis=0).A1
-    top_indices = mean_tfidf.argsort()[-n_highlight:][::-1]
-    top_terms = feature_names[top_indices]
-    
-    # Calculate t-SNE for all terms
-    tsne = TSNE(n_components=2, 
-                perplexity=min(30, len(feature_names)/4), 
-                random_state=42)
-    coords = tsne.fit_transform(term_vectors)
-    
-    # Plot
-    fig, ax = plt.subplots(figsize=(10, 10))
-    
-    # Plot all points in light gray
-    ax.scatter(coords[:, 0], coords[:, 1], 
-              c='lightgray', alpha=0.5, s=30)
-    
-    # Highlight top terms
-    ax.scatter(coords[top_indices, 0], coords[top_indices, 1], 
-              c='red', s=100)
-    
-    # Add labels for top terms
-    for i, term in enumerate(top_terms):
-        ax.annotate(term, 
-                   (coords[top_indices[i], 0], coords[top_indices[i], 1]),
-                   fontsize=14,
-                   bbox=dict(facecolor='white', edgecolor='gray', alpha=0.7)
-        )
-    if title:
-        ax.set_title(f'Word Similarities in {title} (Top {n_highlight} Terms Highlighted)')
-    else:
-        ax.set_title(f'Word Similarities (Top {n_highlight} Terms Highlighted)')
-    plt.tight_layout()
-    return fig, ax
-
-
-def plot_similarities(tfidf_matrix, labels, 
-                      title="term document plot", 
-                        method='tsne', is_documents=True, label_color=False,
-                      top_terms=None, figsize=(12, 8)):
-    """
-    Create projection visualization of document or term similarities
-    
-    Parameters:
-    - tfidf_matrix: scipy sparse matrix
-    - labels: list of labels (document texts or terms)
-    - title: plot title
-    - method: 'tsne' or 'mds' for dimensionality reduction
-    - top_terms: if int, only annotate top n terms
-    - is_documents: if True, plot documents, else plot terms
-    - figsize: tuple for figure size
-    """
-
-    # Convert to dense array and transpose if visualizing terms
-    matrix = tfidf_matrix.toarray()
-    if not is_documents:
-        matrix = matrix.T
-    
-    # Dimensionality reduction method
-    if method == 'tsne':
-        tsne = TSNE(n_components=2, 
-                    perplexity=min(30, len(labels)-1),
-                    random_state=42)
-        coords = tsne.fit_transform(matrix)
-    elif method == 'mds':
-        mds = MDS(n_components=2, dissimilarity='precomputed', random_state=42)
-        distances = 1 - cosine_similarity(matrix)
-        coords = mds.fit_transform(distances)
-    else:
-        raise ValueError("Method must be 'tsne' or 'mds'") 
-    
-    # Create visualization
-    fig, ax = plt.subplots(figsize=figsize)
-    scatter = ax.scatter(coords[:, 0], coords[:, 1], alpha=0.6)
-    
-    # Add labels
-    if top_terms and isinstance(top_terms, int):
-        mean_tfidf = tfidf_matrix.mean(axis=0).A1 if is_documents else tfidf_matrix.mean(axis=1).A1
-        top_indices = mean_tfidf.argsort()[-top_terms:][::-1]
-        labels_to_annotate = [labels[i] for i in top_indices]
-        coords_to_annotate = coords[top_indices]
-    else:
-        labels_to_annotate = labels
-        coords_to_annotate = coords
-
-    if label_color:
-        unique_labels = list(set(labels_to_annotate))
-        color_map = {label: color for label, color in zip(unique_labels, plt.cm.rainbow(np.linspace(0, 1, len(unique_labels))))}
-        colors = [color_map[label] for label in labels_to_annotate]
-    else:
-        colors = ['black'] * len(labels_to_annotate)
-    
-    for i, (label, color) in enumerate(zip(labels_to_annotate, colors)):
-        # Split long labels for documents
-        if is_documents:
-            label = split_label(label, 20)
-            
-        ax.annotate(label, (coords_to_annotate[i, 0], coords_to_annotate[i, 1]),
-                    xytext=(5, 5), textcoords='offset points',
-                    fontsize=8 if is_documents else 12, alpha=0.7, color=color)
-    
-    
-    ax.set_title(title)
-    ax.grid(True, linestyle='--', alpha=0.3)
-    return fig, ax
-
-def plot_subreddit_term_space(vectors, term1, term2, title=None):
-    plt.figure(figsize=(8, 8))
-    ax = plt.gca()
-    
-    # Plot vectors from origin
-    colors = ['blue', 'green', 'red']
-    for (name, vec), color in zip(vectors.items(), colors):
-        plt.quiver(0, 0, vec[0], vec[1], angles='xy', scale_units='xy', scale=1,
-                  color=color, label=name, width=0.008)
-    
-
-    # Prepare all vectors data
-    all_values = np.concatenate([v for v in vectors.values()])
-    max_val = np.max(all_values) * 1.2
-
-    # Create the plotly figure
-    fig = go.Figure()
-
-    # Plot each vector with an arrow (scatter plot with annotations for arrowheads)
-    for label, vector in vectors.items():
-        fig.add_trace(go.Scatter(
-            x=[0, vector[0]],
-            y=[0, vector[1]],
-            mode='lines+markers+text',
-            marker=dict(size=10,symbol='triangle-right'),
-            line=dict(width=4),
-            name=label,
-            textposition="top center"
-        ))
-
-    # Set x and y limits
-    fig.update_xaxes(
-        range=[-0.1, max_val],
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='black',
-        showgrid=True,
-        gridcolor="gray",
-        gridwidth=0.5,
-        tickformat=".2f"
-    )
-
-    fig.update_yaxes(
-        range=[-0.1, max_val],
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='black',
-        showgrid=True,
-        gridcolor="gray",
-        gridwidth=0.5,
-        tickformat=".2f"
-    )
-
-    # Set plot aspect ratio and layout
-    fig.update_layout(
-        title=title or f"Vectors in {term1}-<span style='color:orange;'>{term2}</span> Space (Normalized)",
-        xaxis_title=f"'{term1}' Score",
-        yaxis_title=f"'<span style='color:orange;'>{term2}</span>' Score",
-        showlegend=True,
-        legend_title="Vectors",
-        template="plotly_white",
-        autosize=False,
-        width=600,
-        height=600
-    )
-
-    fig.show()
-    
 def report_distances(vectors):
     """
     Report the distances between subreddit vectors.
@@ -995,4 +374,28 @@ def report_distances(vectors):
                 angle = np.degrees(np.arccos(cos_sim))
                 print(f"{name1} vs {name2}: {angle:.1f}°")
 
-                
+
+# Plotting functions used to live in this module; keep them importable from
+# here without paying for matplotlib/plotly/sklearn.manifold on every import.
+_PLOT_FUNCTIONS = {
+    'plot_word_timeseries',
+    'plot_word_timeseries_df',
+    'plot_word_timeseries_df_cat',
+    'plot_word_timeseries_df_cat_plotly_test',
+    'plot_word_timeseries_df_cat_grouped',
+    'plot_word_timeseries_df_cat_grouped_test',
+    'plot_word_similarities_mds',
+    'plot_word_similarities_tsne',
+    'plot_similarities',
+    'plot_subreddit_term_space',
+}
+
+
+def __getattr__(name):
+    if name in _PLOT_FUNCTIONS:
+        return getattr(importlib.import_module('utils.visualization'), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _PLOT_FUNCTIONS)
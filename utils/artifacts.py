@@ -0,0 +1,175 @@
+# utils/artifacts.py
+# On-disk TF-IDF analyses. The matrix is stored as its raw CSR arrays (.npy, so
+# it reopens memory-mapped), next to the vocabulary, IDF weights, preprocessing
+# config and a hash of the inputs, so a saved analysis can be reopened without
+# recomputing it and new posts can be projected into the same space.
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+from utils.ingestion import preprocess_chunk
+
+CSR_ARRAYS = ('data', 'indices', 'indptr')
+DEFAULT_CONFIG = {
+    'title_column': 'post_title',
+    'selftext_column': 'post_body',
+    'include_selftext': True,
+    'min_doc_freq': 2,
+    'max_terms': 1000,
+}
+
+
+def input_hash(df, columns):
+    """Order-sensitive hash of the given columns of a DataFrame."""
+    rows = pd.util.hash_pandas_object(df[list(columns)].fillna(''), index=False).to_numpy()
+    return hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+
+
+class TfidfArtifact:
+    """
+    A fitted TF-IDF analysis: matrix, vocabulary, IDF weights and the
+    preprocessing config needed to transform new posts.
+
+    Args:
+        tfidf_matrix: Document x term CSR matrix
+        feature_names: Term of each column
+        idf: IDF weight of each column
+        config: Preprocessing and vectorizer settings (see fit)
+        input_hash: Hash of the input columns (see input_hash)
+        freq_df, vocab_stats: Vocabulary report of the fitted data
+    """
+
+    def __init__(self, tfidf_matrix, feature_names, idf, config, input_hash=None, freq_df=None, vocab_stats=None):
+        self.tfidf_matrix = tfidf_matrix
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.idf = idf
+        self.config = config
+        self.input_hash = input_hash
+        self._freq_df = freq_df
+        self._freq_path = None
+        self.vocab_stats = vocab_stats
+        self._counter = None
+
+    @property
+    def freq_df(self):
+        """Vocabulary frequency table (read from disk on first access after load)."""
+        if self._freq_df is None and self._freq_path and os.path.exists(self._freq_path):
+            self._freq_df = pd.read_pickle(self._freq_path)
+        return self._freq_df
+
+    @classmethod
+    def fit(cls, df, title_column='post_title', selftext_column='post_body', min_doc_freq=2, max_terms=1000,
+            include_selftext=True):
+        """Run tfidf_analyze_subreddit_df on a DataFrame and keep the fitted state."""
+        from utils.analysis import tfidf_analyze_subreddit_df
+        config = {
+            'title_column': title_column,
+            'selftext_column': selftext_column,
+            'include_selftext': include_selftext,
+            'min_doc_freq': min_doc_freq,
+            'max_terms': max_terms,
+        }
+        results = tfidf_analyze_subreddit_df(df, title_column, selftext_column, min_doc_freq, max_terms,
+                                             include_selftext)
+        return cls(results['tfidf_matrix'].tocsr(), results['feature_names'], results['vectorizer'].idf_, config,
+                   input_hash(df, cls._input_columns(config)), results['freq_df'], results['vocab_stats'])
+
+    @staticmethod
+    def _input_columns(config):
+        if config['include_selftext']:
+            return [config['title_column'], config['selftext_column']]
+        return [config['title_column']]
+
+    def matches(self, df, **config):
+        """True when this artifact was fit on the same rows with the same settings."""
+        settings = {**DEFAULT_CONFIG, **config}
+        return settings == self.config and input_hash(df, self._input_columns(settings)) == self.input_hash
+
+    def transform(self, new_df):
+        """
+        Project new posts onto the fitted vocabulary and IDF weights without refitting.
+
+        Args:
+            new_df: DataFrame with the configured title/body columns, or a list
+                of already preprocessed texts
+        Returns:
+            sp.csr_matrix: L2-normalised TF-IDF rows, one per post
+        """
+        if isinstance(new_df, pd.DataFrame):
+            texts = preprocess_chunk(new_df, self.config['title_column'], self.config['selftext_column'],
+                                     self.config['include_selftext'])
+        else:
+            texts = list(new_df)
+        if self._counter is None:
+            vocabulary = {term: i for i, term in enumerate(self.feature_names)}
+            self._counter = CountVectorizer(vocabulary=vocabulary)
+        counts = self._counter.transform(texts).astype(np.float64)
+        return normalize(counts @ sp.diags(np.asarray(self.idf)), norm='l2', copy=False).tocsr()
+
+    def results(self):
+        """Same dict as tfidf_analyze_subreddit_df, with this artifact as the vectorizer."""
+        return {
+            'tfidf_matrix': self.tfidf_matrix,
+            'feature_names': self.feature_names,
+            'freq_df': self.freq_df,
+            'vocab_stats': self.vocab_stats,
+            'vectorizer': self,
+        }
+
+    def save(self, path):
+        """Write the artifact to a directory."""
+        os.makedirs(path, exist_ok=True)
+        for name in CSR_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self.tfidf_matrix, name))
+        np.save(os.path.join(path, 'idf.npy'), np.asarray(self.idf, dtype=np.float64))
+        with open(os.path.join(path, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.feature_names.tolist(), f)
+        if self.freq_df is not None:
+            self.freq_df.to_pickle(os.path.join(path, 'freq_df.pkl'))
+        vocab_stats = {key: value.item() if isinstance(value, np.generic) else value
+                       for key, value in (self.vocab_stats or {}).items()}
+        manifest = {
+            'shape': list(self.tfidf_matrix.shape),
+            'config': self.config,
+            'input_hash': self.input_hash,
+            'vocab_stats': vocab_stats,
+        }
+        with open(os.path.join(path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Open a saved artifact; with mmap the matrix and IDF arrays stay on disk
+        until used. The frequency table is loaded on first access.
+        """
+        mode = 'r' if mmap else None
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, 'vocabulary.json'), encoding='utf-8') as f:
+            feature_names = json.load(f)
+        arrays = [np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode) for name in CSR_ARRAYS]
+        matrix = sp.csr_matrix(tuple(arrays), shape=tuple(manifest['shape']), copy=False)
+        idf = np.load(os.path.join(path, 'idf.npy'), mmap_mode=mode)
+        artifact = cls(matrix, feature_names, idf, manifest['config'], manifest['input_hash'],
+                       vocab_stats=manifest['vocab_stats'] or None)
+        artifact._freq_path = os.path.join(path, 'freq_df.pkl')
+        return artifact
+
+
+def load_or_fit(path, df, **config):
+    """
+    Reopen the artifact at path if it was fit on df with the same settings,
+    otherwise fit it (see TfidfArtifact.fit) and save it there.
+    """
+    if os.path.exists(os.path.join(path, 'manifest.json')):
+        artifact = TfidfArtifact.load(path)
+        if artifact.matches(df, **config):
+            return artifact
+    artifact = TfidfArtifact.fit(df, **config)
+    artifact.save(path)
+    return artifact
@@ -0,0 +1,213 @@
+# utils/corpus.py
+# Integer-coded corpus. Documents are preprocessed once; tokens are interned in
+# a shared vocabulary and stored as one int32 array with CSR-style offsets, so
+# counting and vectorising never re-split strings.
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+from utils.text_processor import english_stopwords
+from utils.ingestion import iter_csv_chunks, iter_post_chunks, preprocess_chunk
+from config.settings import SCORED_COMMENT_FILES
+
+
+class TokenCorpus:
+    """
+    Tokenized documents with metadata.
+
+    Args:
+        vocabulary: Term per token id
+        tokens: int32 token ids of all documents, concatenated
+        offsets: Tokens of document i are tokens[offsets[i]:offsets[i + 1]]
+        metadata: DataFrame with one row per document (e.g. post_id, subreddit,
+            timestamp, score)
+    """
+
+    def __init__(self, vocabulary, tokens, offsets, metadata=None):
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.tokens = tokens
+        self.offsets = offsets
+        self.metadata = metadata if metadata is not None else pd.DataFrame(index=range(len(offsets) - 1))
+        self._term_ids = None
+
+    @classmethod
+    def from_texts(cls, texts, metadata=None):
+        """Build from preprocessed (space-joined) texts."""
+        builder = _CorpusBuilder()
+        builder.add(texts, metadata)
+        return builder.build()
+
+    @classmethod
+    def from_csv(cls, paths=None, chunksize=10000, title_column='post_title', selftext_column='post_body',
+                 include_selftext=True, posts_only=True):
+        """
+        Preprocess CSV files chunk by chunk into a corpus.
+
+        Args:
+            paths: Dict mapping subreddit name -> CSV (defaults to SCORED_COMMENT_FILES)
+            posts_only: One document per unique post (see iter_post_chunks); otherwise one per row
+        Returns:
+            TokenCorpus with post_id, subreddit, timestamp and score metadata
+        """
+        paths = paths or SCORED_COMMENT_FILES
+        builder = _CorpusBuilder()
+        for subreddit, path in paths.items():
+            chunks = iter_post_chunks(path, chunksize) if posts_only else iter_csv_chunks(path, chunksize)
+            for chunk in chunks:
+                texts = preprocess_chunk(chunk, title_column, selftext_column, include_selftext)
+                builder.add(texts, pd.DataFrame({
+                    'post_id': chunk['post_id'].to_numpy(),
+                    'subreddit': subreddit,
+                    'timestamp': pd.to_numeric(chunk['post_datetime'], errors='coerce').to_numpy(),
+                    'score': pd.to_numeric(chunk['post_score'], errors='coerce').to_numpy(),
+                }))
+        return builder.build()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def term_ids(self):
+        """Mapping term -> token id."""
+        if self._term_ids is None:
+            self._term_ids = pd.Index(self.vocabulary)
+        return self._term_ids
+
+    def ids(self, terms):
+        """Token ids of terms (-1 for terms not in the vocabulary)."""
+        return self.term_ids.get_indexer(list(terms))
+
+    def doc_ids(self):
+        """Document index of every token."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+
+    def document(self, i):
+        """Terms of document i."""
+        return self.vocabulary[self.tokens[self.offsets[i]:self.offsets[i + 1]]].tolist()
+
+    def texts(self):
+        """Yield documents as space-joined strings (for consumers that need text)."""
+        for i in range(len(self)):
+            yield ' '.join(self.document(i))
+
+    def take(self, docs):
+        """Corpus of the given documents, in that order, sharing the vocabulary."""
+        docs = np.asarray(docs, dtype=np.int64)
+        lengths = np.diff(self.offsets)[docs]
+        starts = self.offsets[docs]
+        take = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+        return TokenCorpus(self.vocabulary, self.tokens[take], np.concatenate([[0], np.cumsum(lengths)]),
+                           self.metadata.iloc[docs].reset_index(drop=True))
+
+    def subset(self, mask):
+        """Corpus of the documents selected by a boolean mask, sharing the vocabulary."""
+        return self.take(np.flatnonzero(mask))
+
+    def count_matrix(self):
+        """Document x term counts over the full vocabulary (CSR, int64)."""
+        data = np.ones(len(self.tokens), dtype=np.int64)
+        matrix = sp.csr_matrix((data, (self.doc_ids(), self.tokens)), shape=(len(self), len(self.vocabulary)))
+        matrix.sum_duplicates()
+        return matrix
+
+    def tfidf_matrix(self, max_terms=1000, min_doc_freq=2, stop_words=None):
+        """
+        TF-IDF matrix with the same vocabulary and weights as generate_tfidf_matrix.
+
+        Returns:
+            tuple: (tfidf_matrix, feature_names)
+        """
+        counts = self.count_matrix()
+        stop_words = set(english_stopwords() if stop_words is None else stop_words)
+        # Same term selection as TfidfVectorizer: alphabetical order, min_df, then
+        # the max_features most frequent terms with its tie order
+        order = np.argsort(self.vocabulary.astype(str), kind='stable')
+        keep = order[[term not in stop_words for term in self.vocabulary[order]]]
+        doc_freq = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        keep = keep[doc_freq[keep] >= (min_doc_freq if isinstance(min_doc_freq, int) else min_doc_freq * len(self))]
+        if max_terms is not None and len(keep) > max_terms:
+            term_freq = np.asarray(counts.sum(axis=0)).ravel()
+            keep = keep[np.sort((-term_freq[keep]).argsort()[:max_terms])]
+
+        counts = counts[:, keep].astype(np.float64)
+        idf = np.log((1 + len(self)) / (1 + doc_freq[keep])) + 1
+        tfidf = normalize(counts @ sp.diags(idf), norm='l2', copy=False).tocsr()
+        return tfidf, self.vocabulary[keep]
+
+    def term_counts_by_date(self, terms, freq=None):
+        """
+        Count terms per document timestamp, as count_terms_by_date does.
+
+        Args:
+            terms: List of terms
+            freq: Optional pandas frequency to bucket timestamps (e.g. 'D')
+        Returns:
+            tuple: (dates, daily_counts) where daily_counts maps term -> list of counts
+        """
+        ids = self.ids(terms)
+        invalid_terms = [term for term, term_id in zip(terms, ids) if term_id < 0]
+        if invalid_terms:
+            raise ValueError(f"Terms not in vocabulary: {invalid_terms}")
+
+        dates = pd.to_datetime(self.metadata['timestamp'], unit='s')
+        if freq is not None:
+            dates = dates.dt.floor(freq)
+        date_codes, unique_dates = pd.factorize(dates, sort=True)
+
+        # Column j of the lookup marks token id ids[j]
+        lookup = np.full(len(self.vocabulary), -1, dtype=np.int64)
+        lookup[ids] = np.arange(len(ids))
+        hits = lookup[self.tokens]
+        found = hits >= 0
+        counts = np.zeros((len(unique_dates), len(ids)), dtype=np.int64)
+        np.add.at(counts, (date_codes[self.doc_ids()[found]], hits[found]), 1)
+        return list(unique_dates), {term: counts[:, j].tolist() for j, term in enumerate(terms)}
+
+    def save(self, path):
+        """Write the corpus to a directory; arrays are stored as .npy for memory mapping."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'tokens.npy'), np.asarray(self.tokens, dtype=np.int32))
+        np.save(os.path.join(path, 'offsets.npy'), np.asarray(self.offsets, dtype=np.int64))
+        with open(os.path.join(path, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.vocabulary.tolist(), f)
+        self.metadata.to_pickle(os.path.join(path, 'metadata.pkl'))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a saved corpus; with mmap the token and offset arrays stay on disk."""
+        mode = 'r' if mmap else None
+        tokens = np.load(os.path.join(path, 'tokens.npy'), mmap_mode=mode)
+        offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode=mode)
+        with open(os.path.join(path, 'vocabulary.json'), encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        return cls(vocabulary, tokens, offsets, pd.read_pickle(os.path.join(path, 'metadata.pkl')))
+
+
+class _CorpusBuilder:
+    """Interns tokens chunk by chunk."""
+
+    def __init__(self):
+        self.term_ids = {}
+        self.tokens = []
+        self.lengths = []
+        self.metadata = []
+
+    def add(self, texts, metadata=None):
+        split = [text.split() for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in split), dtype=np.int64, count=len(split))
+        flat = np.array([token for tokens in split for token in tokens], dtype=object)
+        if len(flat):
+            codes, uniques = pd.factorize(flat)
+            ids = np.array([self.term_ids.setdefault(term, len(self.term_ids)) for term in uniques], dtype=np.int32)
+            self.tokens.append(ids[codes])
+        self.lengths.append(lengths)
+        self.metadata.append(metadata if metadata is not None else pd.DataFrame(index=range(len(split))))
+
+    def build(self):
+        tokens = np.concatenate(self.tokens) if self.tokens else np.zeros(0, dtype=np.int32)
+        lengths = np.concatenate(self.lengths) if self.lengths else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        metadata = pd.concat(self.metadata, ignore_index=True) if self.metadata else None
+        return TokenCorpus(list(self.term_ids), tokens, offsets, metadata)
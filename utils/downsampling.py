@@ -0,0 +1,127 @@
+# utils/downsampling.py
+# Keep Plotly payloads bounded for long series: LTTB downsampling, automatic
+# WebGL traces and tick spacing that adapts to the plotted date range.
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 2000        # Points per trace after downsampling
+WEBGL_THRESHOLD = 1000   # Raw points per trace above which Scattergl is used
+MAX_TICKS = 20           # Target number of date ticks on the x axis
+
+# Candidate date tick spacings, in milliseconds or Plotly month notation
+_DATE_DTICKS = [
+    (3600 * 1000, 3600 * 1000),
+    (6 * 3600 * 1000, 6 * 3600 * 1000),
+    (12 * 3600 * 1000, 12 * 3600 * 1000),
+    (86400 * 1000, 86400 * 1000),
+    (2 * 86400 * 1000, 2 * 86400 * 1000),
+    (7 * 86400 * 1000, 7 * 86400 * 1000),
+    (14 * 86400 * 1000, 14 * 86400 * 1000),
+    (30 * 86400 * 1000, 'M1'),
+    (91 * 86400 * 1000, 'M3'),
+    (182 * 86400 * 1000, 'M6'),
+    (365 * 86400 * 1000, 'M12'),
+]
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if x.dtype == object:
+        return pd.to_datetime(x).values.astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select n_out points with Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x: Sorted x values (numbers or datetimes)
+        y: y values
+        n_out: Number of points to keep (including first and last)
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket (or the last point) is the third vertex
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        # Twice the triangle area for every candidate in this bucket
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        indices[i + 1] = prev
+
+    return indices
+
+
+def downsample(x, y, max_points=MAX_POINTS, keep=None):
+    """
+    Downsample a series with LTTB, always retaining the given indices.
+
+    Args:
+        x: Sorted x values
+        y: y values
+        max_points: Upper bound on the returned number of points (plus keep)
+        keep: Optional indices that must survive, e.g. annotated peaks
+    Returns:
+        tuple: (x, y) as numpy arrays
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    indices = lttb_indices(x, y, max_points)
+    if keep is not None and len(indices) < len(y):
+        indices = np.union1d(indices, np.asarray(keep, dtype=np.int64))
+    return x[indices], y[indices]
+
+
+def date_dtick(dates, max_ticks=MAX_TICKS):
+    """
+    Pick a Plotly dtick for a date axis so that at most max_ticks ticks are drawn.
+    """
+    dates = pd.to_datetime(np.asarray(dates))
+    if len(dates) < 2:
+        return _DATE_DTICKS[3][1]
+    span_ms = (dates.max() - dates.min()).total_seconds() * 1000
+    for step_ms, dtick in _DATE_DTICKS:
+        if span_ms / step_ms <= max_ticks:
+            return dtick
+    return 'M%d' % (12 * int(np.ceil(span_ms / (365 * 86400 * 1000) / max_ticks)))
+
+
+def scatter_trace(x, y, max_points=MAX_POINTS, webgl_threshold=WEBGL_THRESHOLD, keep=None, **kwargs):
+    """
+    Build a Plotly scatter trace that stays small for long series.
+
+    Series longer than max_points are LTTB-downsampled (keeping `keep` indices),
+    and series longer than webgl_threshold use Scattergl without markers.
+    Remaining keyword arguments are passed on to the trace.
+    """
+    import plotly.graph_objects as go
+
+    n_points = len(y)
+    x, y = downsample(x, y, max_points, keep)
+    if n_points > webgl_threshold:
+        if 'mode' in kwargs:
+            kwargs['mode'] = kwargs['mode'].replace('+markers', '')
+        kwargs.pop('marker', None)
+        return go.Scattergl(x=x, y=y, **kwargs)
+    return go.Scatter(x=x, y=y, **kwargs)
@@ -0,0 +1,158 @@
+# utils/engagement.py
+# User engagement across r/China, r/HongKong and r/Taiwan from the scored comment
+# files. All statistics are computed from integer-coded arrays and sparse
+# user x subreddit / user x category matrices, never per user in Python.
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from config.settings import SCORED_COMMENT_FILES, CATEGORIES
+from utils.ingestion import iter_csv_chunks
+
+ENGAGEMENT_COLUMNS = ['post_id', 'post_owner', 'post_score', 'comment_owner', 'comment_score', 'gpt_score']
+
+
+def _encode_users(values, users):
+    """Map user names to integer ids, adding unseen names to `users`."""
+    codes, uniques = pd.factorize(values)
+    ids = np.array([users.setdefault(user, len(users)) for user in uniques], dtype=np.int32)
+    return ids[codes] if len(ids) else np.zeros(0, dtype=np.int32)
+
+
+def build_engagement(paths=None, chunksize=100000):
+    """
+    Read the scored comment files once and build user activity arrays.
+
+    Args:
+        paths: Dict mapping subreddit name -> scored comment CSV (defaults to SCORED_COMMENT_FILES)
+        chunksize: Rows per chunk
+    Returns:
+        dict: users, subreddits, categories, per-event arrays for 'comments' and 'posts'
+            (user, subreddit, category, score) and sparse 'user_subreddit' and
+            'user_category' activity counts (comments + posts)
+    """
+    paths = paths or SCORED_COMMENT_FILES
+    subreddits = list(paths)
+    category_codes = {category: i for i, category in enumerate(CATEGORIES)}
+    users = {}
+    events = {'comments': [], 'posts': []}
+
+    for forum, path in enumerate(paths.values()):
+        seen_posts = set()
+        for chunk in iter_csv_chunks(path, chunksize, usecols=ENGAGEMENT_COLUMNS):
+            categories = chunk['gpt_score'].map(category_codes).fillna(-1).to_numpy(np.int8)
+
+            comments = chunk['comment_owner'].notna().to_numpy()
+            events['comments'].append((
+                _encode_users(chunk['comment_owner'][comments], users),
+                np.full(comments.sum(), forum, dtype=np.int8),
+                categories[comments],
+                chunk['comment_score'][comments].to_numpy(np.float32),
+            ))
+
+            # Post columns repeat on every comment row; count each post once
+            first = ~chunk['post_id'].duplicated().to_numpy() & ~chunk['post_id'].isin(seen_posts).to_numpy()
+            seen_posts.update(chunk['post_id'][first])
+            posts = first & chunk['post_owner'].notna().to_numpy()
+            events['posts'].append((
+                _encode_users(chunk['post_owner'][posts], users),
+                np.full(posts.sum(), forum, dtype=np.int8),
+                categories[posts],
+                chunk['post_score'][posts].to_numpy(np.float32),
+            ))
+
+    engagement = {
+        'users': np.array(list(users), dtype=object),
+        'subreddits': subreddits,
+        'categories': CATEGORIES,
+    }
+    for kind, parts in events.items():
+        user, forum, category, score = (np.concatenate(column) for column in zip(*parts))
+        engagement[kind] = {
+            'user': user.astype(np.int32),
+            'subreddit': forum.astype(np.int8),
+            'category': category.astype(np.int8),
+            'score': score.astype(np.float32),
+        }
+
+    n_users = len(users)
+    user = np.concatenate([engagement['comments']['user'], engagement['posts']['user']])
+    forum = np.concatenate([engagement['comments']['subreddit'], engagement['posts']['subreddit']])
+    category = np.concatenate([engagement['comments']['category'], engagement['posts']['category']])
+    ones = np.ones(len(user), dtype=np.int32)
+    engagement['user_subreddit'] = sp.csr_matrix((ones, (user, forum)), shape=(n_users, len(subreddits)))
+    known = category >= 0
+    engagement['user_category'] = sp.csr_matrix((ones[known], (user[known], category[known])),
+                                                shape=(n_users, len(CATEGORIES)))
+    return engagement
+
+
+def user_activity_stats(engagement):
+    """
+    Per-user activity and comment score statistics.
+
+    Returns:
+        pd.DataFrame: indexed by user with comment/post counts, number of subreddits,
+            comment score mean/std/max/total, per-subreddit activity and category shares
+    """
+    n_users = len(engagement['users'])
+    comments, posts = engagement['comments'], engagement['posts']
+    user, score = comments['user'], comments['score'].astype(np.float64)
+
+    n_comments = np.bincount(user, minlength=n_users)
+    score_total = np.bincount(user, weights=score, minlength=n_users)
+    score_sumsq = np.bincount(user, weights=score ** 2, minlength=n_users)
+    score_max = np.full(n_users, np.nan)
+    if len(user):
+        order = np.lexsort((-score, user))
+        first = np.r_[True, user[order][1:] != user[order][:-1]]
+        score_max[user[order][first]] = score[order][first]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score_mean = score_total / n_comments
+        score_std = np.sqrt(np.maximum(score_sumsq / n_comments - score_mean ** 2, 0))
+
+    activity = engagement['user_subreddit']
+    by_category = engagement['user_category'].toarray()
+    category_total = by_category.sum(axis=1, keepdims=True)
+
+    stats = pd.DataFrame({
+        'n_comments': n_comments,
+        'n_posts': np.bincount(posts['user'], minlength=n_users),
+        'n_subreddits': activity.getnnz(axis=1),
+        'score_mean': score_mean,
+        'score_std': score_std,
+        'score_max': score_max,
+        'score_total': score_total,
+    }, index=pd.Index(engagement['users'], name='user'))
+    for i, subreddit in enumerate(engagement['subreddits']):
+        stats[f'activity_{subreddit}'] = activity[:, i].toarray().ravel()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = np.where(category_total > 0, by_category / category_total, 0.0)
+    for i, category in enumerate(engagement['categories']):
+        stats[f'share_{category.lower()}'] = shares[:, i]
+    return stats
+
+
+def audience_overlap(engagement, by='subreddit', min_activity=1):
+    """
+    Jaccard similarity between the audiences of subreddits (or categories).
+
+    Args:
+        engagement: Result of build_engagement
+        by: 'subreddit' or 'category'
+        min_activity: Minimum number of comments/posts for a user to count as audience
+    Returns:
+        pd.DataFrame: Symmetric Jaccard matrix
+    """
+    if by not in ('subreddit', 'category'):
+        raise ValueError("by must be 'subreddit' or 'category'")
+    matrix = engagement[f'user_{by}']
+    labels = engagement['subreddits'] if by == 'subreddit' else engagement['categories']
+
+    audience = (matrix >= min_activity).astype(np.int64)
+    intersection = (audience.T @ audience).toarray()
+    sizes = np.diag(intersection)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jaccard = np.where(union > 0, intersection / union, 0.0)
+    return pd.DataFrame(jaccard, index=labels, columns=labels)
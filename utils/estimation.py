@@ -0,0 +1,221 @@
+# utils/estimation.py
+# Estimate POLITICAL/CULTURAL/OTHER shares without labelling every post: posts
+# are stratified, the LLM labels a Neyman-allocated sample in rounds, and
+# sampling stops once every confidence interval is tight enough.
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from config.settings import CATEGORIES
+from utils.ingestion import load_posts
+
+logger = logging.getLogger(__name__)
+
+
+def assign_strata(posts, by=('subreddit', 'score_band'), score_bands=3, prior_scores=None, prior_bins=3):
+    """
+    Stratum key per post.
+
+    Args:
+        posts: Post DataFrame
+        by: Columns of posts, or 'day' (from post_datetime), 'score_band' (post_score
+            quantiles) and 'prior' (bins of prior_scores)
+        score_bands: Number of post_score quantile bands
+        prior_scores: Cheap local classifier score per post, e.g. a propagated
+            POLITICAL probability
+        prior_bins: Number of equal-width bins for prior_scores
+    Returns:
+        pd.Series: Stratum key per post (same index as posts)
+    """
+    parts = []
+    for key in by:
+        if key == 'day':
+            part = pd.to_datetime(posts['post_datetime'], unit='s').dt.strftime('%Y-%m-%d')
+        elif key == 'score_band':
+            part = pd.qcut(posts['post_score'].rank(method='first'), score_bands, labels=False,
+                           duplicates='drop').astype(str)
+        elif key == 'prior':
+            part = pd.Series(np.digitize(prior_scores, np.linspace(0, 1, prior_bins + 1)[1:-1]).astype(str),
+                             index=posts.index)
+        else:
+            part = posts[key].astype(str)
+        parts.append(part)
+    strata = parts[0]
+    for part in parts[1:]:
+        strata = strata + '|' + part
+    return strata.rename('stratum')
+
+
+class StratifiedEstimator:
+    """
+    Sequential stratified estimate of category proportions.
+
+    A pilot of `pilot_size` posts per stratum estimates within-stratum
+    variability; each following round labels `batch_size` posts allocated by
+    Neyman allocation (n_h proportional to N_h * S_h). Sampling stops when the
+    widest confidence interval half-width is at most `target_half_width`, when
+    `budget` labels have been spent, or when every post is labelled.
+
+    Args:
+        posts: Post DataFrame (post_body, post_title)
+        strata: Stratum key per post (see assign_strata)
+        label_fn: Callable mapping a post text to a label, e.g. GPTClassifier(...).label
+        target_half_width: Stopping threshold for the CI half-width
+        confidence: Confidence level of the intervals
+        pilot_size: Posts per stratum in the pilot round
+        batch_size: Labels per sequential round
+        budget: Maximum number of labels (None for no limit)
+        max_workers: Concurrent label_fn calls
+        seed: Random seed for the sample order
+    """
+
+    def __init__(self, posts, strata, label_fn, target_half_width=0.03, confidence=0.95, pilot_size=5,
+                 batch_size=20, budget=None, max_workers=8, seed=0):
+        self.texts = posts['post_body'].where(posts['post_body'].notna() & (posts['post_body'] != ''),
+                                              posts['post_title']).fillna('').to_numpy(object)
+        self.stratum_codes, self.strata = pd.factorize(pd.Series(strata).to_numpy())
+        self.label_fn = label_fn
+        self.target_half_width = target_half_width
+        self.z = norm.ppf(0.5 + confidence / 2)
+        self.pilot_size = pilot_size
+        self.batch_size = batch_size
+        self.budget = budget
+        self.max_workers = max_workers
+
+        # Each stratum is sampled without replacement in a fixed random order
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.texts))
+        order = order[np.argsort(self.stratum_codes[order], kind='stable')]
+        self.sizes = np.bincount(self.stratum_codes, minlength=len(self.strata))
+        self.queue_offsets = np.concatenate([[0], np.cumsum(self.sizes)])
+        self.queue = order
+        self.drawn = np.zeros(len(self.strata), dtype=np.int64)
+        self.counts = np.zeros((len(self.strata), len(CATEGORIES)), dtype=np.int64)
+        self.labels = pd.Series(index=posts.index, dtype=object)
+        self.n_calls = 0
+
+    @property
+    def n_labelled(self):
+        return int(self.counts.sum())
+
+    def _label(self, text):
+        try:
+            return self.label_fn(text)
+        except Exception as exc:
+            logger.warning("Labelling failed: %s", exc)
+            return None
+
+    def _draw(self, allocation):
+        """Label the next allocation[h] posts of each stratum."""
+        rows = np.concatenate([
+            self.queue[self.queue_offsets[h] + self.drawn[h]:self.queue_offsets[h] + self.drawn[h] + n]
+            for h, n in enumerate(allocation) if n > 0
+        ] or [np.zeros(0, dtype=np.int64)])
+        self.drawn += allocation
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            labels = list(executor.map(self._label, self.texts[rows]))
+        self.n_calls += len(rows)
+
+        labels = pd.Series(labels, dtype=object)
+        codes = labels.map({label: i for i, label in enumerate(CATEGORIES)}).to_numpy()
+        ok = ~pd.isna(codes)
+        np.add.at(self.counts, (self.stratum_codes[rows[ok]], codes[ok].astype(int)), 1)
+        self.labels.iloc[rows[ok]] = labels[ok].to_numpy()
+
+    def _stratum_deviation(self):
+        """Smoothed within-stratum standard deviation summed over categories."""
+        n = self.counts.sum(axis=1, keepdims=True)
+        p = (self.counts + 0.5) / (n + 1.5)
+        return np.sqrt((p * (1 - p)).sum(axis=1))
+
+    def allocate(self, n):
+        """Split n new labels across strata toward the Neyman allocation."""
+        available = self.sizes - self.drawn
+        n = min(n, int(available.sum()))
+        weights = self.sizes * self._stratum_deviation()
+        target = (self.drawn.sum() + n) * weights / weights.sum()
+        need = np.clip(target - self.drawn, 0, available)
+        if need.sum() <= 0:
+            need = available.astype(np.float64)
+        share = need / need.sum() * n
+        allocation = np.minimum(np.floor(share).astype(np.int64), available)
+        # Hand out the remainder by largest fractional part, then to any stratum with room
+        for h in np.argsort(-(share - allocation)):
+            if allocation.sum() >= n:
+                break
+            if allocation[h] < available[h]:
+                allocation[h] += 1
+        return allocation
+
+    def estimate(self):
+        """
+        Stratified proportion estimates.
+
+        Returns:
+            pd.DataFrame: indexed by category with proportion, std_error, ci_low,
+                ci_high and half_width columns
+        """
+        n = self.counts.sum(axis=1)
+        sampled = n > 0
+        # Strata without labels yet are left out and the weights renormalised
+        weights = np.where(sampled, self.sizes, 0) / max(self.sizes[sampled].sum(), 1)
+        p = np.divide(self.counts, n[:, None], out=np.zeros(self.counts.shape), where=sampled[:, None])
+        proportion = (weights[:, None] * p).sum(axis=0)
+
+        p_smooth = (self.counts + 0.5) / (n[:, None] + 1.5)
+        fpc = np.where(self.sizes > 0, 1 - n / np.maximum(self.sizes, 1), 0)
+        variance = (weights[:, None] ** 2 * fpc[:, None] * p_smooth * (1 - p_smooth)
+                    / np.maximum(n - 1, 1)[:, None]).sum(axis=0)
+        std_error = np.sqrt(variance)
+        half_width = self.z * std_error
+        return pd.DataFrame({
+            'proportion': proportion,
+            'std_error': std_error,
+            'ci_low': np.clip(proportion - half_width, 0, 1),
+            'ci_high': np.clip(proportion + half_width, 0, 1),
+            'half_width': half_width,
+        }, index=pd.Index(CATEGORIES, name='category'))
+
+    def done(self):
+        if self.drawn.sum() >= self.sizes.sum():
+            return True
+        if self.budget is not None and self.n_calls >= self.budget:
+            return True
+        return self.n_labelled > 0 and self.estimate()['half_width'].max() <= self.target_half_width
+
+    def run(self):
+        """Pilot, then sequential Neyman rounds until done(); returns estimate()."""
+        pilot = np.minimum(self.pilot_size, self.sizes - self.drawn)
+        if self.budget is not None:
+            pilot = np.minimum(pilot, self.allocate(self.budget - self.n_calls))
+        self._draw(pilot)
+        while not self.done():
+            n = self.batch_size if self.budget is None else min(self.batch_size, self.budget - self.n_calls)
+            self._draw(self.allocate(n))
+        return self.estimate()
+
+
+def estimate_proportions(posts, label_fn, group='subreddit', by=('score_band',), **kwargs):
+    """
+    Estimate category shares separately for each group (e.g. each subreddit).
+
+    Args:
+        posts: Post DataFrame (see load_posts)
+        label_fn: Callable mapping a post text to a label
+        group: Column defining the populations to estimate
+        by: Stratification within each group (see assign_strata)
+        **kwargs: Passed to StratifiedEstimator
+    Returns:
+        pd.DataFrame: group, category, proportion, std_error, ci_low, ci_high,
+            half_width, n_labelled and n_posts columns
+    """
+    results = []
+    for name, members in posts.groupby(group, sort=False):
+        estimator = StratifiedEstimator(members, assign_strata(members, by), label_fn, **kwargs)
+        estimate = estimator.run().reset_index()
+        estimate.insert(0, group, name)
+        estimate['n_labelled'] = estimator.n_labelled
+        estimate['n_posts'] = len(members)
+        results.append(estimate)
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,103 @@
+# utils/ingestion.py
+# Chunked, out-of-core reading of the posts/comments CSV files. Nothing here
+# holds more than one chunk of rows in memory at a time.
+import pandas as pd
+from config.settings import SCORED_COMMENT_FILES
+from utils.text_processor import preprocess_text
+
+POST_COLUMNS = ['post_title', 'post_id', 'post_body', 'post_datetime', 'post_score', 'post_owner']
+
+
+def iter_csv_chunks(path, chunksize=10000, usecols=None, unique_column=None):
+    """
+    Read a CSV file in fixed-size chunks.
+
+    Args:
+        path: Path to the CSV file
+        chunksize: Number of rows per chunk
+        usecols: Optional list of columns to read
+        unique_column: If set, drop rows whose value in this column was already seen
+            (e.g. 'post_id' to read posts once from a comments file)
+    Yields:
+        pd.DataFrame: One chunk of rows
+    """
+    seen = set()
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols):
+        if unique_column:
+            chunk = chunk.drop_duplicates(unique_column)
+            chunk = chunk[~chunk[unique_column].isin(seen)]
+            seen.update(chunk[unique_column])
+        if len(chunk):
+            yield chunk
+
+
+def iter_post_chunks(path, chunksize=10000):
+    """
+    Read unique posts in chunks from a posts or comments file.
+
+    Comment files repeat the full post columns on every comment row, so only
+    the post columns are parsed and each post_id is yielded once.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in POST_COLUMNS if col in header]
+    return iter_csv_chunks(path, chunksize, usecols=usecols, unique_column='post_id')
+
+
+def load_posts(paths=None, chunksize=100000):
+    """Unique posts from per-subreddit CSVs with a subreddit column added."""
+    paths = paths or SCORED_COMMENT_FILES
+    frames = [chunk.assign(subreddit=subreddit)
+              for subreddit, path in paths.items() for chunk in iter_post_chunks(path, chunksize)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def preprocess_chunk(chunk, title_column='post_title', selftext_column='post_body', include_selftext=True,
+                     fast=False, min_len=3):
+    """
+    Preprocess the title and optionally the body of every row in a chunk.
+
+    fast and min_len are passed to preprocess_text.
+
+    Returns:
+        list: One preprocessed text per row
+    """
+    titles = chunk[title_column].map(lambda text: preprocess_text(text, fast, min_len))
+    if not include_selftext:
+        return titles.tolist()
+    return [
+        title + (' ' + preprocess_text(body, fast, min_len) if pd.notna(body) else '')
+        for title, body in zip(titles, chunk[selftext_column])
+    ]
+
+
+class TextStream:
+    """
+    Re-iterable stream of preprocessed text chunks from one or more CSV files.
+
+    Each iteration re-reads the files chunk by chunk, so memory use depends on
+    chunksize rather than on file size.
+    """
+
+    def __init__(self, paths, chunksize=10000, title_column='post_title', selftext_column='post_body',
+                 include_selftext=True, posts_only=True, fast=False, min_len=3):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.chunksize = chunksize
+        self.title_column = title_column
+        self.selftext_column = selftext_column
+        self.include_selftext = include_selftext
+        self.posts_only = posts_only
+        self.fast = fast
+        self.min_len = min_len
+
+    def chunks(self):
+        """Yield the raw DataFrame chunks."""
+        for path in self.paths:
+            if self.posts_only:
+                yield from iter_post_chunks(path, self.chunksize)
+            else:
+                yield from iter_csv_chunks(path, self.chunksize)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield preprocess_chunk(chunk, self.title_column, self.selftext_column, self.include_selftext,
+                                   self.fast, self.min_len)
@@ -0,0 +1,148 @@
+# utils/logodds.py
+# Differential vocabulary between subreddits: weighted log-odds ratios with an
+# informative Dirichlet prior (Monroe, Colaresi & Quinn 2008), with document
+# bootstrap confidence intervals computed across a process pool.
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from utils.text_processor import english_stopwords
+
+BOOTSTRAP_BATCH = 50
+
+
+def term_count_matrices(texts_by_subreddit, max_terms=None, min_doc_freq=2):
+    """
+    Document x term count matrices for each subreddit on a shared vocabulary.
+
+    Args:
+        texts_by_subreddit: Dict mapping subreddit name -> list of preprocessed texts
+        max_terms: Maximum vocabulary size (None for all terms)
+        min_doc_freq: Minimum document frequency over all subreddits
+    Returns:
+        tuple: (counts, feature_names) where counts maps subreddit -> CSR matrix
+    """
+    names = list(texts_by_subreddit)
+    vectorizer = CountVectorizer(stop_words=english_stopwords(), max_features=max_terms, min_df=min_doc_freq)
+    matrix = vectorizer.fit_transform([text for name in names for text in texts_by_subreddit[name]]).tocsr()
+    bounds = np.cumsum([0] + [len(texts_by_subreddit[name]) for name in names])
+    counts = {name: matrix[bounds[i]:bounds[i + 1]] for i, name in enumerate(names)}
+    return counts, vectorizer.get_feature_names_out()
+
+
+def dirichlet_prior(counts, prior_size=None):
+    """
+    Informative Dirichlet prior from pooled term counts.
+
+    Args:
+        counts: Dict of document x term count matrices (all subreddits form the background)
+        prior_size: Total prior mass alpha_0; defaults to the pooled token count
+    Returns:
+        np.ndarray: alpha per term
+    """
+    background = np.asarray(sum(matrix.sum(axis=0) for matrix in counts.values()), dtype=np.float64).ravel()
+    background = np.maximum(background, 0.01)
+    if prior_size is None:
+        return background
+    return prior_size * background / background.sum()
+
+
+def log_odds(y_a, y_b, alpha):
+    """
+    Weighted log-odds of each term between two groups.
+
+    Args:
+        y_a, y_b: Term counts, shape (n_terms,) or (n_replicates, n_terms)
+        alpha: Dirichlet prior per term
+    Returns:
+        tuple: (delta, z) arrays of the same shape as y_a
+    """
+    alpha0 = alpha.sum()
+    n_a = y_a.sum(axis=-1, keepdims=True)
+    n_b = y_b.sum(axis=-1, keepdims=True)
+    delta = (np.log(y_a + alpha) - np.log(n_a + alpha0 - y_a - alpha)
+             - np.log(y_b + alpha) + np.log(n_b + alpha0 - y_b - alpha))
+    variance = 1.0 / (y_a + alpha) + 1.0 / (y_b + alpha)
+    return delta, delta / np.sqrt(variance)
+
+
+def _resampled_counts(matrix, n_replicates, rng):
+    """Term totals of n_replicates document resamples, via one sparse selection matrix."""
+    n_docs = matrix.shape[0]
+    rows = np.repeat(np.arange(n_replicates), n_docs)
+    docs = rng.integers(0, n_docs, size=n_replicates * n_docs)
+    selection = sp.csr_matrix((np.ones(len(docs), dtype=np.float64), (rows, docs)), shape=(n_replicates, n_docs))
+    return (selection @ matrix).toarray()
+
+
+_worker_counts = None
+
+
+def _init_worker(counts):
+    global _worker_counts
+    _worker_counts = counts
+
+
+def _bootstrap_batch(args):
+    a, b, alpha, n_replicates, seed = args
+    rng = np.random.default_rng(seed)
+    y_a = _resampled_counts(_worker_counts[a], n_replicates, rng)
+    y_b = _resampled_counts(_worker_counts[b], n_replicates, rng)
+    return a, b, log_odds(y_a, y_b, alpha)[0].astype(np.float32)
+
+
+def compare_subreddits(counts, feature_names, pairs=None, n_boot=1000, ci=0.95, prior_size=None, seed=0,
+                       max_workers=None):
+    """
+    Weighted log-odds between subreddit pairs with bootstrap confidence intervals.
+
+    Documents are resampled within each subreddit; replicates are split into
+    batches seeded from one SeedSequence, so results do not depend on the
+    number of workers.
+
+    Args:
+        counts: Dict of document x term count matrices (see term_count_matrices)
+        feature_names: Terms matching the matrix columns
+        pairs: List of (a, b) subreddit pairs; defaults to all pairs
+        n_boot: Bootstrap replicates per pair (0 to skip intervals)
+        ci: Confidence level of the percentile intervals
+        prior_size: See dirichlet_prior
+        seed: Random seed
+        max_workers: Number of processes (1 runs in-process)
+    Returns:
+        dict: (a, b) -> DataFrame indexed by term with count_a, count_b, delta, z,
+            ci_low, ci_high columns, sorted by z (terms favoured by a first)
+    """
+    pairs = list(pairs or combinations(counts, 2))
+    alpha = dirichlet_prior(counts, prior_size)
+    totals = {name: np.asarray(matrix.sum(axis=0), dtype=np.float64).ravel() for name, matrix in counts.items()}
+
+    results = {}
+    for a, b in pairs:
+        delta, z = log_odds(totals[a], totals[b], alpha)
+        results[(a, b)] = pd.DataFrame({'count_a': totals[a], 'count_b': totals[b], 'delta': delta, 'z': z},
+                                       index=pd.Index(feature_names, name='term'))
+    if n_boot:
+        batch_sizes = [min(BOOTSTRAP_BATCH, n_boot - start) for start in range(0, n_boot, BOOTSTRAP_BATCH)]
+        seeds = np.random.SeedSequence(seed).spawn(len(pairs) * len(batch_sizes))
+        tasks = [(a, b, alpha, size, seeds[i * len(batch_sizes) + j])
+                 for i, (a, b) in enumerate(pairs) for j, size in enumerate(batch_sizes)]
+        if max_workers == 1:
+            _init_worker(counts)
+            batches = list(map(_bootstrap_batch, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                                     initializer=_init_worker, initargs=(counts,)) as executor:
+                batches = list(executor.map(_bootstrap_batch, tasks))
+
+        tail = (1 - ci) / 2 * 100
+        for a, b in pairs:
+            replicates = np.vstack([deltas for pa, pb, deltas in batches if (pa, pb) == (a, b)])
+            low, high = np.percentile(replicates, [tail, 100 - tail], axis=0)
+            results[(a, b)]['ci_low'] = low
+            results[(a, b)]['ci_high'] = high
+
+    return {pair: table.sort_values('z', ascending=False) for pair, table in results.items()}
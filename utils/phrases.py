@@ -0,0 +1,248 @@
+# utils/phrases.py
+# Collocation detection ("hong kong", "xi jinping", ...) over a stream of
+# preprocessed texts. Tokens are hashed into a fixed id space, unigram counts are
+# one array over that space, bigram and trigram counts live in fixed-size
+# Count-Min sketches, and only a bounded set of candidates is kept, so memory
+# does not grow with the vocabulary.
+import numpy as np
+import pandas as pd
+from utils.sketches import CountMinSketch
+from utils.trends import term_key
+
+ID_BITS = 21                  # Token ids are packed into uint64 n-gram keys
+SCORES = ('pmi', 'llr')
+
+
+def _llr(k11, k12, k21, k22):
+    """Dunning log-likelihood ratio (G^2) for 2x2 contingency tables."""
+    def xlogx(x):
+        x = np.asarray(x, dtype=np.float64)
+        return np.where(x > 0, x * np.log(np.where(x > 0, x, 1)), 0.0)
+
+    n = k11 + k12 + k21 + k22
+    return 2 * (
+        xlogx(k11) + xlogx(k12) + xlogx(k21) + xlogx(k22) + xlogx(n)
+        - xlogx(k11 + k12) - xlogx(k21 + k22) - xlogx(k11 + k21) - xlogx(k12 + k22)
+    )
+
+
+class PhraseDetector:
+    """
+    Detect bigram/trigram collocations in a stream and merge them into single tokens.
+
+    Usage:
+        detector = PhraseDetector().fit(stream)
+        merged_stream = detector.transform_stream(stream)   # 'hong kong' -> 'hong_kong'
+
+    Default preprocessing drops words shorter than 3 characters, so phrases
+    such as 'xi jinping' never reach the detector. Fit on a stream built with
+    min_len=1 (e.g. TextStream(paths, min_len=1)) and set min_token_len=3 to
+    drop the remaining short words once phrases are merged.
+
+    Args:
+        max_n: Longest phrase length (2 or 3)
+        min_count: Minimum estimated n-gram count for a phrase
+        threshold: Minimum score for a phrase (natural-log PMI, or G^2 for 'llr')
+        score: 'pmi' or 'llr'
+        max_candidates: Upper bound on candidate n-grams kept per order
+        width, depth, seed: Count-Min sketch parameters
+        min_token_len: If set, transform() drops unmerged tokens shorter than this
+        id_bits: Size of the token id space (2 ** id_bits ids). Tokens are hashed
+            into it, so distinct tokens may share an id and their counts; only
+            tokens of candidate n-grams keep their text, and the dominant token
+            of a shared id names it.
+    """
+
+    def __init__(self, max_n=3, min_count=5, threshold=3.0, score='pmi', max_candidates=100000,
+                 width=2 ** 20, depth=4, seed=0, min_token_len=None, id_bits=ID_BITS):
+        if max_n not in (2, 3):
+            raise ValueError("max_n must be 2 or 3")
+        if score not in SCORES:
+            raise ValueError(f"score must be one of {SCORES}")
+        if id_bits * max_n > 64:
+            raise ValueError(f"id_bits must be at most {64 // max_n} for max_n={max_n}")
+        self.max_n = max_n
+        self.min_count = min_count
+        self.threshold = threshold
+        self.score = score
+        self.max_candidates = max_candidates
+        self.min_token_len = min_token_len
+        self.id_bits = id_bits
+        self.names = {}
+        self.name_weights = {}
+        self.unigram_counts = np.zeros(2 ** id_bits, dtype=np.int64)
+        self.n_tokens = 0
+        self.sketches = {n: CountMinSketch(width, depth, seed + n) for n in range(2, max_n + 1)}
+        self.candidates = {n: {} for n in range(2, max_n + 1)}
+        self.phrases_ = None
+
+    def _encode(self, texts):
+        """
+        Map texts to one id array plus the document index of every token.
+
+        Returns:
+            tuple: (ids, doc_index, {id: (token, count)} with the most frequent
+                token of each id in this chunk)
+        """
+        split = [text.split() for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in split), dtype=np.int64, count=len(split))
+        doc_index = np.repeat(np.arange(len(split)), lengths)
+        flat = np.array([token for tokens in split for token in tokens], dtype=object)
+        if not len(flat):
+            return np.zeros(0, dtype=np.uint64), doc_index, {}
+        codes, uniques = pd.factorize(flat)
+        mask = np.uint64(2 ** self.id_bits - 1)
+        unique_ids = np.fromiter((term_key(token) for token in uniques), dtype=np.uint64, count=len(uniques)) & mask
+        counts = pd.DataFrame({'id': unique_ids, 'token': uniques, 'count': np.bincount(codes)})
+        top = counts.sort_values('count', ascending=False, kind='stable').drop_duplicates('id')
+        return unique_ids[codes], doc_index, dict(zip(top['id'].tolist(), zip(top['token'], top['count'].tolist())))
+
+    def _ngram_keys(self, ids, doc_index, n):
+        """Pack every within-document n-gram into a uint64 key."""
+        if len(ids) < n:
+            return np.zeros(0, dtype=np.uint64)
+        valid = doc_index[:len(ids) - n + 1] == doc_index[n - 1:]
+        keys = np.zeros(len(ids) - n + 1, dtype=np.uint64)
+        for k in range(n):
+            keys |= ids[k:len(ids) - n + 1 + k] << np.uint64(self.id_bits * (n - 1 - k))
+        return keys[valid]
+
+    def _decode(self, keys, n):
+        """Unpack n-gram keys into an (len(keys), n) array of token ids."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        mask = np.uint64(2 ** self.id_bits - 1)
+        return np.stack([(keys >> np.uint64(self.id_bits * (n - 1 - k))) & mask for k in range(n)],
+                        axis=1).astype(np.intp).reshape(len(keys), n)
+
+    def _ngram_keys_from_ids(self, token_ids):
+        keys = np.zeros(len(token_ids), dtype=np.uint64)
+        n = token_ids.shape[1]
+        for k in range(n):
+            keys |= token_ids[:, k].astype(np.uint64) << np.uint64(self.id_bits * (n - 1 - k))
+        return keys
+
+    def partial_fit(self, texts):
+        """Update unigram counts, n-gram sketches and candidates with a chunk of texts."""
+        ids, doc_index, names = self._encode(texts)
+        self.unigram_counts += np.bincount(ids.astype(np.intp), minlength=len(self.unigram_counts))
+        self.n_tokens += len(ids)
+
+        for n, sketch in self.sketches.items():
+            keys, key_counts = np.unique(self._ngram_keys(ids, doc_index, n), return_counts=True)
+            sketch.update(keys, key_counts)
+            estimates = sketch.query(keys)
+            frequent = estimates >= self.min_count
+            candidates = self.candidates[n]
+            candidates.update(zip(keys[frequent].tolist(), estimates[frequent].tolist()))
+            for token_id in np.unique(self._decode(keys[frequent], n)).tolist():
+                self._vote_name(token_id, *names[token_id])
+            if len(candidates) > self.max_candidates:
+                self._prune(n)
+        self.phrases_ = None
+        return self
+
+    def _vote_name(self, token_id, token, count):
+        """
+        Name the ids of candidate tokens by majority vote (Boyer-Moore, one counter
+        per id), so the dominant token of a shared id names it.
+        """
+        if self.names.get(token_id) == token:
+            self.name_weights[token_id] += count
+        elif count > self.name_weights.get(token_id, 0):
+            self.name_weights[token_id] = count - self.name_weights.get(token_id, 0)
+            self.names[token_id] = token
+        else:
+            self.name_weights[token_id] -= count
+
+    def _prune(self, n):
+        """Keep the max_candidates n-grams with the highest current estimates."""
+        keys = np.fromiter(self.candidates[n], dtype=np.uint64, count=len(self.candidates[n]))
+        estimates = self.sketches[n].query(keys)
+        keep = np.argpartition(-estimates.astype(np.int64), self.max_candidates - 1)[:self.max_candidates]
+        self.candidates[n] = dict(zip(keys[keep].tolist(), estimates[keep].tolist()))
+        # Forget the text of tokens no longer in any candidate
+        used = set()
+        for order, candidates in self.candidates.items():
+            candidate_keys = np.fromiter(candidates, dtype=np.uint64, count=len(candidates))
+            used.update(np.unique(self._decode(candidate_keys, order)).tolist())
+        self.names = {token_id: name for token_id, name in self.names.items() if token_id in used}
+        self.name_weights = {token_id: self.name_weights[token_id] for token_id in self.names}
+
+    def fit(self, stream):
+        """Fit on a stream of text chunks (e.g. utils.ingestion.TextStream)."""
+        for texts in stream:
+            self.partial_fit(texts)
+        return self
+
+    def score_ngrams(self, n=2):
+        """
+        Score the candidate n-grams of order n.
+
+        Returns:
+            pd.DataFrame: phrase, count and score columns, best first
+        """
+        keys = np.fromiter(self.candidates[n], dtype=np.uint64, count=len(self.candidates[n]))
+        counts = self.sketches[n].query(keys).astype(np.float64)
+        token_ids = self._decode(keys, n)
+        unigrams = self.unigram_counts[token_ids].astype(np.float64)
+        total = max(self.n_tokens, 1)
+
+        if self.score == 'pmi':
+            scores = np.log(counts) + (n - 1) * np.log(total) - np.log(unigrams).sum(axis=1)
+        else:
+            # Trigrams are scored as (first two tokens) + last token
+            if n == 2:
+                left = unigrams[:, 0]
+            else:
+                left = self.sketches[2].query(self._ngram_keys_from_ids(token_ids[:, :2])).astype(np.float64)
+            right = unigrams[:, -1]
+            k11 = np.minimum(counts, np.minimum(left, right))
+            k12 = np.maximum(left - k11, 0)
+            k21 = np.maximum(right - k11, 0)
+            k22 = np.maximum(total - k11 - k12 - k21, 0)
+            scores = _llr(k11, k12, k21, k22)
+
+        phrases = [' '.join(self.names[token_id] for token_id in row) for row in token_ids.tolist()]
+        result = pd.DataFrame({'phrase': phrases, 'count': counts.astype(np.int64), 'score': scores})
+        result = result[result['count'] >= self.min_count]
+        return result.sort_values('score', ascending=False, ignore_index=True)
+
+    def phrases(self):
+        """Return the detected phrases as a dict mapping token tuples to merged tokens."""
+        if self.phrases_ is None:
+            self.phrases_ = {}
+            for n in self.candidates:
+                scored = self.score_ngrams(n)
+                for phrase in scored.loc[scored['score'] >= self.threshold, 'phrase']:
+                    tokens = tuple(phrase.split())
+                    self.phrases_[tokens] = '_'.join(tokens)
+        return self.phrases_
+
+    def transform(self, texts):
+        """Rewrite texts, merging detected phrases greedily (longest first)."""
+        phrases = self.phrases()
+        orders = sorted({len(tokens) for tokens in phrases}, reverse=True)
+        min_len = self.min_token_len or 0
+        merged_texts = []
+        for text in texts:
+            tokens = text.split()
+            merged = []
+            i = 0
+            while i < len(tokens):
+                for n in orders:
+                    phrase = phrases.get(tuple(tokens[i:i + n]))
+                    if phrase is not None:
+                        merged.append(phrase)
+                        i += n
+                        break
+                else:
+                    if len(tokens[i]) >= min_len:
+                        merged.append(tokens[i])
+                    i += 1
+            merged_texts.append(' '.join(merged))
+        return merged_texts
+
+    def transform_stream(self, stream):
+        """Yield merged text chunks for a stream of text chunks."""
+        for texts in stream:
+            yield self.transform(texts)
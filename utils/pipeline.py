@@ -0,0 +1,469 @@
+# utils/pipeline.py
+# Long-running ingestion service: poll subreddits -> fetch comments -> classify
+# -> preprocess -> score. Each stage is a worker pool reading from a bounded
+# queue; a full queue blocks its producers, which throttles the stages upstream.
+# NLTK preprocessing is CPU-bound, so that stage hands its work to a process
+# pool; its threads only wait on the result.
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from utils.text_processor import preprocess_text, english_stopwords
+from utils.vectorizer import StreamingTfidfVectorizer
+from utils.trends import TrendDetector
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+DEFAULT_WORKERS = {'comments': 4, 'classify': 8, 'preprocess': 2, 'score': 1}
+SEEN_IDS_PER_SUBREDDIT = 5000
+POST_FILE_COLUMNS = ['post_title', 'post_id', 'post_body', 'post_datetime', 'post_score', 'post_owner',
+                     'gpt_score', 'processed_text', 'top_terms']
+COMMENT_FILE_COLUMNS = ['post_title', 'post_id', 'post_body', 'post_datetime', 'post_score', 'post_owner',
+                        'comment_owner', 'reply_to_userId', 'comment_datetime', 'comment_score', 'comment_body',
+                        'comment_id', 'parent_id', 'gpt_score']
+
+
+def preprocess_post(title, selftext):
+    """Preprocessed title plus body of a post (runs in the preprocess process pool)."""
+    text = preprocess_text(title)
+    if selftext:
+        text += ' ' + preprocess_text(selftext)
+    return text
+
+
+class Stage:
+    """
+    A pool of worker threads applying `func` to items from a bounded queue.
+
+    `func` returns an iterable of output items (possibly empty) that are put on
+    the downstream stage's queue; items that still fail after `retries` are
+    passed to `on_error`. Shutdown is signalled with one _STOP per
+    worker; the last worker to stop forwards the signal downstream.
+    """
+
+    def __init__(self, name, func, workers=1, maxsize=100, retries=0, on_error=None, throughput_window=60):
+        self.name = name
+        self.func = func
+        self.on_error = on_error
+        self.workers = workers
+        self.retries = retries
+        self.in_queue = queue.Queue(maxsize)
+        self.downstream = None
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self.throughput_window = throughput_window
+        self._completed = deque()
+        self._started = None
+        self._latency = 0.0
+        self._lock = threading.Lock()
+        self._alive = 0
+        self._threads = []
+
+    def start(self):
+        self._started = time.monotonic()
+        self._alive = self.workers
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, item):
+        """Queue an item, blocking while the queue is full."""
+        self.in_queue.put(item)
+
+    def stop(self):
+        """Let queued items drain, then stop the workers."""
+        for _ in range(self.workers):
+            self.in_queue.put(_STOP)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _call(self, item):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.func(item)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _run(self):
+        while True:
+            item = self.in_queue.get()
+            if item is _STOP:
+                self._worker_done()
+                return
+            start = time.monotonic()
+            with self._lock:
+                self.busy += 1
+            try:
+                outputs = self._call(item) or ()
+                for output in outputs:
+                    if self.downstream is not None:
+                        self.downstream.put(output)
+            except Exception:
+                logger.exception("Stage %s failed on item", self.name)
+                with self._lock:
+                    self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(item)
+            else:
+                with self._lock:
+                    self.processed += 1
+                    now = time.monotonic()
+                    self._completed.append(now)
+                    self._latency += now - start
+            finally:
+                with self._lock:
+                    self.busy -= 1
+
+    def _worker_done(self):
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last and self.downstream is not None:
+            self.downstream.stop()
+
+    def metrics(self):
+        with self._lock:
+            now = time.monotonic()
+            while self._completed and now - self._completed[0] > self.throughput_window:
+                self._completed.popleft()
+            # A stage that started less than a window ago is rated over its uptime
+            elapsed = min(self.throughput_window, now - self._started) if self._started is not None else 0.0
+            return {
+                'queue_depth': self.in_queue.qsize(),
+                'queue_capacity': self.in_queue.maxsize,
+                'workers': self.workers,
+                'busy_workers': self.busy,
+                'processed': self.processed,
+                'errors': self.errors,
+                'throughput_per_s': len(self._completed) / elapsed if elapsed > 0 else 0.0,
+                'mean_latency_s': self._latency / self.processed if self.processed else 0.0,
+            }
+
+
+class IngestionService:
+    """
+    Continuously ingest new posts from a set of subreddits.
+
+    Args:
+        scraper: models.RedditScraper
+        classifier: models.GPTClassifier
+        subreddits: List of subreddit names
+        output_dir: Directory for {subreddit}_posts.csv and {subreddit}_scored_pnc_df.csv
+        checkpoint_dir: Directory for seen post ids and analysis state (defaults to output_dir)
+        poll_interval: Seconds between polls of each subreddit
+        post_limit: Newest posts requested per poll
+        queue_size: Capacity of each stage queue
+        workers: Dict overriding DEFAULT_WORKERS per stage; 'preprocess' is the
+            number of processes in the preprocessing pool
+        checkpoint_interval: Seconds between checkpoints
+        metrics_port: If set, serve stage metrics as JSON on this port
+        refit_interval: Posts per subreddit between re-finalizing its TF-IDF
+            vocabulary and IDF weights
+        n_top_terms: Highest TF-IDF terms written to top_terms for each post
+    """
+
+    def __init__(self, scraper, classifier, subreddits, output_dir, checkpoint_dir=None, poll_interval=30,
+                 post_limit=100, queue_size=100, workers=None, checkpoint_interval=30, metrics_port=None,
+                 refit_interval=100, n_top_terms=5):
+        self.scraper = scraper
+        self.classifier = classifier
+        self.subreddits = list(subreddits)
+        self.output_dir = output_dir
+        self.checkpoint_dir = checkpoint_dir or output_dir
+        self.poll_interval = poll_interval
+        self.post_limit = post_limit
+        self.checkpoint_interval = checkpoint_interval
+        self.metrics_port = metrics_port
+        self.refit_interval = refit_interval
+        self.n_top_terms = n_top_terms
+        workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.preprocess_processes = workers['preprocess']
+        self._preprocess_pool = None
+
+        self.stages = [
+            Stage('comments', self._fetch_comments, workers['comments'], queue_size, retries=2, on_error=self._release),
+            Stage('classify', self._classify, workers['classify'], queue_size, retries=2, on_error=self._release),
+            Stage('preprocess', self._preprocess, workers['preprocess'], queue_size, on_error=self._release),
+            Stage('score', self._score, workers['score'], queue_size, on_error=self._release),
+        ]
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.downstream = downstream
+
+        self.seen = {subreddit: deque(maxlen=SEEN_IDS_PER_SUBREDDIT) for subreddit in self.subreddits}
+        self.in_flight = set()
+        self.vectorizers = {
+            subreddit: StreamingTfidfVectorizer(max_features=1000, min_df=2, stop_words=english_stopwords())
+            for subreddit in self.subreddits
+        }
+        self.since_refit = {subreddit: 0 for subreddit in self.subreddits}
+        self.trends = TrendDetector()
+        self.polls = 0
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._metrics_server = None
+        self._load_checkpoint()
+
+    # Stage functions
+
+    def _release(self, item):
+        # A failed post is forgotten so that the next poll picks it up again
+        with self._state_lock:
+            self.in_flight.discard(item['post']['id'])
+
+    def _fetch_comments(self, item):
+        item['comments'] = self.scraper.get_post_comments(item['post'])
+        return [item]
+
+    def _classify(self, item):
+        post = item['post']
+        item['gpt_score'] = self.classifier.label(post.get('selftext') or post.get('title', ''))
+        return [item]
+
+    def _preprocess(self, item):
+        post = item['post']
+        if self._preprocess_pool is None:
+            item['processed_text'] = preprocess_post(post.get('title'), post.get('selftext'))
+        else:
+            item['processed_text'] = self._preprocess_pool.submit(
+                preprocess_post, post.get('title'), post.get('selftext')).result()
+        return [item]
+
+    def _score(self, item):
+        subreddit, post = item['subreddit'], item['post']
+        post_row = {
+            'post_title': post.get('title'),
+            'post_id': post['id'],
+            'post_body': post.get('selftext'),
+            'post_datetime': post.get('created_utc'),
+            'post_score': post.get('score'),
+            'post_owner': post.get('author'),
+            'gpt_score': item['gpt_score'],
+            'processed_text': item['processed_text'],
+        }
+        with self._state_lock:
+            # Project the post onto the fit so far; refit every refit_interval posts
+            vectorizer = self.vectorizers[subreddit]
+            if not vectorizer.vocabulary_ or self.since_refit[subreddit] >= self.refit_interval:
+                vectorizer.finalize()
+                self.since_refit[subreddit] = 0
+            post_row['top_terms'] = ' '.join(self._top_terms(vectorizer, [item['processed_text']])[0])
+        comment_rows = [dict(comment, gpt_score=item['gpt_score']) for comment in item['comments']]
+        with self._write_lock:
+            self._append_csv(f'{subreddit}_posts.csv', [post_row], POST_FILE_COLUMNS)
+            self._append_csv(f'{subreddit}_scored_pnc_df.csv', comment_rows, COMMENT_FILE_COLUMNS)
+        with self._state_lock:
+            vectorizer.partial_fit([item['processed_text']])
+            self.since_refit[subreddit] += 1
+            self.trends.update(subreddit, post.get('created_utc') or time.time(), item['processed_text'])
+            self.seen[subreddit].append(post['id'])
+            self.in_flight.discard(post['id'])
+        return ()
+
+    def _top_terms(self, vectorizer, texts, n=None):
+        """Highest TF-IDF terms of each text under the vectorizer's current fit."""
+        n = n or self.n_top_terms
+        tfidf = vectorizer.transform(texts).tocsr()
+        feature_names = vectorizer.get_feature_names_out()
+        top_terms = []
+        for i in range(tfidf.shape[0]):
+            row = tfidf.getrow(i)
+            order = np.argsort(-row.data, kind='stable')[:n]
+            top_terms.append(feature_names[row.indices[order]].tolist())
+        return top_terms
+
+    def _fitted_vectorizer(self, subreddit):
+        vectorizer = self.vectorizers[subreddit]
+        if vectorizer.vocabulary_ is None:
+            vectorizer.finalize()
+        return vectorizer
+
+    def transform(self, subreddit, texts):
+        """TF-IDF rows of preprocessed texts in a subreddit's current vocabulary."""
+        with self._state_lock:
+            return self._fitted_vectorizer(subreddit).transform(texts)
+
+    def top_terms(self, subreddit, texts, n=None):
+        """Highest TF-IDF terms of each preprocessed text (see transform)."""
+        with self._state_lock:
+            return self._top_terms(self._fitted_vectorizer(subreddit), texts, n)
+
+    def _append_csv(self, file_name, rows, columns):
+        if not rows:
+            return
+        path = os.path.join(self.output_dir, file_name)
+        pd.DataFrame(rows, columns=columns).to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+    # Source, checkpointing and metrics
+
+    def _poll(self):
+        while not self._stop_event.is_set():
+            for subreddit in self.subreddits:
+                if self._stop_event.is_set():
+                    break
+                try:
+                    posts = self.scraper.get_subreddit_posts(subreddit, limit=self.post_limit)
+                except Exception:
+                    logger.exception("Polling r/%s failed", subreddit)
+                    continue
+                # Oldest first, so downstream timestamps mostly arrive in order
+                for post in reversed(posts):
+                    with self._state_lock:
+                        if post['id'] in self.in_flight or post['id'] in self.seen[subreddit]:
+                            continue
+                        self.in_flight.add(post['id'])
+                    self.stages[0].put({'subreddit': subreddit, 'post': post})
+            self.polls += 1
+            self._stop_event.wait(self.poll_interval)
+
+    def _checkpoint_loop(self):
+        while not self._stop_event.wait(self.checkpoint_interval):
+            self.checkpoint()
+
+    def _load_checkpoint(self):
+        path = os.path.join(self.checkpoint_dir, 'checkpoint.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                seen = json.load(f)['seen']
+            for subreddit, ids in seen.items():
+                if subreddit in self.seen:
+                    self.seen[subreddit].extend(ids)
+        state_path = os.path.join(self.checkpoint_dir, 'analysis_state.pkl')
+        if os.path.exists(state_path):
+            with open(state_path, 'rb') as f:
+                state = pickle.load(f)
+            self.vectorizers.update(state['vectorizers'])
+            self.trends = state['trends']
+
+    def checkpoint(self):
+        """Atomically write seen post ids and the analysis state."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with self._state_lock:
+            seen = {subreddit: list(ids) for subreddit, ids in self.seen.items()}
+            state = pickle.dumps({'vectorizers': self.vectorizers, 'trends': self.trends})
+        for file_name, payload, mode in [('checkpoint.json', json.dumps({'seen': seen}), 'w'),
+                                         ('analysis_state.pkl', state, 'wb')]:
+            path = os.path.join(self.checkpoint_dir, file_name)
+            with open(path + '.tmp', mode) as f:
+                f.write(payload)
+            os.replace(path + '.tmp', path)
+
+    def metrics(self):
+        """Queue depth, throughput and error counts per stage."""
+        return {
+            'polls': self.polls,
+            'in_flight': len(self.in_flight),
+            'stages': {stage.name: stage.metrics() for stage in self.stages},
+        }
+
+    def trending(self, subreddit, n=10):
+        """Currently trending terms for a subreddit (see utils.trends)."""
+        with self._state_lock:
+            return self.trends.trending(subreddit, n)
+
+    def _serve_metrics(self):
+        service = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(service.metrics()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._metrics_server = ThreadingHTTPServer(('127.0.0.1', self.metrics_port), MetricsHandler)
+        threading.Thread(target=self._metrics_server.serve_forever, name='metrics', daemon=True).start()
+
+    # Lifecycle
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._preprocess_pool = ProcessPoolExecutor(max_workers=self.preprocess_processes)
+        # Fork the worker processes now, before the service starts its own threads
+        self._preprocess_pool.submit(int).result()
+        for stage in self.stages:
+            stage.start()
+        for target, name in [(self._poll, 'poller'), (self._checkpoint_loop, 'checkpoint')]:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.metrics_port is not None:
+            self._serve_metrics()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop polling, drain every queue in order and write a final checkpoint."""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self.stages[0].stop()
+        for stage in self.stages:
+            stage.join(timeout)
+        if self._preprocess_pool is not None:
+            self._preprocess_pool.shutdown()
+            self._preprocess_pool = None
+        self.checkpoint()
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+
+    def run_forever(self, log_interval=60):
+        """Run until SIGINT/SIGTERM, logging metrics periodically."""
+        stop_requested = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop_requested.set())
+        self.start()
+        while not stop_requested.wait(log_interval):
+            logger.info("metrics %s", json.dumps(self.metrics()))
+        logger.info("Shutting down, draining queues")
+        self.stop()
+
+
+def main(argv=None):
+    import config.settings as settings
+    from models import RedditScraper, GPTClassifier
+
+    parser = argparse.ArgumentParser(description="Continuously ingest and score new subreddit posts.")
+    parser.add_argument('--subreddits', nargs='+', default=['China', 'HongKong', 'Taiwan'])
+    parser.add_argument('--reddit-url', default=settings.API_BASE_URL)
+    parser.add_argument('--llm-url', default=settings.OPENAI_BASE_URL)
+    parser.add_argument('--output-dir', default='stream_data')
+    parser.add_argument('--checkpoint-dir', default=None)
+    parser.add_argument('--poll-interval', type=float, default=30)
+    parser.add_argument('--rate-limit-delay', type=float, default=settings.RATE_LIMIT_DELAY)
+    parser.add_argument('--metrics-port', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    scraper = RedditScraper(settings.USER_AGENT, base_url=args.reddit_url, rate_limit_delay=args.rate_limit_delay)
+    classifier = GPTClassifier(settings.OPENAI_API, base_url=args.llm_url, model=settings.OPENAI_MODEL)
+    service = IngestionService(scraper, classifier, args.subreddits, args.output_dir,
+                               checkpoint_dir=args.checkpoint_dir, poll_interval=args.poll_interval,
+                               metrics_port=args.metrics_port)
+    service.run_forever()
+
+
+if __name__ == '__main__':
+    main()
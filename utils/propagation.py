@@ -0,0 +1,141 @@
+# utils/propagation.py
+# Spread post-level gpt_score labels to comments and users over the sparse
+# user-post-comment graph (label spreading, Zhou et al. 2004):
+#   F <- alpha * D^-1/2 A D^-1/2 F + (1 - alpha) * Y
+# where Y holds one-hot post labels. Each step is one sparse matmul, so graphs
+# with millions of nodes fit on one machine.
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from config.settings import CATEGORIES
+from utils.threads import infer_parent_ids
+
+
+class LabelPropagation:
+    """
+    Soft POLITICAL/CULTURAL/OTHER distributions for posts, comments and users.
+
+    Graph edges link each comment to its parent (post or comment) and to its
+    author, and each post to its owner.
+
+    Args:
+        alpha: Weight of the neighbours versus the seed labels (0 < alpha < 1)
+        tol: Stop when no score changes by more than tol between iterations
+        max_iter: Iteration limit
+    """
+
+    def __init__(self, alpha=0.8, tol=1e-6, max_iter=200):
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
+        self.blocks = None
+        self.scores_ = None
+        self.n_iter_ = 0
+
+    @staticmethod
+    def _graph(df):
+        """
+        Normalized adjacency and seed matrix; nodes are laid out as
+        [posts | comments (one per row) | users].
+        """
+        if 'comment_id' not in df or 'parent_id' not in df:
+            df = infer_parent_ids(df)
+        n_rows = len(df)
+        post_codes, post_ids = pd.factorize(df['post_id'].astype(str))
+        owners = pd.concat([df['comment_owner'], df['post_owner']], ignore_index=True)
+        user_codes, users = pd.factorize(owners)
+        n_posts, n_users = len(post_ids), len(users)
+        comment_offset, user_offset = n_posts, n_posts + n_rows
+
+        # Parent is a comment row when parent_id names a comment, else the post
+        comment_ids = df['comment_id'].astype(str).to_numpy()
+        first = ~pd.Index(comment_ids).duplicated()
+        parent_rows = pd.Index(comment_ids[first]).get_indexer(df['parent_id'].astype(str))
+        parent_rows = np.where(parent_rows >= 0, np.flatnonzero(first)[parent_rows], -1)
+        rows = np.arange(n_rows)
+        parents = np.where(parent_rows >= 0, comment_offset + parent_rows, post_codes)
+
+        comment_users, post_users = user_codes[:n_rows], user_codes[n_rows:]
+        authored = comment_users >= 0
+        owned = post_users >= 0
+        sources = np.concatenate([comment_offset + rows, comment_offset + rows[authored], post_codes[owned]])
+        targets = np.concatenate([parents, user_offset + comment_users[authored], user_offset + post_users[owned]])
+
+        n = user_offset + n_users
+        adjacency = sp.coo_matrix((np.ones(len(sources), dtype=np.float32), (sources, targets)), shape=(n, n)).tocsr()
+        adjacency = adjacency + adjacency.T
+        degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        inv_sqrt = np.where(degree > 0, 1 / np.sqrt(np.maximum(degree, 1e-12)), 0).astype(np.float32)
+        normalized = (sp.diags(inv_sqrt) @ adjacency @ sp.diags(inv_sqrt)).tocsr()
+
+        seeds = np.zeros((n, len(CATEGORIES)), dtype=np.float32)
+        if 'gpt_score' in df:
+            labels = df['gpt_score'].map({label: i for i, label in enumerate(CATEGORIES)}).to_numpy()
+            labelled = ~pd.isna(labels)
+            seeds[post_codes[labelled], labels[labelled].astype(int)] = 1
+
+        blocks = {
+            'post': (0, pd.Index(post_ids, name='post_id')),
+            'comment': (comment_offset, pd.Index(comment_ids, name='comment_id')),
+            'user': (user_offset, pd.Index(users, name='user')),
+        }
+        return blocks, normalized, seeds
+
+    def _previous_scores(self, blocks, n):
+        """Scores from the last fit mapped onto the new node layout (NaN where unseen)."""
+        F = np.full((n, len(CATEGORIES)), np.nan, dtype=np.float32)
+        for kind, (offset, keys) in blocks.items():
+            old_offset, old_keys = self.blocks[kind]
+            found = old_keys.get_indexer(keys)
+            known = found >= 0
+            F[offset + np.flatnonzero(known)] = self.scores_[old_offset + found[known]]
+        return F
+
+    def fit(self, df, warm_start=True):
+        """
+        Propagate the post labels of a scored comment DataFrame.
+
+        Args:
+            df: Rows in the *_scored_pnc_df.csv layout (comment_id/parent_id are
+                inferred when missing)
+            warm_start: Start from the previous fit's scores for nodes seen before
+        """
+        blocks, S, Y = self._graph(df)
+        F = Y.copy()
+        if warm_start and self.scores_ is not None:
+            previous = self._previous_scores(blocks, len(Y))
+            known = ~np.isnan(previous).any(axis=1)
+            F[known] = previous[known]
+
+        seeds = (1 - self.alpha) * Y
+        for self.n_iter_ in range(1, self.max_iter + 1):
+            updated = self.alpha * (S @ F) + seeds
+            change = np.abs(updated - F).max() if len(F) else 0.0
+            F = updated
+            if change < self.tol:
+                break
+
+        self.blocks, self.scores_ = blocks, F
+        self._comment_index = df.index
+        return self
+
+    def _distributions(self, kind, index=None):
+        offset, keys = self.blocks[kind]
+        scores = self.scores_[offset:offset + len(keys)]
+        totals = scores.sum(axis=1, keepdims=True)
+        distributions = np.divide(scores, totals, out=np.full_like(scores, np.nan), where=totals > 0)
+        result = pd.DataFrame(distributions, columns=CATEGORIES, index=keys if index is None else index)
+        result['label'] = np.where(totals[:, 0] > 0, np.array(CATEGORIES, dtype=object)[scores.argmax(axis=1)], None)
+        return result
+
+    def user_labels(self):
+        """Label distribution and most likely label per user."""
+        return self._distributions('user')
+
+    def post_labels(self):
+        """Smoothed label distribution per post."""
+        return self._distributions('post')
+
+    def comment_labels(self):
+        """Label distribution per comment row of the fitted DataFrame (same index)."""
+        return self._distributions('comment', self._comment_index)
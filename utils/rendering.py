@@ -0,0 +1,253 @@
+# utils/rendering.py
+# Headless batch rendering of precomputed chart data. Figures are built with the
+# object-oriented matplotlib API on an Agg canvas (no pyplot, no global state),
+# so specs can be rendered in parallel worker processes and written straight to disk.
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib import colormaps
+from matplotlib import dates as mdates
+from utils.downsampling import scatter_trace, date_dtick
+from utils.trends import burst_peaks
+
+CATEGORY_LABELS = {'P': 'Political', 'C': 'Cultural'}
+CATEGORY_COLORS = {'P': '#3F8D42', 'C': '#F9A34E'}
+CATEGORY_CMAPS = {'P': 'Greens', 'C': 'Oranges'}
+MATPLOTLIB_FORMATS = ('png', 'svg')
+PLOTLY_FORMATS = ('html',)
+
+
+def shaded_colors(cmap_name, n):
+    """Return n hex colors from a matplotlib colormap, from darker to lighter."""
+    return [
+        '#%02x%02x%02x' % tuple(int(255 * c) for c in rgba[:3])
+        for rgba in colormaps[cmap_name](np.linspace(1, 0.3, n))
+    ]
+
+
+def find_peaks(counts, n_peaks=2):
+    """Return indices of the n_peaks highest values, highest first."""
+    counts = np.asarray(counts)
+    return np.argsort(counts, kind='stable')[-n_peaks:][::-1].tolist()
+
+
+def timeseries_chart_specs(dates, daily_counts, terms_cat_df, subreddit, n_peaks=2, bursts=None):
+    """
+    Build chart specs for one subreddit from precomputed term counts.
+
+    Args:
+        dates: Sequence of dates, as returned by count_terms_by_date
+        daily_counts: Dictionary mapping term -> list of counts per date
+        terms_cat_df: DataFrame with terms and their categories ('P' or 'C')
+        subreddit: Subreddit name used in titles and file names
+        n_peaks: Number of peaks to annotate on the grouped chart
+        bursts: Optional DataFrame from TrendDetector.bursts(); if given, the grouped
+            chart annotates the strongest bursts instead of the highest days
+    Returns:
+        list: One spec per category plus a grouped spec
+    """
+    dates = pd.to_datetime(np.asarray(dates)).values
+    categories = terms_cat_df.set_index('term')['category'].to_dict()
+    specs = []
+    grouped = {}
+    peaks = []
+
+    for cat, label in CATEGORY_LABELS.items():
+        terms = [term for term in terms_cat_df['term'] if categories[term] == cat]
+        if not terms:
+            continue
+        counts = {term: np.asarray(daily_counts[term]) for term in terms}
+        specs.append({
+            'name': f'{subreddit}_{label.lower()}_terms',
+            'kind': 'timeseries',
+            'title': f'{label} Term Frequency Over Time r/{subreddit}',
+            'dates': dates,
+            'series': counts,
+            'colors': dict(zip(terms, shaded_colors(CATEGORY_CMAPS[cat], len(terms)))),
+            'legend_title': f'{label} Terms',
+        })
+
+        # Sum counts per category and annotate the highest days with their top terms
+        total = np.sum(list(counts.values()), axis=0)
+        grouped[f'{label} Terms'] = total
+        for idx in find_peaks(total, n_peaks):
+            top_terms = sorted(terms, key=lambda term: counts[term][idx], reverse=True)[:2]
+            peaks.append({
+                'x': dates[idx],
+                'y': total[idx],
+                'text': '\n'.join(top_terms),
+                'color': CATEGORY_COLORS[cat],
+            })
+
+    if bursts is not None:
+        totals = np.max(list(grouped.values()), axis=0) if grouped else np.zeros(len(dates))
+        peaks = [
+            {'x': dates[idx], 'y': totals[idx], 'text': '\n'.join(terms), 'color': 'black'}
+            for idx, terms in burst_peaks(bursts, dates, n_peaks)
+        ]
+
+    specs.append({
+        'name': f'{subreddit}_grouped_terms',
+        'kind': 'timeseries',
+        'title': f'Term Frequency Over Time by Category r/{subreddit}',
+        'dates': dates,
+        'series': grouped,
+        'colors': {f'{label} Terms': CATEGORY_COLORS[cat] for cat, label in CATEGORY_LABELS.items()},
+        'legend_title': 'Categories',
+        'peaks': peaks,
+    })
+    return specs
+
+
+def term_space_chart_spec(vectors, term1, term2, name=None, title=None):
+    """Build a chart spec for subreddit vectors in a two-term space."""
+    return {
+        'name': name or f'term_space_{term1}_{term2}',
+        'kind': 'term_space',
+        'title': title or f'Vectors in {term1}-{term2} Space (Normalized)',
+        'vectors': {label: np.asarray(vec) for label, vec in vectors.items()},
+        'xlabel': f"'{term1}' Score",
+        'ylabel': f"'{term2}' Score",
+    }
+
+
+def _timeseries_figure(spec, figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    colors = spec.get('colors', {})
+    for label, counts in spec['series'].items():
+        ax.plot(spec['dates'], counts, label=label, color=colors.get(label), linewidth=2)
+    for peak in spec.get('peaks', []):
+        ax.annotate(peak['text'], xy=(peak['x'], peak['y']), xytext=(-30, 20),
+                    textcoords='offset points', ha='center', va='bottom',
+                    arrowprops=dict(facecolor=peak['color'], shrink=0.05))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_title(spec['title'])
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Frequency')
+    ax.legend(loc='upper left', bbox_to_anchor=(1, 1), title=spec.get('legend_title'))
+    fig.tight_layout()
+    return fig
+
+
+def _term_space_figure(spec, figsize):
+    fig = Figure(figsize=(figsize[1], figsize[1]))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    colors = ['blue', 'green', 'red']
+    for i, (label, vec) in enumerate(spec['vectors'].items()):
+        ax.quiver(0, 0, vec[0], vec[1], angles='xy', scale_units='xy', scale=1,
+                  color=colors[i % len(colors)], label=label, width=0.008)
+    max_val = np.max(np.concatenate(list(spec['vectors'].values()))) * 1.2
+    ax.set_xlim(-0.1, max_val)
+    ax.set_ylim(-0.1, max_val)
+    ax.set_aspect('equal')
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.set_title(spec['title'])
+    ax.set_xlabel(spec['xlabel'])
+    ax.set_ylabel(spec['ylabel'])
+    ax.legend(title='Vectors')
+    fig.tight_layout()
+    return fig
+
+
+def _plotly_figure(spec, figsize):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    if spec['kind'] == 'term_space':
+        for label, vec in spec['vectors'].items():
+            fig.add_trace(go.Scatter(x=[0, vec[0]], y=[0, vec[1]], mode='lines+markers',
+                                     marker=dict(size=10, symbol='triangle-right'),
+                                     line=dict(width=4), name=label))
+        fig.update_layout(xaxis_title=spec['xlabel'], yaxis_title=spec['ylabel'])
+    else:
+        colors = spec.get('colors', {})
+        x = pd.to_datetime(spec['dates'])
+        keep = np.flatnonzero(np.isin(spec['dates'], [peak['x'] for peak in spec.get('peaks', [])]))
+        for label, counts in spec['series'].items():
+            fig.add_trace(scatter_trace(x, counts, keep=keep, mode='lines', name=label,
+                                        line=dict(color=colors.get(label), width=1.5)))
+        for peak in spec.get('peaks', []):
+            fig.add_annotation(x=peak['x'], y=peak['y'], text=peak['text'].replace('\n', '<br>'),
+                               arrowcolor=peak['color'], showarrow=True)
+        fig.update_layout(xaxis_title='Date', yaxis_title='Frequency',
+                          xaxis=dict(tickangle=45, tickformat='%Y-%m-%d', dtick=date_dtick(x)),
+                          legend_title=spec.get('legend_title'))
+    fig.update_layout(title={'text': spec['title'], 'x': 0.5, 'xanchor': 'center'},
+                      template='plotly_white', width=int(figsize[0] * 100), height=int(figsize[1] * 100))
+    return fig
+
+
+def render_chart(spec, out_dir, formats=('png',), figsize=(12, 6), dpi=100):
+    """
+    Render a single chart spec to disk.
+
+    Args:
+        spec: Chart spec dictionary (see timeseries_chart_specs)
+        out_dir: Output directory
+        formats: Any of 'png', 'svg' (matplotlib) and 'html' (plotly)
+        figsize: Figure size in inches
+        dpi: Resolution for raster output
+    Returns:
+        list: Paths of the written files
+    """
+    unknown = set(formats) - set(MATPLOTLIB_FORMATS) - set(PLOTLY_FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported formats: {sorted(unknown)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    static_formats = [fmt for fmt in formats if fmt in MATPLOTLIB_FORMATS]
+    if static_formats:
+        if spec['kind'] == 'term_space':
+            fig = _term_space_figure(spec, figsize)
+        else:
+            fig = _timeseries_figure(spec, figsize)
+        for fmt in static_formats:
+            path = os.path.join(out_dir, f"{spec['name']}.{fmt}")
+            fig.savefig(path, format=fmt, dpi=dpi)
+            paths.append(path)
+
+    if 'html' in formats:
+        path = os.path.join(out_dir, f"{spec['name']}.html")
+        _plotly_figure(spec, figsize).write_html(path, include_plotlyjs='cdn')
+        paths.append(path)
+
+    return paths
+
+
+def _render_chart_args(args):
+    return render_chart(*args)
+
+
+def render_charts(specs, out_dir, formats=('png',), figsize=(12, 6), dpi=100, max_workers=None):
+    """
+    Render many chart specs to disk across a process pool.
+
+    Args:
+        specs: List of chart spec dictionaries
+        out_dir: Output directory
+        formats: Any of 'png', 'svg' and 'html'
+        figsize: Figure size in inches
+        dpi: Resolution for raster output
+        max_workers: Number of worker processes (1 renders in-process)
+    Returns:
+        list: Paths of the written files, in spec order
+    """
+    tasks = [(spec, out_dir, tuple(formats), figsize, dpi) for spec in specs]
+    if max_workers == 1 or len(tasks) <= 1:
+        results = map(_render_chart_args, tasks)
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, math.ceil(len(tasks) / (max_workers * 4)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_render_chart_args, tasks, chunksize=chunksize))
+    return [path for paths in results for path in paths]
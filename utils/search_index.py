@@ -0,0 +1,302 @@
+# utils/search_index.py
+# Positional inverted index over a TokenCorpus. Documents are renumbered in time
+# order, so a date range is a contiguous doc id range and every posting list is
+# sorted by time. Doc ids, term frequencies and positions are delta-encoded and
+# stored as variable-byte integers.
+import os
+import re
+import numpy as np
+import pandas as pd
+from utils.corpus import TokenCorpus
+from utils.text_processor import preprocess_text
+
+QUERY_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+
+def vbyte_encode(values):
+    """
+    Variable-byte encode non-negative integers (7 bits per byte, high bit ends a value).
+
+    Returns:
+        tuple: (uint8 array, bytes used per value)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.concatenate([[0], np.cumsum(nbytes)[:-1]]).astype(np.int64)
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        has = nbytes > k
+        out[starts[has] + k] = ((values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)).astype(np.uint8)
+    if len(values):
+        out[starts + nbytes - 1] |= 0x80
+    return out, nbytes
+
+
+def vbyte_decode(data):
+    """Decode a vbyte_encode byte array back to uint64 values."""
+    data = np.asarray(data, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data & 0x80)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    owner = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = ((np.arange(len(data)) - starts[owner]) * 7).astype(np.uint64)
+    return np.add.reduceat((data & 0x7F).astype(np.uint64) << shifts, starts)
+
+
+class InvertedIndex:
+    """
+    Term, phrase and boolean search over a TokenCorpus with subreddit and date filters.
+
+    Queries are preprocessed like the corpus (preprocess_text), so 'protests'
+    finds 'protest'. Query syntax: terms, "quoted phrases", AND (or juxtaposition),
+    OR, NOT and parentheses.
+
+    Args:
+        corpus: TokenCorpus with timestamp (and subreddit) metadata
+    """
+
+    ARRAYS = ('doc_bytes', 'doc_offsets', 'tf_bytes', 'tf_offsets', 'pos_bytes', 'pos_offsets', 'doc_freq')
+
+    def __init__(self, corpus, arrays=None):
+        if arrays is None:
+            order = np.argsort(corpus.metadata['timestamp'].to_numpy(np.float64), kind='stable')
+            corpus = corpus.take(order)
+            arrays = self._build(corpus)
+        self.corpus = corpus
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.timestamps = corpus.metadata['timestamp'].to_numpy(np.float64)
+        if 'subreddit' in corpus.metadata:
+            self.subreddit_codes, self.subreddits = pd.factorize(corpus.metadata['subreddit'])
+        else:
+            self.subreddit_codes, self.subreddits = None, pd.Index([])
+
+    @staticmethod
+    def _build(corpus):
+        n_terms = len(corpus.vocabulary)
+        doc = corpus.doc_ids().astype(np.int64)
+        term = np.asarray(corpus.tokens, dtype=np.int64)
+        pos = np.arange(len(term)) - np.asarray(corpus.offsets)[doc]
+        occ = np.lexsort((pos, doc, term))
+        term, doc, pos = term[occ], doc[occ], pos[occ]
+
+        # One posting per (term, doc); positions grouped under it
+        new_pair = np.r_[True, (term[1:] != term[:-1]) | (doc[1:] != doc[:-1])] if len(term) else np.zeros(0, bool)
+        pair_start = np.flatnonzero(new_pair)
+        pair_term, pair_doc = term[pair_start], doc[pair_start]
+        tf = np.diff(np.append(pair_start, len(term)))
+        new_term = np.r_[True, pair_term[1:] != pair_term[:-1]] if len(pair_term) else np.zeros(0, bool)
+        doc_delta = np.where(new_term, pair_doc, pair_doc - np.roll(pair_doc, 1))
+        pos_delta = np.where(new_pair, pos, pos - np.roll(pos, 1))
+
+        arrays = {}
+        term_pairs = np.searchsorted(pair_term, np.arange(n_terms + 1))
+        term_occurrences = np.searchsorted(term, np.arange(n_terms + 1))
+        for name, values, bounds in (('doc', doc_delta, term_pairs), ('tf', tf, term_pairs),
+                                     ('pos', pos_delta, term_occurrences)):
+            data, nbytes = vbyte_encode(values)
+            arrays[f'{name}_bytes'] = data
+            arrays[f'{name}_offsets'] = np.concatenate([[0], np.cumsum(nbytes)])[bounds]
+        arrays['doc_freq'] = np.diff(term_pairs)
+        return arrays
+
+    def __len__(self):
+        return len(self.corpus)
+
+    def _segment(self, name, term_id):
+        offsets = getattr(self, f'{name}_offsets')
+        return vbyte_decode(getattr(self, f'{name}_bytes')[offsets[term_id]:offsets[term_id + 1]])
+
+    def postings(self, term_id):
+        """Doc ids (time order) and term frequencies of a term id."""
+        return np.cumsum(self._segment('doc', term_id)).astype(np.int64), self._segment('tf', term_id).astype(np.int64)
+
+    def positions(self, term_id):
+        """Doc ids and token positions of every occurrence of a term id."""
+        docs, tf = self.postings(term_id)
+        deltas = self._segment('pos', term_id).astype(np.int64)
+        # Positions are delta-encoded within each document: cumsum, then restart per doc
+        totals = np.cumsum(deltas)
+        doc_start = np.concatenate([[0], np.cumsum(tf)[:-1]])
+        base = np.repeat(totals[doc_start] - deltas[doc_start], tf)
+        return np.repeat(docs, tf), totals - base
+
+    def _term_ids(self, text):
+        """Vocabulary ids of a preprocessed query term or phrase (None if any word is unknown)."""
+        words = preprocess_text(text).split() or text.lower().split()
+        ids = self.corpus.ids(words)
+        return None if len(ids) == 0 or (ids < 0).any() else ids
+
+    def term_docs(self, term):
+        ids = self._term_ids(term)
+        if ids is None:
+            return np.zeros(0, dtype=np.int64)
+        if len(ids) > 1:
+            return self.phrase_docs(term)
+        return self.postings(ids[0])[0]
+
+    def _phrase_matches(self, phrase):
+        """(doc, start position) of every occurrence of a phrase."""
+        ids = self._term_ids(phrase)
+        if ids is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        width = int(np.diff(self.corpus.offsets).max()) + 1
+        matches = None
+        for offset, term_id in enumerate(ids):
+            docs, positions = self.positions(term_id)
+            keys = docs * width + positions - offset
+            matches = keys if matches is None else np.intersect1d(matches, keys, assume_unique=True)
+        return matches // width, matches % width
+
+    def phrase_docs(self, phrase):
+        return np.unique(self._phrase_matches(phrase)[0])
+
+    def _universe(self, subreddit=None, start=None, end=None):
+        """Doc ids passing the filters (the complement set for NOT)."""
+        lo, hi = self._date_range(start, end)
+        return self._filter(np.arange(lo, hi), subreddit)
+
+    def _date_range(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, pd.Timestamp(start).timestamp(), 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, pd.Timestamp(end).timestamp(), 'left'))
+        return lo, hi
+
+    def _filter(self, docs, subreddit=None, start=None, end=None):
+        lo, hi = self._date_range(start, end)
+        docs = docs[np.searchsorted(docs, lo):np.searchsorted(docs, hi)]
+        if subreddit is not None:
+            if subreddit not in self.subreddits:
+                return docs[:0]
+            docs = docs[self.subreddit_codes[docs] == self.subreddits.get_loc(subreddit)]
+        return docs
+
+    def _evaluate(self, query, subreddit=None, start=None, end=None):
+        """
+        Matching doc ids (sorted); only NOT needs the filtered universe.
+
+        Raises ValueError for malformed queries: a dangling AND/OR/NOT, an operator
+        where a term is expected, or unbalanced parentheses.
+        """
+        tokens = QUERY_TOKEN.findall(query)
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            if position == len(tokens):
+                raise ValueError(f"Malformed query (unexpected end): {query!r}")
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            docs = parse_and()
+            while peek() == 'OR':
+                take()
+                docs = np.union1d(docs, parse_and())
+            return docs
+
+        def parse_and():
+            docs = parse_not()
+            while peek() not in (None, 'OR', ')'):
+                if peek() == 'AND':
+                    take()
+                docs = np.intersect1d(docs, parse_not(), assume_unique=True)
+            return docs
+
+        def parse_not():
+            if peek() == 'NOT':
+                take()
+                return np.setdiff1d(self._universe(subreddit, start, end), parse_not(), assume_unique=True)
+            return parse_atom()
+
+        def parse_atom():
+            token = take()
+            if token in ('AND', 'OR', ')'):
+                raise ValueError(f"Malformed query (unexpected {token!r}): {query!r}")
+            if token == '(':
+                docs = parse_or()
+                if take() != ')':
+                    raise ValueError(f"Malformed query (unbalanced parentheses): {query!r}")
+                return docs
+            if token.startswith('"'):
+                return self.phrase_docs(token.strip('"'))
+            return self.term_docs(token)
+
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        docs = parse_or()
+        if position < len(tokens):
+            raise ValueError(f"Malformed query (unexpected {tokens[position]!r}): {query!r}")
+        return docs
+
+    def search(self, query, subreddit=None, start=None, end=None, limit=None):
+        """
+        Documents matching a query, oldest first.
+
+        Args:
+            query: e.g. 'protest', '"hong kong" AND NOT travel', 'food OR cuisine'
+                (ValueError if malformed)
+            subreddit: Restrict to one subreddit
+            start, end: Date range [start, end) (anything pd.Timestamp accepts)
+            limit: Maximum number of results
+        Returns:
+            pd.DataFrame: Metadata of the matching documents plus a doc column
+        """
+        docs = self._filter(self._evaluate(query, subreddit, start, end), subreddit, start, end)[:limit]
+        results = self.corpus.metadata.iloc[docs].copy()
+        results.insert(0, 'doc', docs)
+        return results.reset_index(drop=True)
+
+    def count_by_date(self, query, freq='D', subreddit=None, start=None, end=None):
+        """Number of matching documents per period, e.g. to find timeseries peaks."""
+        docs = self._filter(self._evaluate(query, subreddit, start, end), subreddit, start, end)
+        dates = pd.to_datetime(self.timestamps[docs], unit='s').floor(freq)
+        return pd.Series(1, index=dates).groupby(level=0).sum().rename('documents')
+
+    def kwic(self, term, window=5, subreddit=None, start=None, end=None, limit=50):
+        """
+        Keyword-in-context lines for a term or phrase.
+
+        Returns:
+            pd.DataFrame: doc, metadata, left, keyword and right columns (preprocessed tokens)
+        """
+        docs, starts = self._phrase_matches(term)
+        keep = np.isin(docs, self._filter(np.unique(docs), subreddit, start, end))
+        docs, starts = docs[keep][:limit], starts[keep][:limit]
+        width = len(self._term_ids(term)) if len(docs) else 0
+        offsets, vocabulary, tokens = self.corpus.offsets, self.corpus.vocabulary, self.corpus.tokens
+        rows = []
+        for doc, position in zip(docs, starts):
+            begin, stop = offsets[doc], offsets[doc + 1]
+            at = begin + position
+            rows.append({
+                'doc': int(doc),
+                'left': ' '.join(vocabulary[tokens[max(begin, at - window):at]]),
+                'keyword': ' '.join(vocabulary[tokens[at:at + width]]),
+                'right': ' '.join(vocabulary[tokens[at + width:min(stop, at + width + window)]]),
+            })
+        lines = pd.DataFrame(rows, columns=['doc', 'left', 'keyword', 'right'])
+        metadata = self.corpus.metadata.iloc[lines['doc']].reset_index(drop=True)
+        return pd.concat([lines[['doc']], metadata, lines[['left', 'keyword', 'right']]], axis=1)
+
+    def save(self, path):
+        """Write the index and its (time-ordered) corpus to a directory."""
+        os.makedirs(path, exist_ok=True)
+        self.corpus.save(os.path.join(path, 'corpus'))
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved index; with mmap nothing but metadata and vocabulary is read up front."""
+        mode = 'r' if mmap else None
+        corpus = TokenCorpus.load(os.path.join(path, 'corpus'), mmap=mmap)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode) for name in cls.ARRAYS}
+        return cls(corpus, arrays)
@@ -0,0 +1,191 @@
+# utils/sentiment.py
+# Sentiment of posts and comments with VADER or TextBlob. Texts are scored in
+# batches on a process pool (one analyzer per worker), deduplicated and cached
+# by content hash, and aggregated with groupby to post/day/category tables.
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+SENTIMENT_COLUMNS = {
+    'vader': ['compound', 'pos', 'neu', 'neg'],
+    'textblob': ['polarity', 'subjectivity'],
+}
+
+
+def content_hash(text):
+    """Stable 64-bit hash of a text."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def method_cache_path(path, method):
+    """Cache file of one method: cache.npz -> cache_vader.npz."""
+    root, _ = os.path.splitext(path)
+    return f'{root}_{method}.npz'
+
+
+def _make_analyzer(method):
+    if method == 'vader':
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        analyzer = SentimentIntensityAnalyzer()
+
+        def score(text):
+            scores = analyzer.polarity_scores(text)
+            return scores['compound'], scores['pos'], scores['neu'], scores['neg']
+        return score
+
+    from textblob import TextBlob
+
+    def score(text):
+        sentiment = TextBlob(text).sentiment
+        return sentiment.polarity, sentiment.subjectivity
+    return score
+
+
+_worker_analyzer = None
+
+
+def _init_worker(method):
+    global _worker_analyzer
+    _worker_analyzer = _make_analyzer(method)
+
+
+def _score_batch(texts):
+    return np.array([_worker_analyzer(text) for text in texts], dtype=np.float32).reshape(len(texts), -1)
+
+
+class SentimentScorer:
+    """
+    Batched sentiment scoring with a content-hash cache.
+
+    Args:
+        method: 'vader' (compound, pos, neu, neg) or 'textblob' (polarity, subjectivity)
+        cache_path: .npz cache of scores from earlier runs (read on creation, written by
+            save()); the method is added to the file name (see method_cache_path), so
+            VADER and TextBlob caches sharing a cache_path never overwrite each other
+        batch_size: Texts per worker task
+        max_workers: Number of processes (1 scores in-process)
+    """
+
+    def __init__(self, method='vader', cache_path=None, batch_size=2000, max_workers=None):
+        if method not in SENTIMENT_COLUMNS:
+            raise ValueError(f"method must be one of {list(SENTIMENT_COLUMNS)}")
+        self.method = method
+        self.columns = SENTIMENT_COLUMNS[method]
+        self.cache_path = method_cache_path(cache_path, method) if cache_path else None
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.values = np.zeros((0, len(self.columns)), dtype=np.float32)
+        if self.cache_path and os.path.exists(self.cache_path):
+            cache = np.load(self.cache_path)
+            if str(cache['method']) != method:
+                raise ValueError(f"{self.cache_path} holds {cache['method']} scores, not {method}")
+            self.keys, self.values = cache['keys'], cache['values']
+
+    def _lookup(self, keys):
+        """Cache row of each key, -1 when missing."""
+        if not len(self.keys):
+            return np.full(len(keys), -1)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[pos] == keys, pos, -1)
+
+    def _compute(self, texts):
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if not batches:
+            return np.zeros((0, len(self.columns)), dtype=np.float32)
+        if self.max_workers == 1 or len(batches) == 1:
+            _init_worker(self.method)
+            results = map(_score_batch, batches)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count() or 1,
+                                           initializer=_init_worker, initargs=(self.method,))
+            with executor:
+                results = list(executor.map(_score_batch, batches))
+        return np.vstack(list(results))
+
+    def score(self, texts):
+        """
+        Score texts, computing only those not already cached.
+
+        Returns:
+            pd.DataFrame: One row per text with the method's score columns
+        """
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str).to_numpy(object)
+        keys = np.fromiter((content_hash(text) for text in texts), dtype=np.uint64, count=len(texts))
+        unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        rows = self._lookup(unique_keys)
+        missing = rows < 0
+        if missing.any():
+            computed = self._compute(list(texts[first[missing]]))
+            self.keys = np.concatenate([self.keys, unique_keys[missing]])
+            self.values = np.vstack([self.values, computed])
+            order = np.argsort(self.keys, kind='stable')
+            self.keys, self.values = self.keys[order], self.values[order]
+            rows = self._lookup(unique_keys)
+        return pd.DataFrame(self.values[rows[inverse]], columns=self.columns)
+
+    def save(self, path=None):
+        """Write the cache to disk (path is keyed by method like cache_path)."""
+        path = method_cache_path(path, self.method) if path else self.cache_path
+        np.savez(path, keys=self.keys, values=self.values, method=self.method)
+
+
+def score_posts_and_comments(df, scorer):
+    """
+    Add post and comment sentiment to a scored comment DataFrame.
+
+    Posts are scored on title + body once per post; comments on comment_body
+    when the file has it.
+
+    Returns:
+        pd.DataFrame: Copy of df with post_sentiment (and comment_sentiment) columns
+    """
+    df = df.copy()
+    primary = scorer.columns[0]
+    posts = df.drop_duplicates('post_id')
+    post_text = posts['post_title'].fillna('') + ' ' + posts['post_body'].fillna('')
+    post_scores = pd.Series(scorer.score(post_text)[primary].to_numpy(), index=posts['post_id'])
+    df['post_sentiment'] = df['post_id'].map(post_scores)
+    if 'comment_body' in df:
+        df['comment_sentiment'] = scorer.score(df['comment_body'])[primary].to_numpy()
+    return df
+
+
+def aggregate_sentiment(scored):
+    """
+    Aggregate the output of score_posts_and_comments.
+
+    Returns:
+        dict: 'post' (per post_id), 'day' (posts per posting day, comments per
+            comment day when comment_datetime is present) and 'category' (per
+            gpt_score) DataFrames with mean sentiment and counts
+    """
+    scored = scored.assign(day=pd.to_datetime(scored['post_datetime'], unit='s').dt.floor('D'))
+    has_comments = 'comment_sentiment' in scored
+    per_post = scored.groupby('post_id', sort=False).agg(
+        post_sentiment=('post_sentiment', 'first'), day=('day', 'first'),
+        **({'gpt_score': ('gpt_score', 'first')} if 'gpt_score' in scored else {}),
+        n_comments=('post_id', 'size'),
+        **({'comment_sentiment': ('comment_sentiment', 'mean')} if has_comments else {}))
+
+    def summary(key, comments):
+        columns = {'posts': ('post_sentiment', 'size'), 'post_sentiment': ('post_sentiment', 'mean')}
+        table = per_post.groupby(key).agg(**columns)
+        if has_comments:
+            table = table.join(comments.groupby(key).agg(comments=('comment_sentiment', 'size'),
+                                                         comment_sentiment=('comment_sentiment', 'mean')),
+                               how='outer')
+            table['posts'] = table['posts'].fillna(0).astype(np.int64)
+        return table
+
+    # A comment counts toward the day it was written, not the day of its post
+    comments = scored
+    if has_comments and 'comment_datetime' in scored:
+        comments = scored.assign(day=pd.to_datetime(scored['comment_datetime'], unit='s').dt.floor('D'))
+    tables = {'post': per_post.reset_index(), 'day': summary('day', comments)}
+    if 'gpt_score' in scored:
+        tables['category'] = summary('gpt_score', scored)
+    return tables
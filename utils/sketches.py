@@ -0,0 +1,200 @@
+# utils/sketches.py
+# Fixed-memory frequency sketches over integer keys. Keys are uint64 (e.g. packed
+# token ids of an n-gram), so updates are vectorized numpy operations.
+import heapq
+import numpy as np
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch with multiply-shift hashing.
+
+    Estimates never under-count; with width w and depth d the over-count is at
+    most 2N/w with probability 1 - 2^-d, where N is the total count added.
+    """
+
+    def __init__(self, width=2 ** 20, depth=4, seed=0, dtype=np.uint32):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=dtype)
+        rng = np.random.default_rng(seed)
+        # Odd multipliers and random offsets, one pair per row
+        self._a = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64)
+        self._shift = np.uint64(64 - int(np.log2(width)))
+        self.total = 0
+
+    def _indices(self, keys):
+        keys = np.asarray(keys, dtype=np.uint64)
+        return ((self._a[:, None] * keys[None, :] + self._b[:, None]) & _MASK64) >> self._shift
+
+    def update(self, keys, counts=1):
+        """Add counts (scalar or per-key array) for an array of keys."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return
+        counts = np.broadcast_to(np.asarray(counts, dtype=self.table.dtype), keys.shape)
+        idx = self._indices(keys).astype(np.intp)
+        for row in range(self.depth):
+            np.add.at(self.table[row], idx[row], counts)
+        self.total += int(counts.sum())
+
+    def query(self, keys):
+        """Return estimated counts for an array of keys."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return np.zeros(0, dtype=self.table.dtype)
+        idx = self._indices(keys).astype(np.intp)
+        return self.table[np.arange(self.depth)[:, None], idx].min(axis=0)
+
+    def merge(self, other):
+        """Add another sketch built with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Can only merge sketches with the same width, depth and seed")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters with a fixed number of counters.
+
+    Any key whose true count exceeds total/capacity is guaranteed to be tracked;
+    each tracked count over-estimates the true count by at most its error.
+    Counts can be decayed so the summary follows recent heavy hitters.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # One (count, key) entry per tracked key; entries go stale as counts grow
+        # and are refreshed lazily when they reach the top of the heap.
+        self._heap = []
+
+    def update(self, key, count=1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (count, key))
+        else:
+            # Replace the smallest counter; the new key inherits its count as error
+            while self._heap[0][0] != self.counts[self._heap[0][1]]:
+                _, stale = self._heap[0]
+                heapq.heapreplace(self._heap, (self.counts[stale], stale))
+            floor, victim = self._heap[0]
+            del self.counts[victim], self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+            heapq.heapreplace(self._heap, (floor + count, key))
+
+    def update_many(self, keys):
+        for key in keys:
+            self.update(key)
+
+    def decay(self, factor):
+        """Multiply every counter (and its error) by factor."""
+        for key in self.counts:
+            self.counts[key] *= factor
+            self.errors[key] *= factor
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n=None):
+        """Return (key, count, error) tuples, highest count first."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(key, count, self.errors[key]) for key, count in items]
+
+
+class SlidingWindowSketch:
+    """
+    Count-Min counts over the last `window` completed time buckets plus the
+    open current bucket, and an exponentially decayed per-bucket baseline.
+
+    add() costs one sketch update per call; advance() expires the oldest bucket
+    by subtracting its table from a running window total, so no window is ever
+    rebuilt from scratch. The baseline starts at zero, so its rates are
+    bias-corrected by the weight of the buckets completed so far.
+    """
+
+    def __init__(self, window=24, width=2 ** 15, depth=4, seed=0, half_life=168):
+        self.window = window
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        # One extra bucket holds the current, still-open time step
+        self.buckets = [CountMinSketch(width, depth, seed) for _ in range(window + 1)]
+        self.window_total = CountMinSketch(width, depth, seed)
+        self.baseline = np.zeros((depth, width), dtype=np.float32)
+        self.current = 0
+        self.completed = 0
+
+    def add(self, keys, counts=1):
+        self.buckets[self.current].update(keys, counts)
+        self.window_total.update(keys, counts)
+
+    def advance(self, n_buckets=1):
+        """Close the current bucket and move forward n_buckets time steps."""
+        for step in range(min(n_buckets, len(self.buckets))):
+            completed = self.buckets[self.current].table
+            self.baseline *= 1 - self.alpha
+            self.baseline += self.alpha * completed
+            self.current = (self.current + 1) % len(self.buckets)
+            expired = self.buckets[self.current]
+            self.window_total.table -= expired.table
+            self.window_total.total -= expired.total
+            expired.table[:] = 0
+            expired.total = 0
+        # Skipped empty buckets only decay the baseline
+        skipped = n_buckets - min(n_buckets, len(self.buckets))
+        if skipped > 0:
+            self.baseline *= (1 - self.alpha) ** skipped
+        self.completed += n_buckets
+
+    @property
+    def completed_in_window(self):
+        """Number of completed buckets covered by window_counts()."""
+        return min(self.window, self.completed)
+
+    def window_counts(self, keys, include_current=False):
+        """
+        Estimated counts over the completed buckets of the window (plus the
+        open bucket with include_current).
+        """
+        if include_current:
+            return self.window_total.query(keys)
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return np.zeros(0, dtype=self.window_total.table.dtype)
+        # Subtract the open bucket cell by cell, then take the Count-Min minimum
+        idx = self.window_total._indices(keys).astype(np.intp)
+        rows = np.arange(self.window_total.depth)[:, None]
+        return (self.window_total.table[rows, idx] - self.buckets[self.current].table[rows, idx]).min(axis=0)
+
+    def baseline_rates(self, keys):
+        """
+        Estimated decayed counts per bucket for the given keys (NaN before the
+        first bucket is completed).
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(keys):
+            return np.zeros(0, dtype=np.float64)
+        if not self.completed:
+            return np.full(len(keys), np.nan)
+        idx = self.window_total._indices(keys).astype(np.intp)
+        rates = self.baseline[np.arange(self.baseline.shape[0])[:, None], idx].min(axis=0).astype(np.float64)
+        return rates / (1 - (1 - self.alpha) ** self.completed)
+
+    @property
+    def nbytes(self):
+        return sum(bucket.nbytes for bucket in self.buckets) + self.window_total.nbytes + self.baseline.nbytes
@@ -0,0 +1,171 @@
+# utils/stub_server.py
+# Local stand-in for the Reddit JSON API and an OpenAI-compatible chat endpoint,
+# for running utils.pipeline end to end without credentials or network access.
+#
+#   python -m utils.stub_server --port 8080
+#   python -m utils.pipeline --reddit-url http://127.0.0.1:8080 \
+#       --llm-url http://127.0.0.1:8080/v1 --rate-limit-delay 0 --poll-interval 1
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+TITLES = {
+    'POLITICAL': ["Government announces new policy on {topic}", "Protest over {topic} draws crowds",
+                  "Election debate turns to {topic}"],
+    'CULTURAL': ["Best food to try for {topic}", "Travel tips: {topic} in spring",
+                 "Learning the language through {topic}"],
+    'OTHER': ["Question about {topic}", "Anyone else notice {topic}?"],
+}
+TOPICS = ['night markets', 'visa rules', 'public transport', 'tea culture', 'housing prices', 'festivals']
+POLITICAL_WORDS = ('government', 'protest', 'election', 'policy')
+CULTURAL_WORDS = ('food', 'travel', 'language', 'festival', 'tea')
+
+
+class StubRedditState:
+    """Generates posts and comments on demand; new posts appear every `post_interval` seconds."""
+
+    def __init__(self, post_interval=1.0, comments_per_post=5, seed=0):
+        self.post_interval = post_interval
+        self.comments_per_post = comments_per_post
+        self.rng = random.Random(seed)
+        self.posts = {}
+        self.comments = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def _generate(self, subreddit):
+        # Catch up on posts that "arrived" since the last request
+        due = int((time.time() - self.started) / self.post_interval) + 1
+        posts = self.posts.setdefault(subreddit, [])
+        while len(posts) < due:
+            n = len(posts)
+            category = self.rng.choice(list(TITLES))
+            topic = self.rng.choice(TOPICS)
+            post_id = f'{subreddit.lower()[:2]}{n:06d}'
+            created = self.started + n * self.post_interval
+            posts.append({
+                'id': post_id,
+                'name': f't3_{post_id}',
+                'title': self.rng.choice(TITLES[category]).format(topic=topic),
+                'selftext': f"Looking for opinions on {topic} in r/{subreddit}.",
+                'created_utc': created,
+                'score': self.rng.randint(0, 200),
+                'author': f'user{self.rng.randint(0, 50)}',
+            })
+            self.comments[post_id] = [self._comment(f'{post_id}c{i}', f't3_{post_id}', created, topic, 1)
+                                      for i in range(self.comments_per_post)]
+        return posts
+
+    def _comment(self, comment_id, parent_name, parent_created, topic, depth):
+        created = parent_created + self.rng.randint(10, 3600)
+        # Half of the comments get one or two replies, down to depth 3
+        n_replies = self.rng.choice([0, 0, 1, 2]) if depth < 3 else 0
+        replies = [self._comment(f'{comment_id}r{j}', f't1_{comment_id}', created, topic, depth + 1)
+                   for j in range(n_replies)]
+        return {
+            'kind': 't1',
+            'data': {
+                'id': comment_id,
+                'author': f'user{self.rng.randint(0, 50)}',
+                'created_utc': created,
+                'score': self.rng.randint(-5, 50),
+                'parent_id': parent_name,
+                'body': f"Reply about {topic}" if depth > 1 else f"Comment about {topic}",
+                'replies': {'kind': 'Listing', 'data': {'children': replies}} if replies else '',
+            },
+        }
+
+    def listing(self, subreddit, limit, after=None):
+        with self._lock:
+            posts = list(reversed(self._generate(subreddit)))
+        if after:
+            names = [post['name'] for post in posts]
+            posts = posts[names.index(after) + 1:] if after in names else []
+        page = posts[:limit]
+        return {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': post} for post in page],
+                                            'after': page[-1]['name'] if page else None}}
+
+    def comment_listing(self, post_id):
+        with self._lock:
+            comments = self.comments.get(post_id, [])
+        return [{'kind': 'Listing', 'data': {'children': []}},
+                {'kind': 'Listing', 'data': {'children': comments}}]
+
+
+def stub_label(prompt):
+    """Keyword classifier standing in for the LLM."""
+    text = prompt.lower()
+    if any(word in text for word in POLITICAL_WORDS):
+        return 'POLITICAL'
+    if any(word in text for word in CULTURAL_WORDS):
+        return 'CULTURAL'
+    return 'OTHER'
+
+
+def make_handler(state):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            match = re.fullmatch(r'/r/([^/]+)/new', url.path)
+            if match:
+                limit = int(params.get('limit', ['25'])[0])
+                return self._send(state.listing(match.group(1), limit, params.get('after', [None])[0]))
+            match = re.fullmatch(r'/comments/([^/]+)', url.path)
+            if match:
+                return self._send(state.comment_listing(match.group(1)))
+            self._send({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip('/') != '/v1/chat/completions':
+                return self._send({'error': 'not found'}, 404)
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            prompt = request['messages'][-1]['content']
+            # Only the post body is classified, not the category descriptions in the prompt
+            body = prompt.split('standards below:', 1)[-1].split('CATEGORIES:', 1)[0]
+            self._send({'choices': [{'message': {'role': 'assistant', 'content': stub_label(body)}}]})
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(port=0, post_interval=1.0, comments_per_post=5, seed=0):
+    """
+    Start the stub server in a background thread.
+
+    Returns:
+        tuple: (server, base_url); call server.shutdown() to stop it
+    """
+    state = StubRedditState(post_interval, comments_per_post, seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, name='stub-server', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a stub Reddit API and LLM endpoint.")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--post-interval', type=float, default=1.0)
+    parser.add_argument('--comments-per-post', type=int, default=5)
+    args = parser.parse_args(argv)
+    state = StubRedditState(args.post_interval, args.comments_per_post)
+    ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state)).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
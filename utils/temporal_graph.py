@@ -0,0 +1,221 @@
+# utils/temporal_graph.py
+# Time-sliced reply graph. Edges (commenter -> replied-to user) keep their
+# comment_datetime and are stored sorted by time, so a sliding window is two
+# pointers into the edge arrays: moving it adds the newly covered edges and
+# expires the ones that fell out instead of rebuilding the graph.
+import os
+from xml.sax.saxutils import quoteattr
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from config.settings import SCORED_COMMENT_FILES, CATEGORIES
+from utils.ingestion import iter_csv_chunks
+
+EDGE_COLUMNS = ['comment_owner', 'reply_to_userId', 'comment_datetime', 'comment_score', 'gpt_score']
+
+
+def load_temporal_edges(paths=None, chunksize=100000):
+    """
+    Timestamped reply edges in the network_data edge layout plus Time and Forum.
+
+    Args:
+        paths: Dict mapping forum name -> scored comment CSV (defaults to SCORED_COMMENT_FILES)
+    Returns:
+        pd.DataFrame: Source, Target, Score (absolute comment score), Label, Time (unix seconds), Forum
+    """
+    paths = paths or SCORED_COMMENT_FILES
+    frames = []
+    for forum, path in paths.items():
+        for chunk in iter_csv_chunks(path, chunksize, usecols=EDGE_COLUMNS):
+            edges = chunk.dropna(subset=['comment_owner', 'reply_to_userId', 'comment_datetime'])
+            frames.append(pd.DataFrame({
+                'Source': edges['comment_owner'],
+                'Target': edges['reply_to_userId'],
+                'Score': edges['comment_score'].abs(),
+                'Label': edges['gpt_score'],
+                'Time': pd.to_numeric(edges['comment_datetime'], errors='coerce'),
+                'Forum': forum,
+            }))
+    return pd.concat(frames, ignore_index=True).dropna(subset=['Time'])
+
+
+class TemporalGraph:
+    """
+    Reply graph over a sliding time window.
+
+    Args:
+        edges: DataFrame with Source, Target, Time and optionally Score and Label
+            (see load_temporal_edges; filter on Forum beforehand for one subreddit)
+    """
+
+    def __init__(self, edges):
+        edges = edges.sort_values('Time', kind='stable', ignore_index=True)
+        codes, users = pd.factorize(pd.concat([edges['Source'], edges['Target']], ignore_index=True))
+        self.users = np.asarray(users, dtype=object)
+        self.source = codes[:len(edges)].astype(np.int32)
+        self.target = codes[len(edges):].astype(np.int32)
+        self.time = edges['Time'].to_numpy(np.float64)
+        self.score = edges['Score'].to_numpy(np.float64) if 'Score' in edges else np.zeros(len(edges))
+        label_codes = {label: i for i, label in enumerate(CATEGORIES)}
+        self.label = (edges['Label'].map(label_codes).fillna(-1).to_numpy(np.int8) if 'Label' in edges
+                      else np.full(len(edges), -1, dtype=np.int8))
+        self.reset()
+
+    def __len__(self):
+        return len(self.time)
+
+    def reset(self):
+        """Empty the window."""
+        self.lo = self.hi = 0
+        self.start = self.end = None
+        self.degree = np.zeros(len(self.users), dtype=np.int64)
+        self.label_counts = np.zeros(len(CATEGORIES), dtype=np.int64)
+        self.n_active = 0
+
+    def _apply(self, edges, sign):
+        """Add (sign=1) or expire (sign=-1) a contiguous range of edges."""
+        if edges.start == edges.stop:
+            return
+        nodes = np.concatenate([self.source[edges], self.target[edges]])
+        touched = np.unique(nodes)
+        was_active = self.degree[touched] > 0
+        np.add.at(self.degree, nodes, sign)
+        self.n_active += int((self.degree[touched] > 0).sum() - was_active.sum())
+        labels = self.label[edges]
+        self.label_counts += sign * np.bincount(labels[labels >= 0], minlength=len(CATEGORIES))
+
+    def advance_to(self, start, end):
+        """
+        Move the window to [start, end) (unix seconds); windows must move forward.
+
+        Only edges entering or leaving the window are touched.
+        """
+        if self.start is not None and (start < self.start or end < self.end):
+            self.reset()
+        lo = int(np.searchsorted(self.time, start, side='left'))
+        hi = int(np.searchsorted(self.time, end, side='left'))
+        if lo >= self.hi:  # No overlap with the previous window
+            self._apply(slice(self.lo, self.hi), -1)
+            self._apply(slice(lo, hi), 1)
+        else:
+            self._apply(slice(self.lo, lo), -1)
+            self._apply(slice(self.hi, hi), 1)
+        self.lo, self.hi, self.start, self.end = lo, hi, start, end
+        return self
+
+    @property
+    def window_edges(self):
+        return slice(self.lo, self.hi)
+
+    def degree_distribution(self):
+        """Number of active users per degree (reply count, in + out) in the current window."""
+        counts = np.bincount(self.degree)
+        degrees = np.flatnonzero(counts[1:]) + 1
+        return pd.Series(counts[degrees], index=pd.Index(degrees, name='degree'), name='users')
+
+    def largest_component(self):
+        """Size of the largest weakly connected component in the current window."""
+        if self.hi == self.lo:
+            return 0
+        edges = self.window_edges
+        nodes, local = np.unique(np.concatenate([self.source[edges], self.target[edges]]), return_inverse=True)
+        n_edges = self.hi - self.lo
+        adjacency = sp.coo_matrix((np.ones(n_edges), (local[:n_edges], local[n_edges:])),
+                                  shape=(len(nodes), len(nodes)))
+        _, component = connected_components(adjacency, directed=True, connection='weak')
+        return int(np.bincount(component).max())
+
+    def window_metrics(self):
+        """Metrics of the current window as a dict."""
+        n_edges = self.hi - self.lo
+        active = self.degree[self.degree > 0]
+        share = self.label_counts / n_edges if n_edges else np.zeros(len(CATEGORIES))
+        largest = self.largest_component()
+        return {
+            'start': pd.Timestamp(self.start, unit='s'),
+            'end': pd.Timestamp(self.end, unit='s'),
+            'edges': n_edges,
+            'active_users': self.n_active,
+            'mean_degree': active.mean() if len(active) else 0.0,
+            'max_degree': int(active.max()) if len(active) else 0,
+            'political_share': share[CATEGORIES.index('POLITICAL')],
+            'cultural_share': share[CATEGORIES.index('CULTURAL')],
+            'largest_component': largest,
+            'largest_component_share': largest / self.n_active if self.n_active else 0.0,
+        }
+
+    def windows(self, window='7D', step='1D', start=None, end=None):
+        """
+        Slide the window over the edge times, yielding after each move.
+
+        Args:
+            window: Window length (pandas Timedelta string or seconds)
+            step: Step between window starts
+            start, end: Time range (defaults to the first and last edge)
+        Yields:
+            TemporalGraph: self, positioned on the next window
+        """
+        if not len(self):
+            return
+        window, step = (pd.Timedelta(value).total_seconds() if isinstance(value, str) else float(value)
+                        for value in (window, step))
+        start = self.time[0] if start is None else start
+        end = self.time[-1] if end is None else end
+        for window_start in np.arange(start, end + 1e-9, step):
+            yield self.advance_to(window_start, window_start + window)
+
+    def metrics(self, window='7D', step='1D', start=None, end=None):
+        """Per-window metrics as a DataFrame (see window_metrics)."""
+        return pd.DataFrame([graph.window_metrics() for graph in self.windows(window, step, start, end)])
+
+    def write_gexf(self, path):
+        """
+        Write the current window as GEXF; nodes and edges carry the window as their
+        spell so per-window files line up on Gephi's timeline.
+        """
+        edges = self.window_edges
+        window = pd.DataFrame({'source': self.source[edges], 'target': self.target[edges],
+                               'score': self.score[edges], 'label': self.label[edges]})
+        for i, category in enumerate(CATEGORIES):
+            window[category.lower()] = (window['label'] == i).astype(np.int64)
+        pairs = window.groupby(['source', 'target'], sort=False).agg(
+            weight=('score', 'size'), score=('score', 'sum'),
+            **{category.lower(): (category.lower(), 'sum') for category in CATEGORIES}).reset_index()
+        nodes = np.flatnonzero(self.degree > 0)
+        spell = (f'start={quoteattr(pd.Timestamp(self.start, unit="s").isoformat())} '
+                 f'end={quoteattr(pd.Timestamp(self.end, unit="s").isoformat())}')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<gexf xmlns="http://gexf.net/1.3" version="1.3">\n'
+                    '  <graph mode="dynamic" defaultedgetype="directed" timeformat="datetime">\n'
+                    '    <attributes class="edge">\n'
+                    '      <attribute id="score" title="score" type="double"/>\n')
+            for category in CATEGORIES:
+                f.write(f'      <attribute id="{category.lower()}" title="{category}" type="integer"/>\n')
+            f.write('    </attributes>\n    <nodes>\n')
+            f.writelines(f'      <node id="{node}" label={quoteattr(str(self.users[node]))} {spell}/>\n'
+                         for node in nodes)
+            f.write('    </nodes>\n    <edges>\n')
+            for i, row in enumerate(pairs.itertuples(index=False)):
+                values = ''.join(f'<attvalue for="{category.lower()}" value="{getattr(row, category.lower())}"/>'
+                                 for category in CATEGORIES)
+                f.write(f'      <edge id="{i}" source="{row.source}" target="{row.target}" weight="{row.weight}" '
+                        f'{spell}><attvalues><attvalue for="score" value="{row.score}"/>{values}</attvalues></edge>\n')
+            f.write('    </edges>\n  </graph>\n</gexf>\n')
+
+    def export_gexf(self, out_dir, window='7D', step='1D', prefix='replies'):
+        """
+        Write one GEXF file per window.
+
+        Returns:
+            list: Paths of the written files
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for graph in self.windows(window, step):
+            path = os.path.join(out_dir, f"{prefix}_{pd.Timestamp(graph.start, unit='s'):%Y%m%d_%H%M%S}.gexf")
+            graph.write_gexf(path)
+            paths.append(path)
+        return paths
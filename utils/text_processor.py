@@ -1,16 +1,63 @@
 # utils/text_processor.py
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tag import pos_tag
-from nltk.util import ngrams
+from functools import lru_cache
 import re
 import pandas as pd
 
-def preprocess_text(text):
+
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """
+    Return the NLTK English stopword list, loading the corpus on first use.
+    """
+    from nltk.corpus import stopwords
+    return stopwords.words('english')
+
+
+@lru_cache(maxsize=None)
+def _nltk_pipeline():
+    """
+    Import the NLTK tokenizer, tagger and lemmatizer once per process.
+    """
+    from nltk.tokenize import word_tokenize
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tag import pos_tag
+    return word_tokenize, pos_tag, WordNetLemmatizer(), set(english_stopwords())
+
+
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+SPECIAL_PATTERN = re.compile(r'[^\w\s]')
+DIGIT_PATTERN = re.compile(r'\d+')
+LEMMA_CACHE_SIZE = 2 ** 18    # Distinct words cached by the fast path
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemma(token):
+    """
+    Lemma of a single token, or '' when it is a stopword.
+
+    Tags the word on its own (no sentence context). Frequent words are tagged
+    and lemmatized once per process; the cache is bounded, so rare tokens
+    (typos, usernames) are evicted rather than kept forever.
+    """
+    _, pos_tag, lemmatizer, stop_words = _nltk_pipeline()
+    if token in stop_words:
+        return ''
+    tag = pos_tag([token])[0][1]
+    return lemmatizer.lemmatize(token, 'v') if tag.startswith('V') else lemmatizer.lemmatize(token)
+
+
+def preprocess_text(text, fast=False, min_len=3):
     """
     Clean and normalize text using NLTK.
+
+    Tokens shorter than min_len characters are dropped after lemmatization;
+    min_len=1 keeps short words such as 'xi' (e.g. for phrase detection).
+
+    With fast=True tokens are split with a regex instead of word_tokenize and
+    lemmatized through a per-word cache instead of tagging every sentence.
+    The output differs where the tagger depends on sentence context;
+    utils.agreement.preprocessing_agreement reports the agreement and the
+    speedup on a corpus.
     """
     if pd.isna(text):
         return ""
@@ -19,21 +66,25 @@ def preprocess_text(text):
     text = text.lower()
     
     # Remove URLs
-    text = re.sub(r'http\S+|www\S+', '', text)
+    text = URL_PATTERN.sub('', text)
     
     # Remove special characters and numbers
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\d+', '', text)
+    text = SPECIAL_PATTERN.sub(' ', text)
+    text = DIGIT_PATTERN.sub('', text)
+
+    if fast:
+        # Only word characters and whitespace are left, so splitting is tokenizing
+        return ' '.join(lemma for lemma in map(_lemma, text.split()) if len(lemma) >= min_len)
     
+    word_tokenize, pos_tag, lemmatizer, stop_words = _nltk_pipeline()
+
     # Tokenize
     tokens = word_tokenize(text)
     
     # Remove stopwords
-    stop_words = set(stopwords.words('english'))
     tokens = [token for token in tokens if token not in stop_words]
     
     # Lemmatize based on POS tag
-    lemmatizer = WordNetLemmatizer()
     tokens = pos_tag(tokens)
     tokens = [
         lemmatizer.lemmatize(word, 'v') if tag.startswith('V')
@@ -42,7 +93,7 @@ def preprocess_text(text):
     ]
     
     # Remove short words
-    tokens = [token for token in tokens if len(token) > 2]
+    tokens = [token for token in tokens if len(token) >= min_len]
 
     
     return ' '.join(tokens)
@@ -0,0 +1,233 @@
+# utils/threads.py
+# Array-backed comment threads. Posts and comments are nodes of a forest stored
+# in breadth-first (topological) order: parent[i] < i, each depth level is a
+# contiguous slice and the children of a node are a contiguous CSR range.
+import numpy as np
+import pandas as pd
+
+
+def infer_parent_ids(df):
+    """
+    Reconstruct comment_id/parent_id for comment files scraped without them.
+
+    A comment replying to the post owner is taken as top-level; otherwise its
+    parent is the latest earlier comment in the same post by the user named in
+    reply_to_userId, falling back to the post.
+
+    Returns:
+        pd.DataFrame: Copy of df with synthetic comment_id and parent_id columns
+    """
+    df = df.reset_index(drop=True).copy()
+    df['comment_id'] = df['post_id'].astype(str) + '_' + df.index.astype(str)
+    times = pd.to_numeric(df['comment_datetime'], errors='coerce').fillna(0.0)
+
+    replies = pd.DataFrame({'post_id': df['post_id'], 'author': df['reply_to_userId'],
+                            'time': times, 'row': df.index})
+    replies = replies[df['reply_to_userId'].notna() & (df['reply_to_userId'] != df['post_owner'])]
+    authored = pd.DataFrame({'post_id': df['post_id'], 'author': df['comment_owner'],
+                             'time': times, 'parent_id': df['comment_id']}).dropna(subset=['author'])
+    matched = pd.merge_asof(replies.sort_values('time'), authored.sort_values('time'), on='time',
+                            by=['post_id', 'author'], allow_exact_matches=False)
+
+    df['parent_id'] = df['post_id'].astype(str)
+    matched = matched.dropna(subset=['parent_id'])
+    df.loc[matched['row'].to_numpy(), 'parent_id'] = matched['parent_id'].to_numpy()
+    return df
+
+
+class CommentThreads:
+    """
+    Comment forest for a set of posts, one root node per post.
+
+    Attributes (all indexed by node, in breadth-first order):
+        post: Index into post_ids
+        parent: Parent node, -1 for post roots
+        depth: 0 for posts, 1 for top-level comments
+        timestamp: Post or comment time (unix seconds)
+        score: Post or comment score
+        row: Row of the source DataFrame, -1 for post roots
+        child_offsets: Children of node i are child_offsets[i]:child_offsets[i + 1]
+        level_offsets: Nodes at depth d are level_offsets[d]:level_offsets[d + 1]
+    """
+
+    def __init__(self, post_ids, post, parent, timestamp, score, row, level_sizes):
+        self.post_ids = post_ids
+        self.post = post
+        self.parent = parent
+        self.timestamp = timestamp
+        self.score = score
+        self.row = row
+        self.level_offsets = np.concatenate([[0], np.cumsum(level_sizes)])
+        self.depth = np.repeat(np.arange(len(level_sizes), dtype=np.int32), level_sizes)
+        n_posts = len(post_ids)
+        self.child_offsets = n_posts + np.searchsorted(parent[n_posts:], np.arange(len(parent) + 1))
+
+    def __len__(self):
+        return len(self.parent)
+
+    @property
+    def n_posts(self):
+        return len(self.post_ids)
+
+    def children(self, node):
+        return np.arange(self.child_offsets[node], self.child_offsets[node + 1])
+
+    def n_children(self):
+        return np.diff(self.child_offsets)
+
+    def subtree_sizes(self):
+        """Number of nodes in each node's subtree, including the node itself."""
+        sizes = np.ones(len(self), dtype=np.int64)
+        for level in range(len(self.level_offsets) - 2, 0, -1):
+            nodes = slice(self.level_offsets[level], self.level_offsets[level + 1])
+            np.add.at(sizes, self.parent[nodes], sizes[nodes])
+        return sizes
+
+    def reply_latency(self):
+        """Seconds between each comment and its parent (NaN for post roots)."""
+        latency = np.full(len(self), np.nan)
+        comments = slice(self.n_posts, None)
+        latency[comments] = self.timestamp[comments] - self.timestamp[self.parent[comments]]
+        return latency
+
+    def post_features(self):
+        """
+        Per-post thread features.
+
+        Returns:
+            pd.DataFrame: post_id, post_score, n_comments, n_top_level, max_depth, mean_depth,
+                largest_thread, mean_branching, max_branching, first_reply_seconds,
+                mean_reply_seconds, comment_score_sum, comment_score_mean, comment_score_max
+        """
+        n_posts = self.n_posts
+        comments = slice(n_posts, None)
+        post, depth, score = self.post[comments], self.depth[comments], self.score[comments]
+        n_comments = np.bincount(post, minlength=n_posts)
+        n_children = self.n_children()
+        sizes = self.subtree_sizes()
+        latency = self.reply_latency()[comments]
+
+        def per_post(ufunc, values, fill):
+            out = np.full(n_posts, fill, dtype=np.float64)
+            ufunc.at(out, post, values)
+            return out
+
+        # Branching over internal nodes (the post itself counts when it has replies)
+        internal = n_children > 0
+        n_internal = np.bincount(self.post[internal], minlength=n_posts)
+        children_total = np.bincount(self.post[internal], weights=n_children[internal], minlength=n_posts)
+        max_branching = np.zeros(n_posts, dtype=np.int64)
+        np.maximum.at(max_branching, self.post, n_children)
+
+        # Missing timestamps give NaN latencies; average over the known ones only
+        timed = np.isfinite(latency)
+        n_timed = np.bincount(post[timed], minlength=n_posts)
+        reply_total = np.bincount(post[timed], weights=latency[timed], minlength=n_posts)
+
+        top_level = depth == 1
+        first_reply = np.full(n_posts, np.inf)
+        np.fmin.at(first_reply, post[top_level], latency[top_level])
+        has = n_comments > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            features = pd.DataFrame({
+                'post_id': self.post_ids,
+                'post_score': self.score[:n_posts],
+                'n_comments': n_comments,
+                'n_top_level': n_children[:n_posts],
+                'max_depth': np.where(has, per_post(np.maximum, depth, 0), 0).astype(np.int32),
+                'mean_depth': np.bincount(post, weights=depth, minlength=n_posts) / n_comments,
+                'largest_thread': np.where(has, per_post(np.maximum, sizes[comments], 0), 0).astype(np.int64),
+                'mean_branching': children_total / n_internal,
+                'max_branching': max_branching,
+                'first_reply_seconds': np.where(np.isfinite(first_reply), first_reply, np.nan),
+                'mean_reply_seconds': reply_total / n_timed,
+                'comment_score_sum': np.bincount(post, weights=score, minlength=n_posts),
+                'comment_score_mean': np.bincount(post, weights=score, minlength=n_posts) / n_comments,
+                'comment_score_max': np.where(has, per_post(np.maximum, score, -np.inf), np.nan),
+            })
+        return features
+
+
+def _breadth_first(parent, timestamp, n_posts):
+    """Breadth-first order of the forest rooted at the first n_posts nodes, one numpy pass per level."""
+    n = len(parent)
+    children = n_posts + np.lexsort((timestamp[n_posts:], parent[n_posts:]))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(parent[n_posts:], minlength=n))])
+    frontier = np.arange(n_posts)
+    levels = []
+    while frontier.size:
+        levels.append(frontier)
+        starts, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+        total = counts.sum()
+        # Gather the contiguous child ranges of every frontier node
+        shift = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        frontier = children[shift + np.arange(total)]
+    return levels
+
+
+def build_threads(df):
+    """
+    Build comment threads from a comment DataFrame.
+
+    Args:
+        df: Rows in the *_scored_pnc_df.csv layout; comment_id/parent_id are inferred
+            with infer_parent_ids when missing
+    Returns:
+        CommentThreads
+    """
+    if 'comment_id' not in df or 'parent_id' not in df:
+        df = infer_parent_ids(df)
+    df = df.reset_index(drop=True)
+    post_codes, post_ids = pd.factorize(df['post_id'].astype(str))
+    n_posts, n_comments = len(post_ids), len(df)
+
+    first_rows = pd.Series(np.arange(n_comments)).groupby(post_codes).first().to_numpy()
+    post_time = pd.to_numeric(df['post_datetime'], errors='coerce').to_numpy(np.float64)[first_rows]
+    post_score = pd.to_numeric(df['post_score'], errors='coerce').to_numpy(np.float64)[first_rows]
+
+    # Parent comment row, or the post root when the parent is the post, unknown,
+    # the comment itself or a comment on a different post
+    comment_ids = df['comment_id'].astype(str)
+    first = ~comment_ids.duplicated().to_numpy()
+    parent_rows = pd.Index(comment_ids[first]).get_indexer(df['parent_id'].astype(str))
+    parent_rows = np.where(parent_rows >= 0, np.flatnonzero(first)[parent_rows], -1)
+    valid = (parent_rows >= 0) & (parent_rows != np.arange(n_comments))
+    valid[valid] &= post_codes[parent_rows[valid]] == post_codes[valid]
+    parent = np.concatenate([np.full(n_posts, -1), np.where(valid, n_posts + parent_rows, post_codes)])
+
+    timestamp = np.concatenate([post_time, pd.to_numeric(df['comment_datetime'], errors='coerce').to_numpy(np.float64)])
+    score = np.concatenate([post_score, pd.to_numeric(df['comment_score'], errors='coerce').to_numpy(np.float64)])
+    node_post = np.concatenate([np.arange(n_posts), post_codes])
+
+    levels = _breadth_first(parent, np.nan_to_num(timestamp), n_posts)
+    reached = np.zeros(len(parent), dtype=bool)
+    reached[np.concatenate(levels)] = True
+    if not reached.all():
+        # Parent cycles are unreachable from the roots; attach them to their post
+        parent[~reached] = node_post[~reached]
+        levels = _breadth_first(parent, np.nan_to_num(timestamp), n_posts)
+
+    order = np.concatenate(levels)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    old_parent = parent[order]
+    new_parent = np.where(old_parent >= 0, rank[np.maximum(old_parent, 0)], -1)
+    row = np.concatenate([np.full(n_posts, -1), np.arange(n_comments)])[order]
+
+    return CommentThreads(np.asarray(post_ids), node_post[order], new_parent, timestamp[order], score[order], row,
+                          [len(level) for level in levels])
+
+
+def post_engagement_features(df):
+    """
+    Per-post thread features for a comment DataFrame, joined with gpt_score when present.
+
+    Returns:
+        pd.DataFrame: One row per post (see CommentThreads.post_features)
+    """
+    features = build_threads(df).post_features()
+    if 'gpt_score' in df:
+        labels = df.drop_duplicates('post_id').assign(post_id=lambda d: d['post_id'].astype(str))
+        features = features.merge(labels[['post_id', 'gpt_score']], on='post_id', how='left')
+    return features
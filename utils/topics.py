@@ -0,0 +1,274 @@
+# utils/topics.py
+# Topic models over the shared TF-IDF representation: minibatch NMF on TF-IDF
+# weights and online LDA on raw counts. Both are fit incrementally, persisted
+# with pickle, and warm-started when the vocabulary is refreshed. Per-subreddit
+# fits keep the preprocessed posts as a TokenCorpus, so each post goes through
+# preprocessing once, and later runs only add the new posts.
+from concurrent.futures import ProcessPoolExecutor
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from scipy.special import digamma
+from sklearn.decomposition import MiniBatchNMF, LatentDirichletAllocation
+from utils.text_processor import english_stopwords
+from utils.vectorizer import StreamingTfidfVectorizer
+from utils.ingestion import iter_post_chunks, preprocess_chunk
+from utils.corpus import TokenCorpus, _CorpusBuilder
+from utils.analysis import get_top_terms
+
+METHODS = ('nmf', 'lda')
+
+
+def _text_chunks(stream):
+    """Treat a plain list of texts as a single chunk."""
+    if isinstance(stream, (list, tuple)) and (not stream or isinstance(stream[0], str)):
+        return [list(stream)]
+    return stream
+
+
+def _corpus_batches(corpus, chunksize):
+    """Yield (metadata, texts) for consecutive batches of corpus documents."""
+    for start in range(0, len(corpus), chunksize):
+        stop = min(start + chunksize, len(corpus))
+        yield corpus.metadata.iloc[start:stop], [' '.join(corpus.document(i)) for i in range(start, stop)]
+
+
+class _CorpusChunks:
+    """Re-iterable text chunks of a corpus (for TopicModel.fit)."""
+
+    def __init__(self, corpus, chunksize):
+        self.corpus = corpus
+        self.chunksize = chunksize
+
+    def __iter__(self):
+        for _, texts in _corpus_batches(self.corpus, self.chunksize):
+            yield texts
+
+
+class TopicModel:
+    """
+    Incrementally fitted topic model for preprocessed texts.
+
+    The vocabulary and IDF weights come from StreamingTfidfVectorizer with the
+    same settings as generate_tfidf_matrix, so NMF factorises exactly the
+    matrix generate_tfidf_matrix would return; LDA uses counts on the same
+    vocabulary.
+
+    Args:
+        n_topics: Number of topics
+        method: 'nmf' or 'lda'
+        max_terms: Vocabulary size (as in generate_tfidf_matrix)
+        min_doc_freq: Minimum document frequency (as in generate_tfidf_matrix)
+        batch_size: Minibatch size for the estimator
+        random_state: Seed for the estimator
+    """
+
+    def __init__(self, n_topics=10, method='nmf', max_terms=1000, min_doc_freq=2, batch_size=1024,
+                 random_state=0):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        self.n_topics = n_topics
+        self.method = method
+        self.max_terms = max_terms
+        self.min_doc_freq = min_doc_freq
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.vectorizer = StreamingTfidfVectorizer(max_features=max_terms, min_df=min_doc_freq,
+                                                   stop_words=english_stopwords())
+        self.estimator = None
+        self.feature_names = None
+        self._warm_components = None
+
+    def _new_estimator(self):
+        if self.method == 'nmf':
+            init = 'custom' if self._warm_components is not None else 'nndsvda'
+            return MiniBatchNMF(self.n_topics, init=init, batch_size=self.batch_size,
+                                random_state=self.random_state)
+        return LatentDirichletAllocation(self.n_topics, learning_method='online', batch_size=self.batch_size,
+                                         random_state=self.random_state)
+
+    def _matrix(self, texts):
+        return self.vectorizer.transform(texts) if self.method == 'nmf' else self.vectorizer.count(texts)
+
+    def _refresh_vocabulary(self):
+        """Finalize the vocabulary; carry fitted topics over to it as a warm start."""
+        self.vectorizer.finalize()
+        feature_names = self.vectorizer.get_feature_names_out()
+        if self.feature_names is not None and np.array_equal(feature_names, self.feature_names):
+            return
+        if self.estimator is not None:
+            old = pd.DataFrame(self.estimator.components_.T, index=self.feature_names)
+            # Terms new to the vocabulary start at the weakest weight of each topic
+            floor = np.where(old > 0, old, np.inf).min(axis=0)
+            floor = np.where(np.isfinite(floor), floor, 1e-6)
+            self._warm_components = old.reindex(feature_names).fillna(pd.Series(floor)).to_numpy().T.copy()
+            self.estimator = None
+        self.feature_names = feature_names
+
+    def _update(self, X):
+        if X.shape[0] == 0:
+            return
+        if self.estimator is None:
+            self.estimator = self._new_estimator()
+            if self._warm_components is not None:
+                self._install_warm_start(X)
+                return
+        self.estimator.partial_fit(X)
+
+    def _install_warm_start(self, X):
+        H = self._warm_components
+        self._warm_components = None
+        if self.method == 'nmf':
+            scale = np.maximum((H ** 2).sum(axis=1), 1e-12)
+            W = np.maximum(np.asarray(X @ H.T) / scale, 1e-6)
+            self.estimator.partial_fit(X, W=W, H=H)
+        else:
+            # The first call sizes the model; then the previous topics replace the random start
+            self.estimator.partial_fit(X[:1])
+            self.estimator.components_ = H
+            self.estimator.exp_dirichlet_component_ = np.exp(digamma(H) - digamma(H.sum(axis=1, keepdims=True)))
+            self.estimator.partial_fit(X)
+
+    def partial_fit(self, texts):
+        """
+        Update the topics with one batch of preprocessed texts on the current vocabulary.
+
+        The first call fixes the vocabulary from this batch; the next fit() recounts
+        the vocabulary from its own corpus.
+        """
+        self.vectorizer.partial_fit(texts)
+        if self.feature_names is None:
+            self._refresh_vocabulary()
+        self._update(self._matrix(texts))
+        return self
+
+    def fit(self, stream):
+        """
+        Fit the vocabulary on a corpus and refresh the model, warm-starting from the
+        previous topics.
+
+        Document and term counts start from zero on every call, so refitting on the
+        same corpus gives the same vocabulary and IDF weights; only the topic
+        components carry over.
+
+        Args:
+            stream: List of preprocessed texts or a re-iterable stream of text chunks
+                (e.g. TextStream); it is read twice, once for the vocabulary
+        """
+        chunks = _text_chunks(stream)
+        self.vectorizer = StreamingTfidfVectorizer(max_features=self.max_terms, min_df=self.min_doc_freq,
+                                                   stop_words=self.vectorizer.stop_words)
+        for texts in chunks:
+            self.vectorizer.partial_fit(texts)
+        self._refresh_vocabulary()
+        for texts in chunks:
+            self._update(self._matrix(texts))
+        return self
+
+    def transform(self, texts):
+        """Return per-document topic mixtures (rows sum to 1, all-zero for empty documents)."""
+        mixtures = self.estimator.transform(self._matrix(texts))
+        totals = mixtures.sum(axis=1, keepdims=True)
+        return np.divide(mixtures, totals, out=np.zeros_like(mixtures), where=totals > 0)
+
+    def topic_mixtures(self, texts, index=None):
+        """Topic mixtures as a DataFrame with one topic_<k> column per topic."""
+        columns = [f'topic_{k}' for k in range(self.n_topics)]
+        return pd.DataFrame(self.transform(texts), columns=columns, index=index)
+
+    def topic_scores(self, topic):
+        """Term weights of one topic, in the get_mean_tfidf layout (index term, column score)."""
+        scores = pd.DataFrame({'term': self.feature_names, 'score': self.estimator.components_[topic]})
+        return scores.set_index('term').sort_values('score', ascending=False)
+
+    def top_terms(self, n_terms=5):
+        """Top terms per topic, as get_top_terms returns them."""
+        return {topic: get_top_terms(self.topic_scores(topic), n_terms) for topic in range(self.n_topics)}
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def _update_corpus(path, corpus_path, chunksize):
+    """
+    Preprocess the posts of path that are not yet in the corpus saved at corpus_path.
+
+    Returns:
+        tuple: (corpus of all posts, corpus of the new posts only)
+    """
+    corpus = TokenCorpus.load(corpus_path, mmap=False) if os.path.exists(corpus_path) else None
+    seen = set(corpus.metadata.get('post_id', [])) if corpus is not None else set()
+    builder = _CorpusBuilder()
+    for chunk in iter_post_chunks(path, chunksize):
+        chunk = chunk[~chunk['post_id'].isin(seen)]
+        if len(chunk):
+            builder.add(preprocess_chunk(chunk), pd.DataFrame({'post_id': chunk['post_id'].to_numpy()}))
+    new = builder.build()
+    if corpus is None:
+        return new, new
+    if len(new):
+        merged = _CorpusBuilder()
+        for part in (corpus, new):
+            for metadata, texts in _corpus_batches(part, chunksize):
+                merged.add(texts, metadata)
+        corpus = merged.build()
+    return corpus, new
+
+
+def _fit_subreddit(args):
+    subreddit, path, model_dir, params, chunksize, n_terms, refit = args
+    model_path = os.path.join(model_dir, f"{subreddit}_{params['method']}.pkl")
+    corpus_path = os.path.join(model_dir, f"{subreddit}_{params['method']}_corpus")
+    corpus, new = _update_corpus(path, corpus_path, chunksize)
+    if os.path.exists(model_path) and not refit:
+        # Online update: only posts not seen in earlier runs
+        model = TopicModel.load(model_path)
+        for texts in _CorpusChunks(new, chunksize):
+            model.partial_fit(texts)
+    else:
+        model = TopicModel.load(model_path) if os.path.exists(model_path) else TopicModel(**params)
+        model.fit(_CorpusChunks(corpus, chunksize))
+    model.save(model_path)
+    corpus.save(corpus_path)
+
+    mixtures = [model.topic_mixtures(texts, index=metadata['post_id'])
+                for metadata, texts in _corpus_batches(corpus, chunksize)]
+    if mixtures:
+        pd.concat(mixtures).to_csv(os.path.join(model_dir, f"{subreddit}_{params['method']}_mixtures.csv"))
+    return subreddit, model.top_terms(n_terms)
+
+
+def fit_subreddit_topics(paths, model_dir, n_topics=10, method='nmf', max_terms=1000, min_doc_freq=2,
+                         chunksize=10000, n_terms=5, max_workers=None, refit=False):
+    """
+    Fit one topic model per subreddit in parallel processes.
+
+    Models are stored as <model_dir>/<subreddit>_<method>.pkl and the preprocessed
+    posts as the TokenCorpus <subreddit>_<method>_corpus; per-post mixtures go to
+    <subreddit>_<method>_mixtures.csv. On later runs only posts not in the stored
+    corpus are preprocessed, and an existing model is updated with partial_fit on
+    them alone.
+
+    Args:
+        paths: Dict mapping subreddit name -> post or comment CSV
+        model_dir: Directory for models, corpora and mixtures
+        max_workers: Number of processes (1 fits in-process)
+        refit: Refit existing models on all posts (vocabulary refreshed, warm-started
+            from the previous topics) instead of updating them with the new posts
+    Returns:
+        dict: subreddit -> {topic: top terms}
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    params = dict(n_topics=n_topics, method=method, max_terms=max_terms, min_doc_freq=min_doc_freq)
+    tasks = [(subreddit, path, model_dir, params, chunksize, n_terms, refit) for subreddit, path in paths.items()]
+    if max_workers == 1 or len(tasks) <= 1:
+        return dict(map(_fit_subreddit, tasks))
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(tasks), os.cpu_count() or 1)) as executor:
+        return dict(executor.map(_fit_subreddit, tasks))
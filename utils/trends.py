@@ -0,0 +1,179 @@
+# utils/trends.py
+# Streaming trending-term and burst detection. Each subreddit keeps a sliding
+# window of Count-Min sketches with a decayed baseline and a Space-Saving summary
+# of recent heavy hitters, so memory is fixed and any term can be scored.
+from functools import lru_cache
+import hashlib
+import numpy as np
+import pandas as pd
+from utils.sketches import SpaceSaving, SlidingWindowSketch
+
+
+@lru_cache(maxsize=2 ** 17)
+def term_key(term):
+    """Stable 64-bit key for a term (identical across processes and runs)."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _term_keys(terms):
+    return np.fromiter((term_key(term) for term in terms), dtype=np.uint64, count=len(terms))
+
+
+class TrendDetector:
+    """
+    Burst scores per subreddit over a post/comment stream.
+
+    A term's burst score compares its count in the last `window` completed
+    buckets with the count expected from its exponentially decayed (and
+    bias-corrected) per-bucket baseline: (observed - expected) / sqrt(expected + 1).
+    The open current bucket is left out of both until it is closed.
+
+    Args:
+        bucket_seconds: Width of a time bucket in seconds
+        window: Number of buckets in the current window
+        half_life: Baseline half-life in buckets
+        capacity: Heavy-hitter counters per subreddit (trending candidates)
+        record: If set, the top `record` trending terms are stored in history at
+            every bucket rollover (see bursts())
+        width, depth, seed: Count-Min sketch parameters
+    """
+
+    def __init__(self, bucket_seconds=3600, window=24, half_life=168, capacity=1000, record=None,
+                 width=2 ** 15, depth=4, seed=0):
+        self.bucket_seconds = bucket_seconds
+        self.window = window
+        self.half_life = half_life
+        self.capacity = capacity
+        self.record = record
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.windows = {}
+        self.heavy_hitters = {}
+        self.current_bucket = {}
+        self.history = []
+
+    def _state(self, subreddit):
+        if subreddit not in self.windows:
+            self.windows[subreddit] = SlidingWindowSketch(self.window, self.width, self.depth, self.seed, self.half_life)
+            self.heavy_hitters[subreddit] = SpaceSaving(self.capacity)
+        return self.windows[subreddit], self.heavy_hitters[subreddit]
+
+    def update(self, subreddit, timestamp, text):
+        """
+        Add one post or comment.
+
+        Args:
+            subreddit: Stream name, e.g. 'China'
+            timestamp: Unix seconds; older-than-current items count toward the current bucket
+            text: Preprocessed text or a list of tokens
+        """
+        window, heavy = self._state(subreddit)
+        bucket = int(timestamp // self.bucket_seconds)
+        current = self.current_bucket.get(subreddit)
+        if current is None:
+            self.current_bucket[subreddit] = bucket
+        elif bucket > current:
+            window.advance(bucket - current)
+            heavy.decay((1 - window.alpha) ** (bucket - current))
+            self.current_bucket[subreddit] = bucket
+            if self.record:
+                self._record(subreddit, current)
+
+        tokens = text.split() if isinstance(text, str) else list(text)
+        if tokens:
+            window.add(_term_keys(tokens))
+            heavy.update_many(tokens)
+
+    def update_chunk(self, subreddit, timestamps, texts):
+        """Add a chunk of posts or comments, in time order."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        for i in np.argsort(timestamps, kind='stable'):
+            self.update(subreddit, timestamps[i], texts[i])
+
+    def burst_scores(self, subreddit, terms):
+        """
+        Score arbitrary terms against their baseline.
+
+        Returns:
+            pd.DataFrame: term, window_count, expected and score columns, highest score first
+        """
+        terms = list(terms)
+        window, _ = self._state(subreddit)
+        keys = _term_keys(terms)
+        observed = window.window_counts(keys).astype(np.float64)
+        expected = window.baseline_rates(keys) * window.completed_in_window
+        scores = (observed - expected) / np.sqrt(expected + 1)
+        result = pd.DataFrame({'term': terms, 'window_count': observed, 'expected': expected, 'score': scores})
+        return result.sort_values('score', ascending=False, ignore_index=True)
+
+    def trending(self, subreddit, n=10, min_count=5):
+        """Return the n heavy-hitter terms with the highest burst scores."""
+        _, heavy = self._state(subreddit)
+        candidates = [term for term, _, _ in heavy.top()]
+        scores = self.burst_scores(subreddit, candidates)
+        return scores[scores['window_count'] >= min_count].head(n).reset_index(drop=True)
+
+    def _record(self, subreddit, bucket):
+        top = self.trending(subreddit, self.record)
+        top.insert(0, 'time', pd.Timestamp(bucket * self.bucket_seconds, unit='s'))
+        top.insert(0, 'subreddit', subreddit)
+        self.history.append(top)
+
+    def bursts(self, threshold=3.0):
+        """
+        Recorded trending terms with a burst score of at least threshold.
+
+        The window score keeps rising while a spike is inside the window, so a
+        term stays above threshold for a run of consecutive records; onset is
+        the first record of that run, i.e. the bucket the burst started in.
+
+        Returns:
+            pd.DataFrame: subreddit, time (bucket start), onset, term, window_count, expected, score
+        """
+        columns = ['subreddit', 'time', 'onset', 'term', 'window_count', 'expected', 'score']
+        if not self.history:
+            return pd.DataFrame(columns=columns)
+        history = pd.concat(self.history, ignore_index=True)
+        # Position of each record in its subreddit's sequence of rollovers
+        history['record'] = history.groupby('subreddit')['time'].rank(method='dense').astype(np.int64)
+        bursts = history[history['score'] >= threshold].sort_values(['subreddit', 'term', 'time'])
+        group = [bursts['subreddit'], bursts['term']]
+        run = (bursts.groupby(group)['record'].diff() != 1).cumsum()
+        bursts['onset'] = bursts.groupby(run)['time'].transform('first')
+        return bursts.sort_values(['time', 'score'], ascending=[True, False])[columns].reset_index(drop=True)
+
+
+def burst_peaks(bursts, dates, n_peaks=2, n_terms=2):
+    """
+    Turn burst records into peak annotations for a timeseries.
+
+    Each run of consecutive records of a term is one burst, placed at its onset;
+    bursts of different terms that overlap in time are one peak.
+
+    Args:
+        bursts: DataFrame from TrendDetector.bursts() (one subreddit)
+        dates: Dates of the plotted series
+        n_peaks: Number of peaks to annotate
+        n_terms: Number of terms per annotation
+    Returns:
+        list: (date_index, terms) tuples, strongest peak first; date_index is the
+            last date at or before the onset
+    """
+    if bursts is None or not len(bursts) or not len(dates):
+        return []
+    dates = pd.to_datetime(np.asarray(dates)).values
+    runs = (bursts.groupby(['term', 'onset'])
+            .agg(end=('time', 'max'), score=('score', 'max'))
+            .reset_index()
+            .sort_values(['onset', 'score'], ascending=[True, False], ignore_index=True))
+    # A run that starts after every earlier run has ended opens a new peak
+    previous_end = runs['end'].cummax().shift()
+    runs['peak'] = (runs['onset'] > previous_end).cumsum()
+    peaks = []
+    for _, members in sorted(runs.groupby('peak'), key=lambda item: -item[1]['score'].max())[:n_peaks]:
+        onset = np.datetime64(members['onset'].min())
+        terms = members.nlargest(n_terms, 'score')['term'].tolist()
+        idx = max(int(np.searchsorted(dates, onset, side='right')) - 1, 0)
+        peaks.append((idx, terms))
+    return peaks
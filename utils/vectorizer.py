@@ -0,0 +1,108 @@
+# utils/vectorizer.py
+# TF-IDF that is fit incrementally over chunks of preprocessed texts. Produces
+# the same vocabulary and weights as TfidfVectorizer(max_features, min_df,
+# stop_words) with the default smooth_idf/sublinear_tf=False/norm='l2'.
+from collections import Counter
+from itertools import islice
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+
+class StreamingTfidfVectorizer:
+    """
+    Two-pass TF-IDF: partial_fit() accumulates document and term frequencies
+    chunk by chunk, finalize() fixes the vocabulary and IDF weights, and
+    transform() projects chunks onto that vocabulary.
+    """
+
+    def __init__(self, max_features=None, min_df=1, stop_words=None):
+        self.max_features = max_features
+        self.min_df = min_df
+        self.stop_words = stop_words
+        self._analyzer = CountVectorizer(stop_words=stop_words).build_analyzer()
+        self.n_docs = 0
+        self.doc_freq = Counter()
+        self.term_freq = Counter()
+        self.vocabulary_ = None
+        self.idf_ = None
+
+    def __getstate__(self):
+        # Analyzers are rebuilt on load; only the counts and fitted weights are pickled
+        state = self.__dict__.copy()
+        state.pop('_analyzer', None)
+        state.pop('_counter', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._analyzer = CountVectorizer(stop_words=self.stop_words).build_analyzer()
+        if self.vocabulary_ is not None:
+            self._counter = CountVectorizer(stop_words=self.stop_words, vocabulary=self.vocabulary_)
+
+    def partial_fit(self, texts):
+        """Update frequency counts with a chunk of preprocessed texts."""
+        for text in texts:
+            tokens = self._analyzer(text)
+            self.term_freq.update(tokens)
+            self.doc_freq.update(set(tokens))
+            self.n_docs += 1
+        return self
+
+    def finalize(self):
+        """Select the vocabulary and compute IDF weights from the counts seen so far."""
+        min_df = self.min_df if isinstance(self.min_df, int) else self.min_df * self.n_docs
+        terms = np.array(sorted(term for term, df in self.doc_freq.items() if df >= min_df), dtype=object)
+        if self.max_features is not None and len(terms) > self.max_features:
+            # Same selection (and tie order) as CountVectorizer._limit_features
+            tfs = np.array([self.term_freq[term] for term in terms], dtype=np.int64)
+            terms = np.sort(terms[(-tfs).argsort()[:self.max_features]])
+
+        self.vocabulary_ = {term: i for i, term in enumerate(terms)}
+        df = np.array([self.doc_freq[term] for term in terms], dtype=np.float64)
+        self.idf_ = np.log((1 + self.n_docs) / (1 + df)) + 1
+        self._counter = CountVectorizer(stop_words=self.stop_words, vocabulary=self.vocabulary_)
+        return self
+
+    def get_feature_names_out(self):
+        return np.array(list(self.vocabulary_), dtype=object)
+
+    def count(self, texts):
+        """Return raw term counts on the fitted vocabulary for a chunk of texts."""
+        if not self.vocabulary_:
+            # CountVectorizer rejects an empty vocabulary (e.g. min_df not yet reached)
+            return sp.csr_matrix((len(texts), 0), dtype=np.int64)
+        return self._counter.transform(texts)
+
+    def transform(self, texts):
+        """Return the L2-normalised TF-IDF matrix for a chunk of texts."""
+        counts = self.count(texts).astype(np.float64)
+        if not counts.shape[1]:
+            return counts.tocsr()
+        return normalize(counts @ sp.diags(self.idf_), norm='l2', copy=False).tocsr()
+
+    def fit_transform(self, stream):
+        """
+        Fit on a stream of text chunks and return the stacked TF-IDF matrix.
+
+        The stream is consumed once; texts are spilled to a temporary file
+        between the counting pass and the transform pass.
+        """
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spill:
+            chunk_sizes = []
+            for texts in stream:
+                self.partial_fit(texts)
+                spill.writelines(text.replace('\n', ' ') + '\n' for text in texts)
+                chunk_sizes.append(len(texts))
+            self.finalize()
+
+            spill.seek(0)
+            matrices = [
+                self.transform([line.rstrip('\n') for line in islice(spill, size)])
+                for size in chunk_sizes
+            ]
+        if not matrices:
+            return sp.csr_matrix((0, len(self.vocabulary_)))
+        return sp.vstack(matrices, format='csr')